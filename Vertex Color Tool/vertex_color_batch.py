@@ -0,0 +1,433 @@
+"""
+
+Vertex Color Tool Batch Recolor
+
+    - Not tested with previous Blender versions.
+    - Headless batch processing of .blend libraries with the Vertex Color Tool kernels.
+    - Work is split across a pool of background Blender processes (one per core by default).
+
+Usage:
+
+    blender -b -P vertex_color_batch.py -- jobs.json --workers 8
+    python vertex_color_batch.py jobs.csv --blender /path/to/blender
+
+JSON manifest (list of jobs, or {"jobs": [...]}):
+
+    [
+        {
+            "file": "/library/crate.blend",
+            "output": "/library_out/crate.blend",
+            "objects": ["Crate", "Lid"],
+            "selected_only": false,
+            "operations": [
+                {"type": "prepare", "domain": "POINT", "data_type": "BYTE_COLOR"},
+                {"type": "color", "color": [1.0, 0.0, 0.0]},
+                {"type": "brightness", "factor": 0.5},
+                {"type": "bake", "bake_type": "AO", "samples": 16, "distance": 1.0, "multiply_existing": true},
+                {"type": "export_colors", "directory": "/backup/colors"}
+            ]
+        }
+    ]
+
+CSV manifest columns (only "file" and "operations" are required):
+
+    file,operations,color,brightness,bake,selected_only,output,objects,colors_directory
+    /library/crate.blend,prepare;color,1 0 0,,,0,,Crate;Lid
+
+Progress is appended to a JSON-lines file after every finished .blend, so an
+interrupted run continues where it stopped when started again with the same
+progress file. Only jobs with status "ok" are skipped on resume.
+
+"export_colors" writes colorset1 of every mesh in the file as .npy (plus a JSON
+header with the topology fingerprint) into <directory>/<blend file name>/,
+"import_colors" restores them from there (meshes with other topology are skipped).
+
+"bake" bakes CAVITY, CURVATURE, AO or THICKNESS (bake_type, optional contrast,
+samples, distance, seed, multiply_existing) into colorset1. The rays of one file
+are cast inside its worker process, so a library bakes on all cores at once;
+a single huge mesh is split across processes by the Bake From Mesh operator.
+
+With --memory-budget MB, color and brightness run window by window
+(stream_mesh_colors) and the kernel temporaries of one window stay within the
+budget; brightness then multiplies the current colors. Peak memory is not bounded
+by it: the color buffer, vertex selection and corner map are read for the whole mesh.
+
+"""
+
+
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+OPERATION_TYPES = ('prepare', 'color', 'brightness', 'bake', 'export_colors', 'import_colors')
+DEFAULT_CHUNK_SIZE = 4
+
+
+# funkce pro načtení manifestu z JSON nebo CSV souboru
+def load_manifest(path):
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            jobs = [job_from_csv_row(row) for row in csv.DictReader(f)]
+    else:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        jobs = data["jobs"] if isinstance(data, dict) else data
+
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for index, job in enumerate(jobs):
+        if not job.get("file"):
+            raise ValueError(f"Job {index} has no 'file'.")
+
+        job["file"] = os.path.join(base_dir, job["file"])
+        if job.get("output"):
+            job["output"] = os.path.join(base_dir, job["output"])
+        job.setdefault("id", f"{index}:{job['file']}")
+        job.setdefault("operations", [])
+
+        for operation in job["operations"]:
+            if operation.get("type") not in OPERATION_TYPES:
+                raise ValueError(f"Job '{job['id']}' has unknown operation: {operation.get('type')}")
+
+    return jobs
+
+
+# funkce pro převod řádku CSV manifestu na job ve formátu JSON manifestu
+def job_from_csv_row(row):
+    operations = []
+    for name in (row.get("operations") or "").split(";"):
+        name = name.strip()
+        if not name:
+            continue
+        operation = {"type": name}
+        if name == 'color':
+            operation["color"] = [float(c) for c in row["color"].split()]
+        elif name == 'brightness':
+            operation["factor"] = float(row["brightness"])
+        elif name == 'bake':
+            operation["bake_type"] = row["bake"].strip().upper()
+        elif name in ('export_colors', 'import_colors'):
+            operation["directory"] = row["colors_directory"].strip()
+        operations.append(operation)
+
+    job = {
+        "file": row["file"].strip(),
+        "operations": operations,
+        "selected_only": (row.get("selected_only") or "").strip().lower() in ("1", "true", "yes"),
+    }
+    if (row.get("output") or "").strip():
+        job["output"] = row["output"].strip()
+    if (row.get("objects") or "").strip():
+        job["objects"] = [name.strip() for name in row["objects"].split(";") if name.strip()]
+    return job
+
+
+# funkce pro načtení již dokončených jobů z progress souboru
+def load_progress(path):
+    results = {}
+    if not os.path.exists(path):
+        return results
+
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # poslední řádek může být neúplný po přerušení
+                continue
+            results[result["id"]] = result
+    return results
+
+
+# funkce pro připsání výsledku jednoho jobu do progress souboru
+def append_progress(path, result):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# funkce pro spuštění jednoho worker procesu Blenderu nad skupinou jobů
+def run_worker(blender, manifest, progress, job_ids, timeout, memory_budget):
+    ids_path = f"{progress}.{os.getpid()}.{job_ids[0].split(':', 1)[0]}.ids"
+    with open(ids_path, "w", encoding="utf-8") as f:
+        json.dump(job_ids, f)
+
+    command = [
+        blender, "-b", "--factory-startup", "-noaudio",
+        "-P", os.path.abspath(__file__), "--",
+        "--worker", manifest,
+        "--progress", progress,
+        "--job-ids", ids_path,
+    ]
+    if memory_budget:
+        command += ["--memory-budget", str(memory_budget)]
+    try:
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=timeout,
+        )
+        return completed.returncode, completed.stdout
+    except subprocess.TimeoutExpired as e:
+        return None, f"Worker timed out after {timeout} s.\n{e.stdout or ''}"
+    finally:
+        os.remove(ids_path)
+
+
+# funkce pro rozdělení jobů mezi workery a sběr výsledků
+def run_pool(args):
+    jobs = load_manifest(args.manifest)
+    progress = args.progress or f"{os.path.splitext(args.manifest)[0]}.progress.jsonl"
+    report = args.report or f"{os.path.splitext(args.manifest)[0]}.report.json"
+
+    done = {job_id for job_id, result in load_progress(progress).items() if result["status"] == 'ok'}
+    pending = [job for job in jobs if job["id"] not in done]
+    print(f"Vertex Color Batch: {len(jobs)} jobs, {len(done)} already done, {len(pending)} pending.")
+
+    chunks = [
+        [job["id"] for job in pending[i:i + args.chunk_size]]
+        for i in range(0, len(pending), args.chunk_size)
+    ]
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(
+                run_worker, args.blender, args.manifest, progress, chunk, args.timeout, args.memory_budget
+            ): chunk
+            for chunk in chunks
+        }
+        for future in concurrent.futures.as_completed(futures):
+            chunk = futures[future]
+            returncode, output = future.result()
+
+            # joby, které spadlý worker nestihl dokončit, se zaznamenají jako chyba a při dalším běhu se zopakují
+            if returncode != 0:
+                results = load_progress(progress)
+                for job_id in chunk:
+                    if results.get(job_id, {}).get("status") != 'ok':
+                        append_progress(progress, {
+                            "id": job_id,
+                            "status": 'error',
+                            "error": f"Worker exited with code {returncode}.",
+                        })
+                print(output)
+            print(f"Vertex Color Batch: finished chunk of {len(chunk)} jobs (exit code {returncode}).")
+
+    wall_time = time.perf_counter() - start
+    write_report(report, jobs, load_progress(progress), wall_time, args.workers)
+    print(f"Vertex Color Batch: report written to '{report}'.")
+
+
+# funkce pro zapsání reportu s časy jednotlivých souborů
+def write_report(path, jobs, results, wall_time, workers):
+    files = [results[job["id"]] for job in jobs if job["id"] in results]
+    ok = [r for r in files if r["status"] == 'ok']
+    failed = [r for r in files if r["status"] != 'ok']
+
+    report = {
+        "workers": workers,
+        "wall_time": wall_time,
+        "jobs": len(jobs),
+        "ok": len(ok),
+        "failed": len(failed),
+        "file_time_total": sum(r.get("timings", {}).get("total", 0.0) for r in ok),
+        "files": files,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"Vertex Color Batch: {len(ok)} ok, {len(failed)} failed, wall time {wall_time:.1f} s.")
+    for result in failed:
+        print(f"  FAILED {result['id']}: {result.get('error')}")
+
+
+# funkce pro zpracování jednoho .blend souboru uvnitř worker procesu
+def process_job(job, addon, memory_budget=None):
+    import bpy
+
+    timings = {}
+    start = time.perf_counter()
+
+    bpy.ops.wm.open_mainfile(filepath=job["file"], load_ui=False)
+    timings["open"] = time.perf_counter() - start
+
+    context = bpy.context
+    if context.object and context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+
+    objects = [
+        obj for obj in context.scene.objects
+        if obj.type == addon.MESH_TYPE and (not job.get("objects") or obj.name in job["objects"])
+    ]
+    meshes = {}
+    for obj in objects:
+        if obj.data.library is None:
+            meshes.setdefault(addon.get_mesh_key(obj.data), obj.data)
+
+    phase = time.perf_counter()
+    corners = 0
+    skipped = 0
+    for operation in job["operations"]:
+        if operation["type"] == 'prepare':
+            mat, _ = addon.create_vtx_color_material()
+            for mesh in meshes.values():
+                addon.assign_vtx_color_material(mesh, mat)
+                addon.ensure_color_attribute(
+                    mesh, operation.get("domain", 'CORNER'), operation.get("data_type", 'FLOAT_COLOR')
+                )
+            continue
+
+        if operation["type"] in {'export_colors', 'import_colors'}:
+            directory = os.path.join(
+                operation["directory"], os.path.splitext(os.path.basename(job["file"]))[0]
+            )
+            if operation["type"] == 'export_colors':
+                addon.export_all_color_attributes(directory)
+            else:
+                imported, errors = addon.import_all_color_attributes(directory)
+                skipped += len(errors)
+            continue
+
+        if operation["type"] == 'bake':
+            for mesh in meshes.values():
+                if not addon.validate_color_attribute(mesh):
+                    skipped += 1
+                    continue
+                values = addon.bake_mesh_values(
+                    mesh,
+                    operation["bake_type"],
+                    operation.get("contrast", 1.0),
+                    operation.get("samples", 16),
+                    operation.get("distance", 1.0),
+                    operation.get("seed", 0),
+                )
+                kernel = addon.compile_vertex_values(values, bool(operation.get("multiply_existing")))
+                corner_indices = None if job.get("selected_only") else addon.get_all_element_indices(mesh)
+                corners += addon.process_mesh_colors(context, mesh, None, kernel, corner_indices)
+            continue
+
+        if operation["type"] == 'color':
+            context.scene.vtx_color_picker = operation["color"][:3]
+            kernel = addon.color_fill_kernel
+        elif memory_budget:
+            # okna nemají společný snapshot, jas se proto násobí přímo
+            kernel = addon.compile_color_pipeline([{"type": 'multiply', "factor": operation["factor"]}])
+        else:
+            context.scene.vtx_brightness_slider = operation["factor"]
+            kernel = addon.brightness_kernel
+
+        for mesh in meshes.values():
+            if not addon.validate_color_attribute(mesh):
+                skipped += 1
+                continue
+            if memory_budget:
+                for _ in addon.stream_mesh_colors(
+                    context, mesh, kernel, memory_budget * 1048576, bool(job.get("selected_only"))
+                ):
+                    pass
+                corners += len(mesh.color_attributes[addon.COLOR_ATTRIBUTE_NAME].data)
+                continue
+            corner_indices = None if job.get("selected_only") else addon.get_all_element_indices(mesh)
+            corners += addon.process_mesh_colors(context, mesh, None, kernel, corner_indices)
+    timings["process"] = time.perf_counter() - phase
+
+    phase = time.perf_counter()
+    output = job.get("output") or job["file"]
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    bpy.ops.wm.save_as_mainfile(filepath=output, copy=output != job["file"])
+    timings["save"] = time.perf_counter() - phase
+    timings["total"] = time.perf_counter() - start
+
+    return {
+        "meshes": len(meshes),
+        "corners": corners,
+        "skipped_meshes": skipped,
+        "output": output,
+        "timings": timings,
+    }
+
+
+# funkce pro běh uvnitř worker procesu Blenderu
+def run_worker_jobs(args):
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import vertex_color_tool as addon
+
+    addon.register()
+
+    with open(args.job_ids, encoding="utf-8") as f:
+        job_ids = set(json.load(f))
+
+    for job in load_manifest(args.manifest):
+        if job["id"] not in job_ids:
+            continue
+
+        result = {"id": job["id"], "file": job["file"], "worker": os.getpid()}
+        try:
+            result.update(process_job(job, addon, args.memory_budget))
+            result["status"] = 'ok'
+        except Exception as e:
+            result["status"] = 'error'
+            result["error"] = str(e)
+        append_progress(args.progress, result)
+        print(f"Vertex Color Batch worker: {job['id']}: {result['status']}")
+
+
+# funkce pro zpracování argumentů (v Blenderu se berou argumenty za '--')
+def parse_args(argv):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Batch recolor of .blend files with Vertex Color Tool.")
+    parser.add_argument("manifest", help="Job manifest (.json or .csv)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker Blender processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Number of .blend files processed by one worker process")
+    parser.add_argument("--blender", default=None,
+                        help="Path to Blender executable (default: the running Blender)")
+    parser.add_argument("--progress", default=None, help="Progress file (.jsonl) used for resuming")
+    parser.add_argument("--report", default=None, help="Timing report output (.json)")
+    parser.add_argument("--timeout", type=float, default=None, help="Timeout of one worker process in seconds")
+    parser.add_argument("--memory-budget", type=int, default=None,
+                        help="Process colors window by window, kernel temporaries per window within this size (MB)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--job-ids", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    args.manifest = os.path.abspath(args.manifest)
+    if args.progress:
+        args.progress = os.path.abspath(args.progress)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.worker:
+        run_worker_jobs(args)
+        return
+
+    if args.blender is None:
+        try:
+            import bpy
+            args.blender = bpy.app.binary_path
+        except ImportError:
+            sys.exit("Blender executable not given, use --blender.")
+
+    run_pool(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,587 @@
+"""
+
+Vertex Color Tool Benchmark
+
+    - Not tested with previous Blender versions.
+    - Times the operator hot paths on synthetic meshes in background Blender (Linux).
+    - Records wall time, peak RSS and .blend size delta per case and compares runs against a stored baseline.
+
+Usage:
+
+    blender -b --factory-startup -P vertex_color_bench.py -- --output bench.json
+    blender -b --factory-startup -P vertex_color_bench.py -- --meshes grid scan --corners 10000 1000000 --densities 0.1 1.0
+    blender -b --factory-startup -P vertex_color_bench.py -- --output new.json --compare bench.json
+    python vertex_color_bench.py --input new.json --compare bench.json --threshold 0.2
+
+Meshes:
+
+    grid    - flat quad grid, vertices and faces in scanline order
+    sphere  - subdivided icosphere (triangles, corner count is rounded to the nearest subdivision level)
+    scan    - jittered triangulated height field with holes and shuffled vertex/face order (like photogrammetry scans)
+
+Cases (every mesh size and selection density):
+
+    prepare                 - VTXCOLOR_prepare on a mesh without material and color attribute
+    apply                   - VTXCOLOR_apply
+    brightness_first        - VTXCOLOR_brightness with empty snapshot and selection caches
+    brightness_repeat       - VTXCOLOR_brightness with the snapshot from the previous call
+    adjust                  - VTXCOLOR_adjust (hsv + contrast + overlay)
+    toggle                  - VTXCOLOR_toggle
+
+Startup (once per run, skipped with --no-startup):
+
+    import and register time of the addon in a fresh background Blender, whether numpy
+    was loaded by them, and the wall time of that Blender process with and without the addon
+
+apply, brightness and adjust run once with 'Stay in Edit Mode' ("native" path) and once
+through the Object Mode round trip ("object" path).
+
+Peak RSS is read from /proc/self/status (VmHWM) after resetting it through
+/proc/self/clear_refs before every case. The .blend size delta is the size of
+an uncompressed copy saved after the case minus the copy saved before it.
+
+With --compare a case is flagged as a regression when it is slower than the
+baseline by more than --threshold (relative) and --min-delta (absolute), or
+when its peak RSS growth exceeds the baseline by more than --threshold and
+--min-memory. The exit code is 1 when any regression was found.
+
+"""
+
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+MESH_KINDS = ('grid', 'sphere', 'scan')
+DEFAULT_CORNERS = (10_000, 100_000, 1_000_000, 5_000_000)
+DEFAULT_DENSITIES = (0.01, 0.25, 1.0)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.15
+DEFAULT_MIN_DELTA = 0.002
+DEFAULT_MIN_MEMORY = 8 * 1024 * 1024
+OPERATOR_PATHS = ('native', 'object')
+BENCH_OBJECT_NAME = "vtx_bench"
+STARTUP_MARKER = "VTX_STARTUP "
+STARTUP_SCRIPT = """
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {path!r})
+numpy_before = 'numpy' in sys.modules
+import vertex_color_tool as addon
+addon.register()
+timings = addon.get_startup_timings()
+timings["total"] = time.perf_counter() - start
+timings["numpy_loaded"] = 'numpy' in sys.modules and not numpy_before
+print({marker!r} + json.dumps(timings))
+"""
+
+
+# funkce pro vytvoření meshe z pole vertexů a polygonů se stejným počtem rohů
+def build_mesh(name, co, face_verts):
+    import bpy
+
+    face_count, face_size = face_verts.shape
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(co))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(co, dtype=np.float32).ravel())
+    mesh.loops.add(face_count * face_size)
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(face_verts, dtype=np.int32).ravel())
+    mesh.polygons.add(face_count)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, face_count * face_size, face_size, dtype=np.int32))
+    mesh.update(calc_edges=True)
+    return mesh
+
+
+# funkce pro vytvoření čtvercové quad mřížky s přibližně zadaným počtem rohů
+def make_grid_mesh(name, corners, rng):
+    side = max(1, int(round(np.sqrt(corners / 4.0))))
+    xs = np.linspace(-1.0, 1.0, side + 1, dtype=np.float32)
+    x, y = np.meshgrid(xs, xs)
+    co = np.stack((x.ravel(), y.ravel(), np.zeros(x.size, dtype=np.float32)), axis=1)
+
+    cells = np.arange(side)
+    v0 = (cells[:, None] * (side + 1) + cells[None, :]).ravel()
+    faces = np.stack((v0, v0 + 1, v0 + side + 2, v0 + side + 1), axis=1)
+    return build_mesh(name, co, faces)
+
+
+# funkce pro vytvoření icosféry s nejbližším počtem rohů (60 * 4^(s - 1))
+def make_sphere_mesh(name, corners, rng):
+    import bpy
+    import bmesh
+
+    subdivisions = int(round(np.log(max(corners, 60) / 60.0) / np.log(4.0))) + 1
+    subdivisions = min(max(subdivisions, 1), 10)
+
+    bm = bmesh.new()
+    bmesh.ops.create_icosphere(bm, subdivisions=subdivisions, radius=1.0)
+    mesh = bpy.data.meshes.new(name)
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+
+# funkce pro vytvoření "skenu": zvlněná trojúhelníková mřížka s dírami a zamíchaným pořadím
+def make_scan_mesh(name, corners, rng):
+    side = max(2, int(round(np.sqrt(corners / 6.0))))
+    xs = np.linspace(-1.0, 1.0, side + 1, dtype=np.float32)
+    x, y = np.meshgrid(xs, xs)
+    x = x.ravel() + rng.normal(0.0, 0.25 / side, x.size).astype(np.float32)
+    y = y.ravel() + rng.normal(0.0, 0.25 / side, y.size).astype(np.float32)
+    z = 0.1 * np.sin(4.0 * x) * np.cos(3.0 * y) + rng.normal(0.0, 0.002, x.size)
+    co = np.stack((x, y, z.astype(np.float32)), axis=1)
+
+    cells = np.arange(side)
+    v0 = (cells[:, None] * (side + 1) + cells[None, :]).ravel()
+    faces = np.concatenate((
+        np.stack((v0, v0 + 1, v0 + side + 2), axis=1),
+        np.stack((v0, v0 + side + 2, v0 + side + 1), axis=1),
+    ))
+
+    # díry po ~2 % trojúhelníků a náhodné pořadí vertexů i faces (špatná lokalita jako u skenů)
+    faces = faces[rng.random(len(faces)) >= 0.02]
+    faces = faces[rng.permutation(len(faces))]
+    order = rng.permutation(len(co))
+    remap = np.empty_like(order)
+    remap[order] = np.arange(len(order))
+    return build_mesh(name, co[order], remap[faces])
+
+
+MESH_BUILDERS = {
+    'grid': make_grid_mesh,
+    'sphere': make_sphere_mesh,
+    'scan': make_scan_mesh,
+}
+
+
+# funkce pro náhodný výběr vertexů se zadanou hustotou
+def select_vertices(mesh, density, rng):
+    select = rng.random(len(mesh.vertices)) < density
+    mesh.vertices.foreach_set("select", select)
+    return int(select.sum())
+
+
+# funkce pro odstranění objektů a meshů z předchozího běhu
+def clear_bench_data(addon):
+    import bpy
+
+    for obj in [o for o in bpy.data.objects if o.name.startswith(BENCH_OBJECT_NAME)]:
+        bpy.data.objects.remove(obj)
+    for mesh in [m for m in bpy.data.meshes if m.name.startswith(BENCH_OBJECT_NAME) and m.users == 0]:
+        bpy.data.meshes.remove(mesh)
+
+    addon.invalidate_color_snapshot()
+    addon.invalidate_selection_cache()
+
+
+# funkce pro nalezení 3D viewportu pro context override (v background režimu není aktivní okno)
+def get_view3d_override(context):
+    for window in context.window_manager.windows:
+        for area in window.screen.areas:
+            if area.type != 'VIEW_3D':
+                continue
+            region = next(r for r in area.regions if r.type == 'WINDOW')
+            return {"window": window, "screen": window.screen, "area": area, "region": region}
+    raise RuntimeError("No 3D Viewport found, run Blender with --factory-startup.")
+
+
+# funkce pro načtení aktuální a špičkové RSS procesu v bajtech
+def read_memory_status():
+    values = {}
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key, value = line.split(":", 1)
+                    values[key] = int(value.split()[0]) * 1024
+    except OSError:
+        pass
+
+    if len(values) < 2:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        return peak, peak
+    return values["VmRSS"], values["VmHWM"]
+
+
+# funkce pro vynulování špičkové RSS (Linux 4.0+), jinak zůstává špička za celý proces
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="utf-8") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+# funkce pro uložení nekomprimované kopie .blend souboru a vrácení její velikosti
+def save_blend_size(path):
+    import bpy
+
+    bpy.ops.wm.save_as_mainfile(filepath=path, copy=True, compress=False)
+    return os.path.getsize(path)
+
+
+# funkce pro změření jednoho volání operátoru
+def measure_operator(override, operator, kwargs):
+    import bpy
+
+    reset_peak_rss()
+    rss_before, _ = read_memory_status()
+
+    with bpy.context.temp_override(**override):
+        start = time.perf_counter()
+        result = operator(**kwargs)
+        elapsed = time.perf_counter() - start
+
+    _, peak = read_memory_status()
+    return elapsed, rss_before, peak, result
+
+
+# funkce pro návrat meshe do stavu před přípravou materiálu
+def reset_prepare(addon, mesh):
+    import bpy
+
+    if addon.COLOR_ATTRIBUTE_NAME in mesh.color_attributes:
+        mesh.color_attributes.remove(mesh.color_attributes[addon.COLOR_ATTRIBUTE_NAME])
+    mesh.materials.clear()
+    if addon.MATERIAL_NAME in bpy.data.materials:
+        bpy.data.materials.remove(bpy.data.materials[addon.MATERIAL_NAME])
+
+
+# funkce pro vyprázdnění cache, aby další volání bylo "první"
+def reset_caches(addon, mesh):
+    addon.invalidate_color_snapshot(mesh)
+    addon.invalidate_selection_cache(mesh)
+
+
+# funkce pro seznam měřených případů v Edit Mode: (název, cesta, operátor, argumenty, reset)
+def get_edit_mode_cases(addon):
+    import bpy
+
+    cases = []
+    for path in OPERATOR_PATHS:
+        cases.extend([
+            ('apply', path, bpy.ops.mesh.apply_vertex_color, {}, None),
+            ('brightness_first', path, bpy.ops.mesh.apply_vertex_brightness, {}, reset_caches),
+            ('brightness_repeat', path, bpy.ops.mesh.apply_vertex_brightness, {}, None),
+            ('adjust', path, bpy.ops.mesh.adjust_vertex_colors,
+             {"saturation": 0.5, "contrast": 1.2, "blend_mode": 'OVERLAY', "blend_factor": 0.5}, None),
+        ])
+    cases.append(('toggle', 'ui', bpy.ops.view3d.vtxcolor_toggle, {}, None))
+    return cases
+
+
+# funkce pro opakované měření jednoho případu
+def run_case(addon, override, mesh, info, case, repeat, blend_state):
+    import bpy
+
+    name, path, operator, kwargs, reset = case
+    result = dict(info, operator=name, path=path, times=[], status='ok')
+    peaks = []
+
+    for index in range(repeat):
+        if reset is not None:
+            reset(addon, mesh)
+
+        elapsed, rss_before, peak, status = measure_operator(override, operator, kwargs)
+        if 'FINISHED' not in status:
+            result["status"] = 'error'
+            result["error"] = f"Operator returned {sorted(status)}."
+            break
+
+        result["times"].append(elapsed)
+        peaks.append(peak - rss_before)
+        if index == 0:
+            result["rss_before"] = rss_before
+            result["peak_rss"] = peak
+
+        if name == 'toggle':
+            # přepnutí zpět, aby každé opakování měřilo stejný směr
+            with bpy.context.temp_override(**override):
+                operator(**kwargs)
+
+        if index == 0 and blend_state is not None:
+            size = save_blend_size(blend_state["path"])
+            result["blend_size_delta"] = size - blend_state["size"]
+            blend_state["size"] = size
+
+    if result["times"]:
+        result["time"] = min(result["times"])
+        result["median"] = statistics.median(result["times"])
+        result["peak_rss_growth"] = max(peaks)
+    return result
+
+
+# funkce pro měření všech případů nad jedním syntetickým meshem
+def bench_mesh(addon, override, kind, corners, density, args, temp_dir):
+    import bpy
+
+    context = bpy.context
+    rng = np.random.default_rng(args.seed)
+    clear_bench_data(addon)
+
+    start = time.perf_counter()
+    mesh = MESH_BUILDERS[kind](BENCH_OBJECT_NAME, corners, rng)
+    obj = bpy.data.objects.new(BENCH_OBJECT_NAME, mesh)
+    context.scene.collection.objects.link(obj)
+    context.view_layer.objects.active = obj
+    obj.select_set(True)
+    selected_vertices = select_vertices(mesh, density, rng)
+
+    info = {
+        "mesh": kind,
+        "target_corners": corners,
+        "density": density,
+        "vertices": len(mesh.vertices),
+        "corners": len(mesh.loops),
+        "faces": len(mesh.polygons),
+        "selected_vertices": selected_vertices,
+    }
+    print(f"Vertex Color Bench: {kind} {len(mesh.loops)} corners, density {density:g} "
+          f"(built in {time.perf_counter() - start:.1f} s)")
+
+    blend_state = None
+    if not args.no_blend_size:
+        path = os.path.join(temp_dir, "bench.blend")
+        blend_state = {"path": path, "size": save_blend_size(path)}
+
+    context.scene.vtx_color_picker = (0.8, 0.3, 0.1)
+    context.scene.vtx_brightness_slider = 0.5
+    context.scene.vtx_batch_selected = False
+
+    results = [run_case(
+        addon, override, mesh, info,
+        ('prepare', 'object', bpy.ops.material.prepare_vtx_color, {}, reset_prepare),
+        args.repeat, blend_state,
+    )]
+
+    with context.temp_override(**override):
+        bpy.ops.object.mode_set(mode='EDIT')
+    try:
+        for case in get_edit_mode_cases(addon):
+            context.scene.vtx_edit_mode_native = case[1] != 'object'
+            results.append(run_case(addon, override, mesh, info, case, args.repeat, blend_state))
+    finally:
+        with context.temp_override(**override):
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+    for result in results:
+        if result["status"] == 'ok':
+            print(f"  {result['operator']:<18} {result['path']:<7} {result['time'] * 1000.0:10.2f} ms"
+                  f"  peak +{result['peak_rss_growth'] / 1048576.0:8.1f} MB")
+        else:
+            print(f"  {result['operator']:<18} {result['path']:<7} FAILED: {result['error']}")
+    return results
+
+
+# funkce pro spuštění Blenderu na pozadí se skriptem, vrací (výstup, čas běhu procesu)
+def run_blender_process(binary, expression):
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [binary, "-b", "--factory-startup", "--python-expr", expression],
+        capture_output=True, text=True, check=True,
+    )
+    return completed.stdout, time.perf_counter() - start
+
+
+# funkce pro měření startu addonu v čistém Blenderu (import, register a odložené importy)
+def measure_startup(binary, repeat):
+    expression = STARTUP_SCRIPT.format(path=os.path.dirname(os.path.abspath(__file__)), marker=STARTUP_MARKER)
+    timings = []
+    with_addon = []
+    without_addon = []
+    for _ in range(repeat):
+        output, elapsed = run_blender_process(binary, expression)
+        line = next(line for line in output.splitlines() if line.startswith(STARTUP_MARKER))
+        timings.append(json.loads(line[len(STARTUP_MARKER):]))
+        with_addon.append(elapsed)
+        without_addon.append(run_blender_process(binary, "pass")[1])
+
+    return {
+        "import": statistics.median(t["import"] for t in timings),
+        "register": statistics.median(t["register"] for t in timings),
+        "total": statistics.median(t["total"] for t in timings),
+        "numpy_loaded": any(t["numpy_loaded"] for t in timings),
+        "process_with_addon": statistics.median(with_addon),
+        "process_without_addon": statistics.median(without_addon),
+    }
+
+
+# funkce pro spuštění celého benchmarku uvnitř Blenderu
+def run_benchmark(args):
+    import bpy
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import vertex_color_tool as addon
+
+    startup = None
+    if not args.no_startup:
+        startup = measure_startup(bpy.app.binary_path, args.repeat)
+        print(f"startup: import {startup['import'] * 1000.0:.1f} ms, register {startup['register'] * 1000.0:.1f} ms, "
+              f"numpy loaded: {startup['numpy_loaded']}, process {startup['process_without_addon']:.2f} s -> "
+              f"{startup['process_with_addon']:.2f} s")
+
+    addon.register()
+    override = get_view3d_override(bpy.context)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="vtx_bench_") as temp_dir:
+        for kind in args.meshes:
+            for corners in args.corners:
+                for density in args.densities:
+                    results.extend(bench_mesh(addon, override, kind, corners, density, args, temp_dir))
+    clear_bench_data(addon)
+
+    return {
+        "environment": {
+            "blender": bpy.app.version_string,
+            "addon": list(addon.bl_info["version"]),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "peak_rss_reset": reset_peak_rss(),
+        },
+        "settings": {
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "startup": startup,
+        "results": results,
+    }
+
+
+# funkce pro klíč případu, podle kterého se páruje s baseline
+def result_key(result):
+    return f"{result['mesh']}/{result['target_corners']}/{result['density']:g}/{result['operator']}/{result['path']}"
+
+
+# funkce pro porovnání výsledků s baseline
+def compare_results(results, baseline, threshold, min_delta, min_memory):
+    base = {result_key(r): r for r in baseline["results"] if r["status"] == 'ok'}
+    comparison = []
+
+    for result in results:
+        key = result_key(result)
+        base_result = base.get(key)
+        if base_result is None or result["status"] != 'ok':
+            continue
+
+        reasons = []
+        time_delta = result["time"] - base_result["time"]
+        if time_delta > min_delta and time_delta > base_result["time"] * threshold:
+            reasons.append('time')
+
+        memory_delta = result["peak_rss_growth"] - base_result["peak_rss_growth"]
+        if memory_delta > min_memory and memory_delta > base_result["peak_rss_growth"] * threshold:
+            reasons.append('memory')
+
+        comparison.append({
+            "key": key,
+            "time": result["time"],
+            "baseline_time": base_result["time"],
+            "ratio": result["time"] / base_result["time"] if base_result["time"] > 0.0 else None,
+            "peak_rss_growth": result["peak_rss_growth"],
+            "baseline_peak_rss_growth": base_result["peak_rss_growth"],
+            "regressions": reasons,
+        })
+
+    missing = sorted(set(base) - {result_key(r) for r in results if r["status"] == 'ok'})
+    return comparison, missing
+
+
+# funkce pro výpis porovnání
+def print_comparison(comparison, missing):
+    for row in comparison:
+        ratio = f"{row['ratio']:6.2f}x" if row["ratio"] is not None else "     -"
+        flag = "  REGRESSION (" + ", ".join(row["regressions"]) + ")" if row["regressions"] else ""
+        print(f"  {row['key']:<48} {row['baseline_time'] * 1000.0:10.2f} -> {row['time'] * 1000.0:10.2f} ms"
+              f" {ratio}{flag}")
+    for key in missing:
+        print(f"  {key:<48} missing in this run")
+
+    regressions = [row for row in comparison if row["regressions"]]
+    print(f"Vertex Color Bench: {len(comparison)} cases compared, {len(regressions)} regressions.")
+    return regressions
+
+
+# funkce pro zpracování argumentů (v Blenderu se berou argumenty za '--')
+def parse_args(argv):
+    if argv is None:
+        argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+
+    parser = argparse.ArgumentParser(description="Benchmark of the Vertex Color Tool operators.")
+    parser.add_argument("--meshes", nargs="+", choices=MESH_KINDS, default=list(MESH_KINDS),
+                        help="Synthetic mesh kinds")
+    parser.add_argument("--corners", nargs="+", type=int, default=list(DEFAULT_CORNERS),
+                        help="Target corner counts")
+    parser.add_argument("--densities", nargs="+", type=float, default=list(DEFAULT_DENSITIES),
+                        help="Fractions of selected vertices")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help="Timed calls per case, the fastest one is reported")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the mesh noise and selection")
+    parser.add_argument("--no-blend-size", action="store_true",
+                        help="Do not save .blend copies to measure the file size delta")
+    parser.add_argument("--no-startup", action="store_true",
+                        help="Skip the addon startup measurement in a fresh Blender process")
+    parser.add_argument("--output", default=None, help="Result output (.json)")
+    parser.add_argument("--input", default=None,
+                        help="Compare an existing result file instead of running the benchmark")
+    parser.add_argument("--compare", default=None, help="Baseline result file (.json)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Relative slowdown / memory growth flagged as regression")
+    parser.add_argument("--min-delta", type=float, default=DEFAULT_MIN_DELTA,
+                        help="Absolute slowdown in seconds below which nothing is flagged")
+    parser.add_argument("--min-memory", type=int, default=DEFAULT_MIN_MEMORY,
+                        help="Absolute peak RSS growth in bytes below which nothing is flagged")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.input:
+        with open(args.input, encoding="utf-8") as f:
+            report = json.load(f)
+    else:
+        try:
+            import bpy  # noqa: F401
+        except ImportError:
+            sys.exit("Run inside Blender (blender -b --factory-startup -P vertex_color_bench.py -- ...) or use --input.")
+        report = run_benchmark(args)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        comparison, missing = compare_results(
+            report["results"], baseline, args.threshold, args.min_delta, args.min_memory
+        )
+        report["comparison"] = {
+            "baseline": os.path.abspath(args.compare),
+            "threshold": args.threshold,
+            "cases": comparison,
+            "missing": missing,
+        }
+        regressions = print_comparison(comparison, missing)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Vertex Color Bench: results written to '{args.output}'.")
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -19,8 +19,47 @@ bl_info = {
 }
 
 
+import time
+_IMPORT_START = time.perf_counter()
+
 import bpy
-import bmesh
+import os
+import sys
+import importlib
+from collections import OrderedDict, deque
+from contextlib import nullcontext
+from mathutils.bvhtree import BVHTree
+from mathutils.kdtree import KDTree
+
+
+# časy importu, registrace a odložených importů v sekundách (get_startup_timings)
+_startup_timings = {}
+
+
+# třída pro odložený import modulu (numpy, bmesh, json se načtou až při prvním použití)
+class LazyModule:
+    __slots__ = ("_name", "_alias")
+
+    def __init__(self, name, alias):
+        self._name = name
+        self._alias = alias
+
+    def __getattr__(self, attribute):
+        return getattr(load_lazy_module(self), attribute)
+
+
+# pomocná funkce pro načtení odloženého modulu, proxy v globals se nahradí skutečným modulem
+def load_lazy_module(proxy):
+    start = time.perf_counter()
+    module = importlib.import_module(proxy._name)
+    globals()[proxy._alias] = module
+    _startup_timings[f"import_{proxy._name}"] = time.perf_counter() - start
+    return module
+
+
+np = LazyModule("numpy", "np")
+bmesh = LazyModule("bmesh", "bmesh")
+json = LazyModule("json", "json")
 
 
 COLOR_ATTRIBUTE_NAME = "colorset1"
@@ -34,6 +73,56 @@ DESC_PREPARE = "Create and assign vertex color material with color attribute to
 DESC_APPLY = "Apply selected color to selected vertices in Edit Mode"
 DESC_BRIGHTNESS = "Adjust brightness of selected vertices (0.0 = black, 1.0 = original)."
 DESC_TOGGLE = "Toggle between Solid shading mode and Vertex Color display"
+DESC_ADJUST = "Adjust colors of selected vertices (hue/saturation/value, contrast, gamma, blend with picker color)"
+DESC_BRIGHTNESS_PREVIEW = "Preview brightness live while dragging the slider (Enter = apply, Esc = cancel)"
+DESC_GRADIENT = "Fill selected vertices with a color ramp gradient (linear, axis, radial or distance from the 3D cursor)"
+DESC_GRADIENT_STOP_ADD = "Add a gradient stop with the current picker color"
+DESC_GRADIENT_STOP_REMOVE = "Remove the gradient stop"
+DESC_BAKE = "Bake cavity, curvature, ambient occlusion or thickness from the mesh into the color attribute (Esc = cancel)"
+DESC_CONVERT_DOMAIN = "Convert the color attribute to the chosen domain and type (corners are averaged per vertex when converting to Point)"
+DESC_LIST_COLORS = "Build the color index of the active mesh and list its distinct colors with corner counts"
+DESC_SELECT_BY_COLOR = "Select vertices or faces whose color matches within the tolerance"
+DESC_REPLACE_COLOR = "Replace a color with the picker color on the whole mesh"
+DESC_TRANSFER = "Transfer colors from the other selected mesh onto the active mesh (nearest vertex or nearest surface point)"
+DESC_PALETTE_ADD = "Add the current picker color to the palette"
+DESC_PALETTE_REMOVE = "Remove the palette entry"
+DESC_PALETTE_PICK = "Set the color picker to the palette entry"
+DESC_PALETTE_EXPORT = "Save the palette as JSON or as a Palette datablock in a .blend library"
+DESC_PALETTE_IMPORT = "Load palette entries from JSON or from the Palette datablocks of a .blend file"
+DESC_PALETTE_MAP = "Color every material slot, face set, UV island or vertex group with its own palette entry in one pass"
+DESC_HISTORY_UNDO = "Undo or redo the last step of the lightweight color history"
+DESC_STREAM = "Apply a color, brightness or pipeline to huge meshes window by window with progress (Esc = cancel)"
+DESC_WEIGHTED_PAINT = "Paint the picker color or brightness with a strength taken from a vertex group, float attribute or color mask"
+DESC_FILTER = "Smooth, sharpen, dilate or erode the colors of selected vertices over the mesh edges"
+DESC_COLORS_EXPORT = "Export the color attribute with its topology fingerprint to a .npy file (or every mesh into a folder)"
+DESC_COLORS_IMPORT = "Import the color attribute from a .npy file with a matching topology fingerprint (or every file of a folder by mesh name)"
+DESC_PROFILE_EXPORT = "Export recorded operator timings as JSON or Chrome trace (chrome://tracing, Perfetto)"
+DESC_PROFILE_CLEAR = "Clear recorded operator timings"
+PREVIEW_INTERVAL = 1.0 / 60.0
+PREVIEW_STEP_TIME = 0.008
+PREVIEW_CHUNK_SIZE = 4096
+PROFILE_HISTORY_SIZE = 64
+BAKE_CHUNK_SIZE = 2048
+BAKE_INTERVAL = 0.1
+BAKE_STEP_TIME = 0.05
+BAKE_WORKER_MIN_RAYS = 1000000
+COLOR_INDEX_LEVELS = 255
+COLOR_LIST_LIMIT = 12
+FACE_SET_ATTRIBUTE = ".sculpt_face_set"
+UV_ISLAND_PRECISION = 1e-5
+PALETTE_FORMAT_VERSION = 1
+PALETTE_NAME = "vtx_color_palette"
+HISTORY_MATCH_TOLERANCE = 0.01
+RELOAD_STATE_VERSION = 4
+STREAM_BYTES_PER_ELEMENT = 128
+STREAM_MIN_WINDOW = 4096
+STREAM_INTERVAL = 0.05
+COLOR_FILTERS = ('SMOOTH', 'SHARPEN', 'DILATE', 'ERODE')
+FILTER_MIN_CHUNK = 65536
+COLOR_FILE_VERSION = 1
+COLOR_FILE_EXTENSION = ".npy"
+BACKGROUND_INTERVAL = 0.05
+BACKGROUND_CHUNK_SIZE = 65536
 
 
 # funkce pro vytvoření materiálu s color attribute
@@ -71,182 +160,4271 @@ def create_vtx_color_material():
     return mat, material_created
 
 
-# pomocná funkce pro práci s vertex colors
-def apply_vertex_color_operation(context, operation_callback, operation_name):
-    obj = context.active_object
-    
-    if not obj or obj.type != MESH_TYPE:
-        return ('CANCELLED', 'ERROR', "No active mesh object.")
-    
-    mesh = obj.data
-    
-    if not validate_color_attribute(mesh):
-        return ('CANCELLED', 'ERROR', ERROR_MSG_ATTRIBUTE)
-    
-    if obj.mode != 'EDIT':
-        return ('CANCELLED', 'ERROR', f"Must be in Edit Mode to apply {operation_name}.")
-    
-    original_mode = obj.mode
-    
-    if obj.mode != 'OBJECT':
-        bpy.ops.object.mode_set(mode='OBJECT')
-    
-    bm = bmesh.new()
-    try:
-        bm.from_mesh(mesh)
-        bm.verts.ensure_lookup_table()
-        
-        if COLOR_ATTRIBUTE_NAME not in mesh.color_attributes:
-            return ('CANCELLED', 'ERROR', ERROR_MSG_ATTRIBUTE)
-        color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
-    except Exception as e:
-        bm.free()
-        return ('CANCELLED', 'ERROR', f"Failed to access mesh data: {str(e)}")
-    
-    modified_count = 0
-    
-    try:
-        for face in bm.faces:
-            for loop in face.loops:
-                if loop.vert.select:
-                    loop_index = loop.index
-                    current_color = color_layer.data[loop_index].color
-
-                    new_color = operation_callback(current_color, loop_index, context)
-                    
-                    color_layer.data[loop_index].color = new_color
-                    modified_count += 1
-    finally:
-        bm.free()
-        
-        mesh.update()
-        
-        try:
-            if obj and obj.mode != original_mode:
-                bpy.ops.object.mode_set(mode=original_mode)
-        except Exception as e:
-            print(f"Warning: Could not restore mode: {str(e)}")
-    
-    for area in context.screen.areas:
-        if area.type == 'VIEW_3D':
-            area.tag_redraw()
-    
-    if modified_count > 0:
-        return ('FINISHED', 'INFO', f"{operation_name} applied to {modified_count} vertices.")
+# třída pro záznam časů fází jednoho volání operátoru
+class ProfileRecord:
+    __slots__ = ("operation", "start", "total", "phases", "meshes", "corners", "bytes_moved")
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.start = time.perf_counter()
+        self.total = 0.0
+        self.phases = []
+        self.meshes = []
+        self.corners = 0
+        self.bytes_moved = 0
+
+    def phase_totals(self):
+        totals = {}
+        for name, start, duration in self.phases:
+            totals[name] = totals.get(name, 0.0) + duration
+        return totals
+
+    def to_dict(self):
+        return {
+            "operation": self.operation,
+            "total": self.total,
+            "phases": self.phase_totals(),
+            "meshes": [
+                {"objects": name, "corners": corners, "time": duration}
+                for name, start, duration, corners in self.meshes
+            ],
+            "corners": self.corners,
+            "bytes_moved": self.bytes_moved,
+        }
+
+
+# třída pro měření jedné fáze (používá se jen při zapnutém profilování)
+class ProfilePhase:
+    __slots__ = ("record", "name", "start")
+
+    def __init__(self, record, name):
+        self.record = record
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.record.phases.append((self.name, self.start, time.perf_counter() - self.start))
+        return False
+
+
+# ring buffer posledních záznamů a právě měřený záznam (None = profilování neběží)
+_profile_history = deque(maxlen=PROFILE_HISTORY_SIZE)
+_active_profile = None
+_NULL_PHASE = nullcontext()
+
+
+# pomocná funkce pro zahájení měření operace (jen při zapnutém profilování)
+def begin_profile(context, operation_name):
+    global _active_profile
+    if context.scene.vtx_profile_enabled:
+        _active_profile = ProfileRecord(operation_name)
+    return _active_profile
+
+
+# pomocná funkce pro ukončení měření a uložení záznamu do ring bufferu
+def end_profile():
+    global _active_profile
+    record = _active_profile
+    if record is not None:
+        record.total = time.perf_counter() - record.start
+        _profile_history.append(record)
+        _active_profile = None
+    return record
+
+
+# pomocná funkce pro měření fáze: with profile_phase("compute"): ...
+def profile_phase(name):
+    if _active_profile is None:
+        return _NULL_PHASE
+    return ProfilePhase(_active_profile, name)
+
+
+# pomocná funkce pro započtení zpracovaných rohů a přenesených bajtů
+def profile_count(corners=0, bytes_moved=0):
+    if _active_profile is not None:
+        _active_profile.corners += corners
+        _active_profile.bytes_moved += bytes_moved
+
+
+# pomocná funkce pro záznam času a počtu rohů jednoho meshe operace nad více meshi
+def profile_mesh(name, start, corners):
+    if _active_profile is not None:
+        _active_profile.meshes.append((name, start, time.perf_counter() - start, corners))
+
+
+# pomocná funkce pro export záznamů jako JSON
+def export_profile_json(path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([record.to_dict() for record in _profile_history], f, indent=2)
+
+
+# pomocná funkce pro export záznamů ve formátu Chrome trace (časy v mikrosekundách)
+def export_profile_trace(path):
+    pid = os.getpid()
+    events = []
+    for record in _profile_history:
+        events.append({
+            "name": record.operation,
+            "cat": "operator",
+            "ph": "X",
+            "ts": record.start * 1e6,
+            "dur": record.total * 1e6,
+            "pid": pid,
+            "tid": 0,
+            "args": {"corners": record.corners, "bytes_moved": record.bytes_moved},
+        })
+        for name, start, duration in record.phases:
+            events.append({
+                "name": name,
+                "cat": "phase",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": 0,
+            })
+        for name, start, duration, corners in record.meshes:
+            events.append({
+                "name": name,
+                "cat": "mesh",
+                "ph": "X",
+                "ts": start * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": 1,
+                "args": {"corners": corners},
+            })
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+# pomocná funkce pro hromadné načtení výběru vertexů
+def read_vertex_selection(mesh):
+    vert_select = np.zeros(len(mesh.vertices), dtype=bool)
+    mesh.vertices.foreach_get("select", vert_select)
+    profile_count(bytes_moved=vert_select.nbytes)
+    return vert_select
+
+
+# pomocná funkce pro hromadné načtení mapy roh (loop) -> vertex
+def read_loop_vertices(mesh):
+    loop_verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_verts)
+    profile_count(bytes_moved=loop_verts.nbytes)
+    return loop_verts
+
+
+# pomocná funkce pro hromadné načtení pozic vertexů do pole (N, 3)
+def read_vertex_positions(mesh):
+    positions = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", positions)
+    profile_count(bytes_moved=positions.nbytes)
+    return positions.reshape(-1, 3)
+
+
+# pomocná funkce pro hromadné načtení normál vertexů do pole (N, 3)
+def read_vertex_normals(mesh):
+    normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertex_normals.foreach_get("vector", normals)
+    profile_count(bytes_moved=normals.nbytes)
+    return normals.reshape(-1, 3)
+
+
+# pomocná funkce pro hromadné načtení trojúhelníků meshe jako trojic vertexů (N, 3)
+def read_triangle_vertices(mesh):
+    mesh.calc_loop_triangles()
+    triangles = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", triangles)
+    profile_count(bytes_moved=triangles.nbytes)
+    return triangles.reshape(-1, 3)
+
+
+# pomocná funkce pro hromadné načtení hran jako pole dvojic vertexů (N, 2)
+def read_edge_vertices(mesh):
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int32)
+    mesh.edges.foreach_get("vertices", edges)
+    profile_count(bytes_moved=edges.nbytes)
+    return edges.reshape(-1, 2)
+
+
+# pomocná funkce pro indexy všech rohů meshe
+def get_all_corner_indices(mesh):
+    return np.arange(len(mesh.loops), dtype=np.int32)
+
+
+# pomocná funkce pro domain color attribute ('CORNER' nebo 'POINT')
+def get_color_domain(mesh):
+    return mesh.color_attributes[COLOR_ATTRIBUTE_NAME].domain
+
+
+# pomocná funkce pro indexy všech prvků color attribute (rohy nebo vertexy podle domain)
+def get_all_element_indices(mesh):
+    count = len(mesh.vertices) if get_color_domain(mesh) == 'POINT' else len(mesh.loops)
+    return np.arange(count, dtype=np.int32)
+
+
+# pomocná funkce pro hromadné načtení barev z color attribute do pole (N, 4)
+def read_color_attribute(color_layer):
+    colors = np.empty(len(color_layer.data) * 4, dtype=np.float32)
+    color_layer.data.foreach_get("color", colors)
+    profile_count(bytes_moved=colors.nbytes)
+    return colors.reshape(-1, 4)
+
+
+# pomocná funkce pro hromadný zápis barev z pole (N, 4) do color attribute
+def write_color_attribute(color_layer, colors):
+    color_layer.data.foreach_set("color", colors.ravel())
+    profile_count(bytes_moved=colors.nbytes)
+
+
+# pomocná funkce pro převod lineárních barev (N, 4) do sRGB, alfa zůstává
+def linear_to_srgb(colors):
+    result = colors.copy()
+    rgb = np.clip(colors[:, :3], 0.0, None)
+    result[:, :3] = np.where(rgb < 0.0031308, rgb * 12.92, 1.055 * np.power(rgb, 1.0 / 2.4) - 0.055)
+    return result
+
+
+# pomocná funkce pro převod sRGB barev (N, 4) na lineární, alfa zůstává
+def srgb_to_linear(colors):
+    result = colors.copy()
+    rgb = colors[:, :3]
+    result[:, :3] = np.where(rgb <= 0.04045, rgb / 12.92, np.power((rgb + 0.055) / 1.055, 2.4))
+    return result
+
+
+# pomocná funkce pro prvky edit meshe daného domain v pořadí mesh dat (None = všechny prvky)
+def get_edit_mesh_elements(mesh, domain, element_indices=None):
+    """
+    V Edit Mode míří attributes meshe na vrstvy BMesh a jejich data přes RNA číst nejdou
+    (délka 0 i po update_from_editmode), čte a zapisuje se proto po prvcích BMesh.
+    Pořadí prvků odpovídá indexům mesh dat jen hned po update_from_editmode.
+    Vrací (prvky, layers jejich sekvence).
+    """
+    bm = bmesh.from_edit_mesh(mesh)
+    if domain == 'CORNER':
+        if element_indices is None:
+            return [loop for face in bm.faces for loop in face.loops], bm.loops.layers
+        loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_starts)
+        face_indices = np.searchsorted(loop_starts, element_indices, side='right') - 1
+        offsets = element_indices - loop_starts[face_indices]
+        bm.faces.ensure_lookup_table()
+        faces = bm.faces
+        return [faces[f].loops[o] for f, o in zip(face_indices.tolist(), offsets.tolist())], bm.loops.layers
+
+    sequence = {'POINT': bm.verts, 'EDGE': bm.edges, 'FACE': bm.faces}[domain]
+    if element_indices is None:
+        return list(sequence), sequence.layers
+    sequence.ensure_lookup_table()
+    return [sequence[i] for i in element_indices.tolist()], sequence.layers
+
+
+# třída pro čtení a zápis barev prvků color attribute přímo v edit meshi (bez přestavby a mode_set)
+class EditMeshColors:
+    """
+    Prvky BMesh (vybrané nebo všechny) se vyhledají jednou a čtení i zápis procházejí jen je,
+    práce v Pythonu tak roste s počtem prvků, ne s velikostí meshe. Vrstvy BYTE_COLOR drží
+    v BMesh hodnoty v sRGB, barvy se proto převádějí stejně jako u foreach_get("color").
+    """
+    __slots__ = ("mesh", "elements", "layer", "srgb")
+
+    def __init__(self, mesh, element_indices=None, name=COLOR_ATTRIBUTE_NAME):
+        self.elements, layers = get_edit_mesh_elements(mesh, mesh.color_attributes[name].domain, element_indices)
+        self.mesh = mesh
+        self.layer = layers.float_color.get(name)
+        self.srgb = self.layer is None
+        if self.srgb:
+            self.layer = layers.color[name]
+
+    def read(self):
+        layer = self.layer
+        colors = np.array([element[layer][:] for element in self.elements], dtype=np.float32).reshape(-1, 4)
+        profile_count(bytes_moved=colors.nbytes)
+        return srgb_to_linear(colors) if self.srgb else colors
+
+    # zapíše barvy prvků od indexu start (výchozí = všechny prvky)
+    def write(self, colors, start=0):
+        layer = self.layer
+        values = linear_to_srgb(colors) if self.srgb else colors
+        elements = self.elements if start == 0 and len(colors) == len(self.elements) else \
+            self.elements[start:start + len(colors)]
+        for element, color in zip(elements, values.tolist()):
+            element[layer] = color
+        bmesh.update_edit_mesh(self.mesh, loop_triangles=False, destructive=False)
+        profile_count(bytes_moved=colors.nbytes)
+
+
+# pomocná funkce pro všechny barvy color attribute v Object i Edit Mode (edit mesh musí být synchronizovaný)
+def read_mesh_colors(mesh, name=COLOR_ATTRIBUTE_NAME):
+    if mesh.is_editmode:
+        return EditMeshColors(mesh, None, name).read()
+    return read_color_attribute(mesh.color_attributes[name])
+
+
+# pomocná funkce pro barvy vybraných prvků color attribute v Object i Edit Mode
+def read_element_colors(mesh, element_indices):
+    if mesh.is_editmode:
+        return EditMeshColors(mesh, element_indices).read()
+    return read_color_attribute(mesh.color_attributes[COLOR_ATTRIBUTE_NAME])[element_indices]
+
+
+# třída pro uložení původních barev vybraných rohů před úpravou jasu
+class ColorSnapshot:
+    __slots__ = ("corner_indices", "colors", "fingerprint")
+
+    def __init__(self, corner_indices, colors, fingerprint):
+        self.corner_indices = corner_indices
+        self.colors = colors
+        self.fingerprint = fingerprint
+
+
+# snapshoty původních barev podle (mesh, attribute), drženy pouze v paměti
+_color_snapshots = {}
+
+
+# pomocná funkce pro klíč meshe, který přežije přejmenování
+def get_mesh_key(mesh):
+    return mesh.session_uid
+
+
+# pomocná funkce pro otisk topologie meshe
+def get_topology_fingerprint(mesh):
+    return (len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons))
+
+
+# pomocná funkce pro načtení platného snapshotu (None při změně topologie nebo výběru)
+def get_color_snapshot(mesh, attribute_name, corner_indices):
+    snapshot = _color_snapshots.get((get_mesh_key(mesh), attribute_name))
+    if snapshot is None:
+        return None
+
+    same_selection = (
+        snapshot.corner_indices is corner_indices
+        or np.array_equal(snapshot.corner_indices, corner_indices)
+    )
+    if snapshot.fingerprint != get_topology_fingerprint(mesh) or not same_selection:
+        invalidate_color_snapshot(mesh, attribute_name)
+        return None
+
+    return snapshot
+
+
+# pomocná funkce pro uložení snapshotu (float32 RGB + int32 indexy rohů)
+def store_color_snapshot(mesh, attribute_name, corner_indices, colors):
+    snapshot = ColorSnapshot(
+        np.asarray(corner_indices, dtype=np.int32),
+        np.array(colors[:, :3], dtype=np.float32),
+        get_topology_fingerprint(mesh),
+    )
+    _color_snapshots[(get_mesh_key(mesh), attribute_name)] = snapshot
+    return snapshot
+
+
+# pomocná funkce pro explicitní zneplatnění snapshotů (bez argumentů smaže vše)
+def invalidate_color_snapshot(mesh=None, attribute_name=COLOR_ATTRIBUTE_NAME):
+    if mesh is None:
+        _color_snapshots.clear()
     else:
-        return ('FINISHED', 'WARNING', "No vertices selected.")
-    
+        _color_snapshots.pop((get_mesh_key(mesh), attribute_name), None)
 
-# pomocná funkce pro získání 3D viewport shadingu
-def get_viewport_shading(context):
-    """získá shading objekt z aktivního 3D viewportu"""
-    for area in context.screen.areas:
-        if area.type == 'VIEW_3D':
-            for space in area.spaces:
-                if space.type == 'VIEW_3D':
-                    return space.shading
-    return None
 
+# třída pro cache mapování výběru vertexů na seřazené indexy rohů a vertexů jednoho meshe
+class SelectionIndex:
+    __slots__ = ("fingerprint", "loop_verts", "vert_select", "corner_indices", "vert_indices")
 
-# pomocná funkce pro získání shading typu
-def get_viewport_shading_type(context, property_name, default_value):
-    shading = get_viewport_shading(context)
-    if shading and hasattr(shading, property_name):
-        return getattr(shading, property_name, default_value)
-    return default_value
+    def __init__(self, fingerprint, vert_select):
+        self.fingerprint = fingerprint
+        self.loop_verts = None
+        self.vert_select = vert_select
+        self.corner_indices = None
+        self.vert_indices = None
 
 
-# pomocná funkce pro kontrolu zda je vertex color toggle dostupný
-def is_vertex_toggle_enabled(context):
-    return get_viewport_shading_type(context, 'type', 'SOLID') == 'SOLID'
+# LRU cache indexů výběru podle meshe a meshe, do kterých tento addon zapsal od posledního
+# depsgraph cyklu (označení platí jen pro jeden cyklus, pak se zahodí i bez příchodu změny)
+SELECTION_CACHE_SIZE = 8
+_selection_cache = OrderedDict()
+_own_updates = set()
 
 
-# pomocná funkce pro validaci aktivního mesh objektu
-def validate_active_mesh_object(context):
-    obj = context.active_object
-    if not obj or obj.type != MESH_TYPE:
-        return None, "No active mesh object."
-    return obj, None
+# pomocná funkce pro aktuální záznam cache výběru meshe
+def get_selection_index(mesh):
+    """
+    Výběr vertexů se načítá vždy (je levný), mapa roh -> vertex se čte znovu jen
+    při změně topologie. Indexy rohů a vertexů se dopočítají až při prvním použití
+    a zahodí se při změně výběru.
+    """
+    key = get_mesh_key(mesh)
+    fingerprint = get_topology_fingerprint(mesh)
+    vert_select = read_vertex_selection(mesh)
 
+    entry = _selection_cache.get(key)
+    if entry is not None and entry.fingerprint == fingerprint:
+        _selection_cache.move_to_end(key)
+        if not np.array_equal(entry.vert_select, vert_select):
+            entry.vert_select = vert_select
+            entry.corner_indices = None
+            entry.vert_indices = None
+        return entry
 
-# pomocná funkce pro kontrolu color attribute
-def validate_color_attribute(mesh):
-    return COLOR_ATTRIBUTE_NAME in mesh.color_attributes
+    entry = SelectionIndex(fingerprint, vert_select)
+    _selection_cache[key] = entry
 
+    while len(_selection_cache) > SELECTION_CACHE_SIZE:
+        _selection_cache.popitem(last=False)
 
-# pomocná funkce pro kontrolu, zda je materiál připraven
-def validate_material_prepared(mesh):
+    return entry
 
-    mat_name = MATERIAL_NAME
-    for mat in mesh.materials:
-        if mat and mat.name == mat_name:
-            return True
-    return False
 
+# pomocná funkce pro indexy rohů vybraných vertexů s využitím cache
+def get_cached_corner_indices(mesh):
+    entry = get_selection_index(mesh)
+    if entry.corner_indices is None:
+        if entry.loop_verts is None:
+            entry.loop_verts = read_loop_vertices(mesh)
+        entry.corner_indices = np.flatnonzero(entry.vert_select[entry.loop_verts]).astype(np.int32)
+    return entry.corner_indices
 
-# pomocná funkce pro kompletní validaci před aplikací vertex operací
-def validate_for_vertex_operation(context):
 
-    obj, error = validate_active_mesh_object(context)
-    if error:
-        return False, 'ERROR', error
-    
-    mesh = obj.data
-    
-    if not validate_material_prepared(mesh):
-        return False, 'ERROR', ERROR_MSG_MATERIAL
-    
-    return True, None, None
+# pomocná funkce pro indexy vybraných vertexů s využitím cache
+def get_cached_vertex_indices(mesh):
+    entry = get_selection_index(mesh)
+    if entry.vert_indices is None:
+        entry.vert_indices = np.flatnonzero(entry.vert_select).astype(np.int32)
+    return entry.vert_indices
+
+
+# pomocná funkce pro indexy vybraných prvků podle domain color attribute
+def get_cached_element_indices(mesh, domain):
+    if domain == 'POINT':
+        return get_cached_vertex_indices(mesh)
+    return get_cached_corner_indices(mesh)
+
+
+# pomocná funkce pro zneplatnění cache výběru (bez argumentů smaže vše)
+def invalidate_selection_cache(mesh=None):
+    if mesh is None:
+        _selection_cache.clear()
+        _own_updates.clear()
+    else:
+        _selection_cache.pop(get_mesh_key(mesh), None)
+
+
+# pomocná funkce pro mapu roh -> vertex z cache výběru (bez cache se načte znovu)
+def get_cached_loop_vertices(mesh):
+    entry = _selection_cache.get(get_mesh_key(mesh))
+    if entry is None or entry.fingerprint != get_topology_fingerprint(mesh):
+        return read_loop_vertices(mesh)
+    if entry.loop_verts is None:
+        entry.loop_verts = read_loop_vertices(mesh)
+    return entry.loop_verts
+
+
+# pomocná funkce pro vertexy prvků color attribute (u POINT domain jsou indexy přímo vertexy)
+def get_element_vertices(mesh, element_indices):
+    if get_color_domain(mesh) == 'POINT':
+        return element_indices
+    return get_cached_loop_vertices(mesh)[element_indices]
+
+
+# pomocná funkce pro unikátní vertexy prvků a mapu prvek -> pozice v tomto seznamu
+def get_used_vertices(mesh, element_indices):
+    element_verts = get_element_vertices(mesh, element_indices)
+    used = np.zeros(len(mesh.vertices), dtype=bool)
+    used[element_verts] = True
+    used_verts = np.flatnonzero(used)
+    lookup = np.empty(len(mesh.vertices), dtype=np.int32)
+    lookup[used_verts] = np.arange(len(used_verts), dtype=np.int32)
+    return used_verts, lookup[element_verts]
+
+
+# třída pro index barev jednoho meshe (kvantované RGBA klíče, unikátní barvy a počty)
+class ColorIndex:
+    __slots__ = ("fingerprint", "domain", "inverse", "colors", "counts", "order")
+
+    def __init__(self, fingerprint, domain, inverse, colors, counts):
+        self.fingerprint = fingerprint
+        self.domain = domain
+        self.inverse = inverse
+        self.colors = colors
+        self.counts = counts
+        self.order = None
+
+    def most_common(self, limit):
+        """Indexy nejčastějších barev (pořadí se spočítá jednou, panel ho čte při každém překreslení)."""
+        if self.order is None:
+            self.order = np.argsort(self.counts, kind='stable')[::-1]
+        return self.order[:limit]
+
+    def match(self, color, tolerance):
+        """Maska unikátních barev, jejichž RGB se od color liší nejvýš o tolerance v každém kanálu."""
+        target = np.asarray(color[:3], dtype=np.float32)
+        limit = tolerance + 0.5 / COLOR_INDEX_LEVELS
+        return np.all(np.abs(self.colors[:, :3] - target) <= limit, axis=1)
+
+    def element_mask(self, color, tolerance):
+        return self.match(color, tolerance)[self.inverse]
+
+
+# cache indexů barev podle meshe, zahazuje se při každém zápisu barev
+_color_index_cache = {}
+
+
+# pomocná funkce pro kvantování barev (N, 4) na 8 bitů na kanál zabalených do uint32
+def quantize_colors(colors):
+    levels = np.clip(np.rint(colors * COLOR_INDEX_LEVELS), 0, COLOR_INDEX_LEVELS).astype(np.uint32)
+    return (levels[:, 0] << 24) | (levels[:, 1] << 16) | (levels[:, 2] << 8) | levels[:, 3]
+
+
+# pomocná funkce pro převod kvantovaných klíčů zpět na barvy (N, 4)
+def dequantize_colors(keys):
+    shifts = np.array([24, 16, 8, 0], dtype=np.uint32)
+    return ((keys[:, None] >> shifts) & 0xFF).astype(np.float32) / COLOR_INDEX_LEVELS
+
+
+# pomocná funkce pro index barev meshe s využitím cache (mesh data musí být aktuální)
+def get_color_index(mesh):
+    key = get_mesh_key(mesh)
+    fingerprint = get_topology_fingerprint(mesh)
+    color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
+
+    index = _color_index_cache.get(key)
+    if index is not None and index.fingerprint == fingerprint and index.domain == color_layer.domain:
+        return index
+
+    keys, inverse, counts = np.unique(
+        quantize_colors(read_mesh_colors(mesh)), return_inverse=True, return_counts=True
+    )
+    index = ColorIndex(fingerprint, color_layer.domain, inverse.astype(np.int32), dequantize_colors(keys), counts)
+    _color_index_cache[key] = index
+    return index
+
+
+# pomocná funkce pro cachovaný index bez přestavby (pro panel), None pokud neexistuje
+def peek_color_index(mesh):
+    index = _color_index_cache.get(get_mesh_key(mesh))
+    if index is None or index.fingerprint != get_topology_fingerprint(mesh):
+        return None
+    return index
+
+
+# pomocná funkce pro zneplatnění indexů barev (bez argumentů smaže vše)
+def invalidate_color_index(mesh=None):
+    if mesh is None:
+        _color_index_cache.clear()
+    else:
+        _color_index_cache.pop(get_mesh_key(mesh), None)
+
+
+# pomocná funkce pro označení změny dat provedené addonem (volá se až po zápisu, nezneplatní
+# cache v nejbližším depsgraph cyklu)
+def mark_own_update(mesh):
+    key = get_mesh_key(mesh)
+    _own_updates.add(key)
+    _color_index_cache.pop(key, None)
+
+
+# cache stavu připravenosti meshů (materiál, color attribute) a shadingu obrazovek pro panel
+_readiness_cache = {}
+_shading_cache = {}
+_msgbus_owner = object()
+
+
+# pomocná funkce pro stav připravenosti meshe: (materiál přiřazen, color attribute existuje)
+def get_mesh_readiness(mesh):
+    key = get_mesh_key(mesh)
+    state = _readiness_cache.get(key)
+    if state is None:
+        state = (validate_material_prepared(mesh), validate_color_attribute(mesh))
+        _readiness_cache[key] = state
+    return state
+
+
+# pomocná funkce pro stav shadingu 3D viewportu aktuální obrazovky: (type, color_type)
+def get_cached_shading_state(context):
+    key = context.screen.as_pointer() if context.screen else None
+    state = _shading_cache.get(key)
+    if state is None:
+        shading = get_viewport_shading(context)
+        state = (shading.type, shading.color_type) if shading else ('SOLID', 'MATERIAL')
+        _shading_cache[key] = state
+    return state
+
+
+# pomocná funkce pro zneplatnění cache panelu (bez argumentů smaže vše)
+def invalidate_panel_cache(mesh=None):
+    if mesh is None:
+        _readiness_cache.clear()
+        _shading_cache.clear()
+    else:
+        _readiness_cache.pop(get_mesh_key(mesh), None)
+
+
+# callback msgbus pro změnu shadingu nebo typu oblasti
+def invalidate_shading_cache(*args):
+    _shading_cache.clear()
+
+
+# pomocná funkce pro odběr změn shadingu a oblastí přes msgbus (po načtení souboru se musí obnovit)
+def subscribe_shading_updates():
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    for key in ((bpy.types.View3DShading, "type"),
+                (bpy.types.View3DShading, "color_type"),
+                (bpy.types.Area, "type"),
+                (bpy.types.Area, "ui_type")):
+        bpy.msgbus.subscribe_rna(key=key, owner=_msgbus_owner, args=(), notify=invalidate_shading_cache)
+
+
+# handler pro zneplatnění cache výběru po změně geometrie nebo výběru mimo addon
+@bpy.app.handlers.persistent
+def invalidate_caches_on_depsgraph_update(scene, depsgraph):
+    # označení vlastních zápisů platí jen pro tento cyklus, jinak by nedorazivší změna
+    # (nic se nezapsalo, sloučené updaty, undo) umlčela příští cizí změnu
+    own_updates = set(_own_updates)
+    _own_updates.clear()
+
+    for update in depsgraph.updates:
+        id_data = update.id
+        if isinstance(id_data, bpy.types.Material):
+            _readiness_cache.clear()
+            continue
+        if isinstance(id_data, bpy.types.Object):
+            if id_data.type == MESH_TYPE:
+                _readiness_cache.pop(id_data.original.data.session_uid, None)
+            continue
+        if not isinstance(id_data, bpy.types.Mesh):
+            continue
+
+        key = id_data.original.session_uid
+        _readiness_cache.pop(key, None)
+        if not update.is_updated_geometry:
+            continue
+
+        if key not in own_updates:
+            _selection_cache.pop(key, None)
+            _color_index_cache.pop(key, None)
+            _transfer_cache.pop(key, None)
+            _adjacency_cache.pop(key, None)
+            _weight_cache.pop(key, None)
+            # barvy změněné jiným nástrojem už nejsou "původní" barvy pro úpravu jasu
+            invalidate_color_snapshot(id_data.original)
+
+
+# handler pro vyčištění cache panelu a snapshotů po undo/redo (data se obnoví bez depsgraph změn)
+@bpy.app.handlers.persistent
+def clear_panel_cache_on_undo(scene, *args):
+    invalidate_panel_cache()
+    invalidate_color_snapshot()
+
+
+# handler pro smazání vlastní historie barev po globálním undo/redo (kroky by mířily na jiný stav meshů)
+@bpy.app.handlers.persistent
+def clear_color_history_on_undo(scene, *args):
+    invalidate_color_history()
+
+
+# handler pro vyčištění cache po načtení jiného souboru
+@bpy.app.handlers.persistent
+def clear_caches_on_load(dummy):
+    invalidate_color_snapshot()
+    invalidate_selection_cache()
+    invalidate_color_index()
+    invalidate_transfer_cache()
+    invalidate_adjacency_cache()
+    invalidate_weight_cache()
+    invalidate_panel_cache()
+    invalidate_color_history()
+    subscribe_shading_updates()
+
+    # starší verze ukládaly původní barvy jako JSON řetězec do scény, v .blend by jen zabíral místo
+    for scene in bpy.data.scenes:
+        scene.pop("vtx_original_colors", None)
+
+
+# třída pro změnu barev jednoho meshe (jen změněné prvky, barvy před a po)
+class ColorDelta:
+    __slots__ = ("mesh_key", "fingerprint", "domain", "indices", "before", "after")
+
+    def __init__(self, mesh_key, fingerprint, domain, indices, before, after):
+        self.mesh_key = mesh_key
+        self.fingerprint = fingerprint
+        self.domain = domain
+        self.indices = indices
+        self.before = before
+        self.after = after
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.before.nbytes + self.after.nbytes
+
+
+# třída pro jeden krok historie (změny všech meshů jedné operace)
+class ColorHistoryStep:
+    __slots__ = ("name", "deltas", "nbytes")
+
+    def __init__(self, name):
+        self.name = name
+        self.deltas = []
+        self.nbytes = 0
+
+
+# vlastní undo/redo historie barev, nejstarší kroky se mažou po překročení limitu paměti
+_history_undo = deque()
+_history_redo = deque()
+_active_history_step = None
+
+
+# pomocná funkce pro zahájení záznamu kroku (jen při zapnuté Lightweight Undo), vrací True při záznamu
+def begin_color_history(context, name):
+    global _active_history_step
+    if context.scene.vtx_color_history:
+        _active_history_step = ColorHistoryStep(name)
+    return _active_history_step is not None
+
+
+# pomocná funkce pro uložení zaznamenaného kroku a ořezání historie na limit paměti
+def end_color_history(context):
+    global _active_history_step
+    step = _active_history_step
+    _active_history_step = None
+    if step is None or not step.deltas:
+        return None
+
+    _history_undo.append(step)
+    _history_redo.clear()
+    trim_color_history(context.scene.vtx_color_history_limit * 1048576)
+    return step
+
+
+# pomocná funkce pro uložení změněných prvků do aktivního kroku (volá se z compute_new_colors)
+def record_color_delta(mesh, corner_indices, before, after):
+    if _active_history_step is None:
+        return
+
+    changed = (before != after).any(axis=1)
+    if not changed.any():
+        return
+
+    delta = ColorDelta(
+        get_mesh_key(mesh),
+        get_topology_fingerprint(mesh),
+        get_color_domain(mesh),
+        np.asarray(corner_indices, dtype=np.int32)[changed],
+        np.array(before[changed], dtype=np.float32),
+        np.array(after[changed], dtype=np.float32),
+    )
+    _active_history_step.deltas.append(delta)
+    _active_history_step.nbytes += delta.nbytes
+
+
+# pomocná funkce pro paměť historie v bajtech
+def get_color_history_size():
+    return sum(step.nbytes for step in _history_undo) + sum(step.nbytes for step in _history_redo)
+
+
+# pomocná funkce pro ořezání historie, mažou se nejvzdálenější redo kroky a pak nejstarší undo kroky
+def trim_color_history(limit):
+    size = get_color_history_size()
+    while size > limit and _history_redo:
+        size -= _history_redo.popleft().nbytes
+    # poslední krok zůstává vždy, i když je sám větší než limit
+    while size > limit and len(_history_undo) > 1:
+        size -= _history_undo.popleft().nbytes
+
+
+# pomocná funkce pro smazání celé historie
+def invalidate_color_history():
+    _history_undo.clear()
+    _history_redo.clear()
+
+
+# pomocná funkce pro globální undo krok operátorů bez UNDO v bl_options (vrací True, pokud se zapsal)
+def push_global_undo(context, message):
+    # s Lightweight Undo jde krok jen do vlastní historie, globální undo by kopírovalo celý mesh
+    if context.scene.vtx_color_history:
+        return False
+    bpy.ops.ed.undo_push(message=message)
+    return True
+
+
+# pomocná funkce pro nalezení meshe podle klíče (None, pokud už neexistuje)
+def find_mesh_by_key(key):
+    return next((mesh for mesh in bpy.data.meshes if get_mesh_key(mesh) == key), None)
+
+
+# funkce pro kernel, který vrátí prvky kroku do stavu před (undo) nebo po (redo) operaci
+def compile_history_restore(delta, undo):
+    expected, target = (delta.after, delta.before) if undo else (delta.before, delta.after)
+
+    def history_restore_kernel(mesh, colors, corner_indices, context):
+        # barvy změněné mimo historii (globální undo, jiný nástroj) se nepřepisují
+        if not np.allclose(colors, expected, atol=HISTORY_MATCH_TOLERANCE):
+            raise ValueError(f"Colors of '{mesh.name}' were changed outside the color history.")
+        invalidate_color_snapshot(mesh)
+        return target.copy()
+
+    return history_restore_kernel
+
+
+# funkce pro provedení kroku historie na všech jeho meshích, vrací počet obnovených prvků
+def restore_color_history_step(context, step, undo):
+    restored = 0
+    for delta in step.deltas:
+        mesh = find_mesh_by_key(delta.mesh_key)
+        if (mesh is None or not validate_color_attribute(mesh)
+                or get_topology_fingerprint(mesh) != delta.fingerprint
+                or get_color_domain(mesh) != delta.domain):
+            raise ValueError("Mesh of the color history step was removed or changed.")
+
+        kernel = compile_history_restore(delta, undo)
+        if mesh.is_editmode:
+            edit_obj = next(o for o in bpy.data.objects if o.data == mesh and o.mode == 'EDIT')
+            restored += process_edit_mesh_colors(context, edit_obj, None, kernel, delta.indices)
+        else:
+            restored += process_mesh_colors(context, mesh, None, kernel, delta.indices)
+    return restored
+
+
+# funkce pro kernel rozdělený na přípravu (hlavní vlákno) a výpočet nad poli (libovolné vlákno)
+def split_kernel(prepare):
+    """
+    prepare(mesh, colors, corner_indices, context) načte z bpy vše, co výpočet potřebuje,
+    a vrátí compute(progress=None) bez přístupu k bpy, které vrací nové barvy. Vzniklý kernel
+    se volá jako každý jiný array_operation, BackgroundColorCompute volá prepare a compute
+    zvlášť a předá ComputeProgress; zrušený výpočet vrací None.
+    """
+    def kernel(mesh, colors, corner_indices, context):
+        return prepare(mesh, colors, corner_indices, context)()
+
+    kernel.prepare = prepare
+    kernel.__name__ = prepare.__name__
+    return kernel
+
+
+# třída pro průběh výpočtu jednoho meshe ve worker vlákně (hotové bloky, zrušení přes cancel_event)
+class ComputeProgress:
+    __slots__ = ("cancel_event", "done", "total")
+
+    def __init__(self, cancel_event):
+        self.cancel_event = cancel_event
+        self.done = 0
+        self.total = 0
+
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+
+# pomocná funkce pro výpočet po blocích prvků, compute_rows(rows) zpracuje řez rows
+def compute_in_chunks(count, compute_rows, progress=None):
+    """
+    Bez progress proběhne výpočet jedním voláním. S progress se mezi bloky
+    BACKGROUND_CHUNK_SIZE prvků kontroluje cancel_event a počítají hotové bloky.
+    Vrací False, pokud byl výpočet zrušen.
+    """
+    if progress is None:
+        compute_rows(slice(0, count))
+        return True
+
+    starts = range(0, count, BACKGROUND_CHUNK_SIZE)
+    progress.total = len(starts)
+    for start in starts:
+        if progress.cancel_event.is_set():
+            return False
+        compute_rows(slice(start, start + BACKGROUND_CHUNK_SIZE))
+        progress.done += 1
+    return True
+
+
+# kernel pro nastavení barvy z color pickeru (alpha je vždy 1.0)
+@split_kernel
+def color_fill_kernel(mesh, colors, corner_indices, context):
+    color = tuple(context.scene.vtx_color_picker[:3])
+    invalidate_color_snapshot(mesh)
+
+    def compute(progress=None):
+        result = np.empty_like(colors)
+
+        def compute_rows(rows):
+            result[rows, :3] = color
+            result[rows, 3] = 1.0
+
+        return result if compute_in_chunks(len(colors), compute_rows, progress) else None
+
+    return compute
+
+
+# kernel pro úpravu jasu podle uložených původních barev
+@split_kernel
+def brightness_kernel(mesh, colors, corner_indices, context):
+    snapshot = get_color_snapshot(mesh, COLOR_ATTRIBUTE_NAME, corner_indices)
+    if snapshot is None:
+        snapshot = store_color_snapshot(mesh, COLOR_ATTRIBUTE_NAME, corner_indices, colors)
+    factor = context.scene.vtx_brightness_slider
+    snapshot_colors = snapshot.colors
+
+    def compute(progress=None):
+        result = np.empty_like(colors)
+
+        def compute_rows(rows):
+            np.multiply(snapshot_colors[rows], factor, out=result[rows, :3])
+            result[rows, 3] = 1.0
+
+        return result if compute_in_chunks(len(colors), compute_rows, progress) else None
+
+    return compute
+
+
+# pomocná funkce pro převod RGB pole (N, 3) na HSV
+def rgb_to_hsv(rgb):
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    delta = maxc - minc
+    safe_delta = np.where(delta > 0.0, delta, 1.0)
+
+    rc = (maxc - rgb[:, 0]) / safe_delta
+    gc = (maxc - rgb[:, 1]) / safe_delta
+    bc = (maxc - rgb[:, 2]) / safe_delta
+
+    hue = np.where(
+        rgb[:, 0] == maxc, bc - gc,
+        np.where(rgb[:, 1] == maxc, 2.0 + rc - bc, 4.0 + gc - rc)
+    )
+    hue = np.where(delta > 0.0, (hue / 6.0) % 1.0, 0.0)
+    saturation = np.where(maxc > 0.0, delta / np.where(maxc > 0.0, maxc, 1.0), 0.0)
+
+    return np.stack((hue, saturation, maxc), axis=1).astype(np.float32)
+
+
+# pomocná funkce pro převod HSV pole (N, 3) na RGB
+def hsv_to_rgb(hsv):
+    hue, saturation, value = hsv[:, 0], hsv[:, 1], hsv[:, 2]
+    sector = np.floor(hue * 6.0)
+    f = hue * 6.0 - sector
+    sector = sector.astype(np.int32) % 6
+
+    p = value * (1.0 - saturation)
+    q = value * (1.0 - saturation * f)
+    t = value * (1.0 - saturation * (1.0 - f))
+
+    conditions = [sector == i for i in range(6)]
+    r = np.select(conditions, [value, q, p, p, t, value])
+    g = np.select(conditions, [t, value, value, q, p, p])
+    b = np.select(conditions, [p, p, t, value, value, q])
+
+    return np.stack((r, g, b), axis=1).astype(np.float32)
+
+
+# krok pipeline: násobení (faktor nebo RGB)
+def pipeline_multiply(rgb, step, context):
+    rgb *= np.asarray(step.get("factor", 1.0), dtype=np.float32)
+    return rgb
+
+
+# krok pipeline: posun odstínu, násobení saturace a hodnoty
+def pipeline_hsv(rgb, step, context):
+    hsv = rgb_to_hsv(rgb)
+    hsv[:, 0] = (hsv[:, 0] + step.get("hue", 0.0)) % 1.0
+    hsv[:, 1] = np.clip(hsv[:, 1] * step.get("saturation", 1.0), 0.0, 1.0)
+    hsv[:, 2] *= step.get("value", 1.0)
+    return hsv_to_rgb(hsv)
+
+
+# krok pipeline: kontrast kolem pivotu (1.0 = beze změny)
+def pipeline_contrast(rgb, step, context):
+    pivot = step.get("pivot", 0.5)
+    rgb -= pivot
+    rgb *= step.get("contrast", 1.0)
+    rgb += pivot
+    np.maximum(rgb, 0.0, out=rgb)
+    return rgb
+
+
+# krok pipeline: gamma (1.0 = beze změny)
+def pipeline_gamma(rgb, step, context):
+    np.maximum(rgb, 0.0, out=rgb)
+    np.power(rgb, step.get("gamma", 1.0), out=rgb)
+    return rgb
+
+
+# krok pipeline: smíchání s barvou (výchozí je barva z color pickeru) podle blend módu
+def pipeline_mix(rgb, step, context):
+    color = step.get("color")
+    if color is None:
+        color = context.scene.vtx_color_picker
+    blend = np.asarray(color[:3], dtype=np.float32)
+    mode = step.get("mode", 'MIX')
+
+    if mode == 'MIX':
+        mixed = np.broadcast_to(blend, rgb.shape)
+    elif mode == 'MULTIPLY':
+        mixed = rgb * blend
+    elif mode == 'SCREEN':
+        mixed = 1.0 - (1.0 - rgb) * (1.0 - blend)
+    elif mode == 'ADD':
+        mixed = rgb + blend
+    elif mode == 'OVERLAY':
+        mixed = np.where(rgb < 0.5, 2.0 * rgb * blend, 1.0 - 2.0 * (1.0 - rgb) * (1.0 - blend))
+    else:
+        raise ValueError(f"Unknown blend mode: {mode}")
+
+    rgb += (mixed - rgb) * step.get("factor", 1.0)
+    return rgb
+
+
+PIPELINE_STEPS = {
+    'multiply': pipeline_multiply,
+    'hsv': pipeline_hsv,
+    'contrast': pipeline_contrast,
+    'gamma': pipeline_gamma,
+    'mix': pipeline_mix,
+}
+
+
+# funkce pro sestavení řetězce operací do jednoho kernelu pro apply_vertex_color_operation
+def compile_color_pipeline(steps, channel_mask=(True, True, True)):
+    """
+    steps je seznam slovníků, např. [{"type": 'hsv', "saturation": 0.5}, {"type": 'gamma', "gamma": 2.2}].
+    Celý řetězec proběhne v jednom průchodu nad vybranými rohy: barvy se načtou
+    a zapíšou jednou, kroky pracují nad jedním float32 bufferem. Alpha se nemění,
+    channel_mask určuje, které kanály RGB se zapíšou.
+    """
+    compiled = []
+    for step in steps:
+        if step.get("type") not in PIPELINE_STEPS:
+            raise ValueError(f"Unknown pipeline step: {step.get('type')}")
+        compiled.append((PIPELINE_STEPS[step["type"]], step))
+
+    channels = np.flatnonzero(np.asarray(channel_mask, dtype=bool))
+
+    def pipeline_kernel(mesh, colors, corner_indices, context):
+        # barva color pickeru se pro mix kroky načte předem, kroky pak už bpy nepotřebují
+        picker = tuple(context.scene.vtx_color_picker[:3])
+        resolved = [
+            (function, dict(step, color=picker) if step["type"] == 'mix' and step.get("color") is None else step)
+            for function, step in compiled
+        ]
+        invalidate_color_snapshot(mesh)
+
+        def compute(progress=None):
+            result = colors.copy()
+
+            def compute_rows(rows):
+                rgb = np.array(colors[rows, :3], dtype=np.float32)
+                for function, step in resolved:
+                    rgb = function(rgb, step, None)
+                result[rows, channels] = rgb[:, channels]
+
+            return result if compute_in_chunks(len(colors), compute_rows, progress) else None
+
+        return compute
+
+    return split_kernel(pipeline_kernel)
+
+
+GRADIENT_AXES = {
+    'X': (1.0, 0.0, 0.0),
+    'Y': (0.0, 1.0, 0.0),
+    'Z': (0.0, 0.0, 1.0),
+}
+
+
+FALLOFF_CURVES = {
+    'LINEAR': lambda t: t,
+    'SMOOTH': lambda t: t * t * (3.0 - 2.0 * t),
+    'SPHERE': lambda t: 1.0 - np.sqrt(1.0 - t * t),
+    'SHARP': lambda t: t * t,
+    'ROOT': lambda t: np.sqrt(t),
+}
+
+
+# pomocná funkce pro objekt, který mesh používá (aktivní objekt má přednost, None = žádný vybraný)
+def get_mesh_object(context, mesh):
+    obj = context.active_object
+    if obj is None or obj.data != mesh:
+        obj = next((o for o in context.selected_objects if o.data == mesh), None)
+    return obj
+
+
+# pomocná funkce pro matici objektu, který mesh používá (aktivní objekt má přednost)
+def get_mesh_world_matrix(context, mesh):
+    obj = get_mesh_object(context, mesh)
+    if obj is None:
+        return np.identity(4, dtype=np.float32)
+    return np.array(obj.matrix_world, dtype=np.float32)
+
+
+# pomocná funkce pro parametr gradientu 0..1 z world pozic vertexů
+def compute_gradient_parameter(positions, gradient_type, direction, radius, cursor):
+    if gradient_type == 'CURSOR':
+        distance = np.linalg.norm(positions - cursor, axis=1)
+        return np.minimum(distance / radius, 1.0)
+
+    if gradient_type == 'RADIAL':
+        center = (positions.min(axis=0) + positions.max(axis=0)) * 0.5
+        distance = np.linalg.norm(positions - center, axis=1)
+        extent = distance.max()
+        return distance / extent if extent > 0.0 else np.zeros_like(distance)
+
+    projection = positions @ direction
+    low, high = projection.min(), projection.max()
+    if high <= low:
+        return np.zeros_like(projection)
+    return (projection - low) / (high - low)
+
+
+# pomocná funkce pro vyhodnocení color rampy (zastávky seřazené podle pozice) pro pole parametrů
+def evaluate_color_ramp(ramp_positions, ramp_colors, t):
+    rgb = np.empty((len(t), 3), dtype=np.float32)
+    for channel in range(3):
+        rgb[:, channel] = np.interp(t, ramp_positions, ramp_colors[:, channel])
+    return rgb
+
+
+# funkce pro sestavení kernelu gradientní výplně pro apply_vertex_color_operation
+def compile_gradient_fill(stops, gradient_type='LINEAR', axis='Z', direction=(0.0, 0.0, 1.0),
+                          radius=1.0, falloff='LINEAR', reverse=False, fade_to_existing=False):
+    """
+    stops je seznam dvojic (pozice 0..1, barva RGB). Parametr gradientu se počítá
+    jednou na vertex z hromadně načtených world pozic vybraných vertexů:
+    LINEAR a AXIS podle průmětu do směru (rozsah výběru = 0..1), RADIAL od středu
+    výběru, CURSOR podle vzdálenosti od 3D kurzoru (radius = 1). S fade_to_existing
+    se výplň směrem k 1 prolíná do původních barev.
+    """
+    if gradient_type not in ('LINEAR', 'AXIS', 'RADIAL', 'CURSOR'):
+        raise ValueError(f"Unknown gradient type: {gradient_type}")
+    if falloff not in FALLOFF_CURVES:
+        raise ValueError(f"Unknown falloff: {falloff}")
+    if not stops:
+        raise ValueError("Gradient needs at least one stop.")
+
+    ramp_positions = np.array([position for position, color in stops], dtype=np.float32)
+    ramp_colors = np.array([color[:3] for position, color in stops], dtype=np.float32)
+    order = np.argsort(ramp_positions, kind='stable')
+    ramp_positions, ramp_colors = ramp_positions[order], ramp_colors[order]
+
+    if gradient_type == 'AXIS':
+        direction = GRADIENT_AXES[axis]
+    direction = np.asarray(direction, dtype=np.float32)
+    length = np.linalg.norm(direction)
+    if length == 0.0:
+        raise ValueError("Gradient direction must not be zero.")
+    direction = direction / length
+    curve = FALLOFF_CURVES[falloff]
+
+    def gradient_kernel(mesh, colors, corner_indices, context):
+        # parametr se počítá jen pro vertexy vybraných rohů, jednou na vertex
+        used_verts, corner_lookup = get_used_vertices(mesh, corner_indices)
+
+        matrix = get_mesh_world_matrix(context, mesh)
+        local_positions = read_vertex_positions(mesh)[used_verts]
+        cursor = np.array(context.scene.cursor.location, dtype=np.float32)
+        invalidate_color_snapshot(mesh)
+
+        def compute(progress=None):
+            # rozsah parametru (LINEAR, AXIS, RADIAL) závisí na všech vertexech, po blocích jde až barva
+            positions = local_positions @ matrix[:3, :3].T + matrix[:3, 3]
+            t = compute_gradient_parameter(positions, gradient_type, direction, radius, cursor)
+            if reverse:
+                t = 1.0 - t
+            t = curve(t).astype(np.float32)
+            result = np.empty_like(colors)
+
+            def compute_rows(rows):
+                corner_t = t[corner_lookup[rows]]
+                rgb = evaluate_color_ramp(ramp_positions, ramp_colors, corner_t)
+                if fade_to_existing:
+                    rgb += (colors[rows, :3] - rgb) * corner_t[:, None]
+                result[rows, :3] = rgb
+                result[rows, 3] = 1.0
+
+            return result if compute_in_chunks(len(colors), compute_rows, progress) else None
+
+        return compute
+
+    return split_kernel(gradient_kernel)
+
+
+# funkce pro křivost vertexů z úhlů mezi normálou a hranami (> 0 = konkávní, < 0 = konvexní)
+def compute_vertex_curvature(positions, normals, edges):
+    a, b = edges[:, 0], edges[:, 1]
+    edge_vectors = positions[b] - positions[a]
+    lengths = np.linalg.norm(edge_vectors, axis=1)
+    edge_vectors /= np.where(lengths > 0.0, lengths, 1.0)[:, None]
+
+    # sinus úhlu mezi tečnou rovinou vertexu a hranou k sousedovi
+    count = len(positions)
+    total = np.bincount(a, np.einsum('ij,ij->i', normals[a], edge_vectors), count)
+    total -= np.bincount(b, np.einsum('ij,ij->i', normals[b], edge_vectors), count)
+    degree = np.bincount(a, minlength=count) + np.bincount(b, minlength=count)
+    return total / np.maximum(degree, 1)
+
+
+# funkce pro převod křivosti na hodnoty 0..1 (škálováno podle 99. percentilu)
+def curvature_to_values(curvature, bake_type, contrast):
+    extent = np.percentile(np.abs(curvature), 99.0) if len(curvature) else 0.0
+    scaled = curvature * (contrast / extent if extent > 0.0 else 0.0)
+    if bake_type == 'CAVITY':
+        return np.clip(1.0 - scaled, 0.0, 1.0).astype(np.float32)
+    return np.clip(0.5 - 0.5 * scaled, 0.0, 1.0).astype(np.float32)
+
+
+# funkce pro náhodné směry v polokouli kolem normál (kosinově vážené), tvar (N, samples, 3)
+def sample_hemisphere_directions(normals, samples, rng):
+    helper = np.where(np.abs(normals[:, 2:3]) < 0.999, (0.0, 0.0, 1.0), (1.0, 0.0, 0.0))
+    tangents = np.cross(helper, normals)
+    tangents /= np.linalg.norm(tangents, axis=1)[:, None]
+    bitangents = np.cross(normals, tangents)
+
+    u1 = rng.random((len(normals), samples))
+    u2 = rng.random((len(normals), samples))
+    radius = np.sqrt(u1)
+    phi = 2.0 * np.pi * u2
+    x = radius * np.cos(phi)
+    y = radius * np.sin(phi)
+    z = np.sqrt(1.0 - u1)
+
+    return (
+        x[..., None] * tangents[:, None, :]
+        + y[..., None] * bitangents[:, None, :]
+        + z[..., None] * normals[:, None, :]
+    )
+
+
+# funkce pro paprsky jednoho bloku vertexů
+def bake_ray_chunk(bvh, positions, normals, bake_type, samples, distance, bias, seed):
+    """
+    AO: podíl nezakrytých paprsků z polokoule kolem normály (1 = volno).
+    THICKNESS: průměrná vzdálenost zásahu paprsků dovnitř meshe / distance (1 = tlusté).
+    BVHTree.ray_cast je volání po jednom paprsku a drží GIL, paprsky se proto počítají
+    po blocích v jednom procesu (mezi nimi se dá zobrazit průběh nebo bake zrušit)
+    nebo rozdělené mezi procesy Blenderu na pozadí (BakeWorkers).
+    """
+    rng = np.random.default_rng(seed)
+    if bake_type == 'THICKNESS':
+        normals = -normals
+    origins = positions + normals * bias
+    directions = sample_hemisphere_directions(normals, samples, rng)
+
+    values = np.ones(len(positions), dtype=np.float32)
+    ray_cast = bvh.ray_cast
+    for i, (origin, vertex_directions) in enumerate(zip(origins.tolist(), directions.tolist())):
+        total = 0.0
+        for direction in vertex_directions:
+            location, normal, index, hit_distance = ray_cast(origin, direction, distance)
+            if bake_type == 'THICKNESS':
+                total += hit_distance if location is not None else distance
+            elif location is None:
+                total += 1.0
+
+        values[i] = total / (samples * distance) if bake_type == 'THICKNESS' else total / samples
+    return values
+
+
+# funkce pro BVH strom z pozic vertexů a trojúhelníků meshe (v Blenderu i v bake workerech stejný)
+def build_mesh_bvh(positions, triangles):
+    return BVHTree.FromPolygons(positions.tolist(), triangles.tolist(), all_triangles=True)
+
+
+# funkce pro rozdělení paprsků jobů na bloky (index jobu, začátek bloku), stejně v Blenderu i ve workerech
+def get_bake_chunks(vertex_counts):
+    return [
+        (index, start)
+        for index, count in enumerate(vertex_counts)
+        for start in range(0, count, BAKE_CHUNK_SIZE)
+    ]
+
+
+# funkce pro načtení dat meshe pro bake (cavity/curvature se spočítají hned, AO/thickness čekají na paprsky)
+def read_bake_job(mesh, bake_type, contrast=1.0):
+    positions = read_vertex_positions(mesh)
+    job = {
+        "mesh": mesh,
+        "fingerprint": get_topology_fingerprint(mesh),
+        "positions": positions,
+        "normals": read_vertex_normals(mesh),
+        "values": None,
+    }
+    if bake_type in {'CAVITY', 'CURVATURE'}:
+        curvature = compute_vertex_curvature(positions, job["normals"], read_edge_vertices(mesh))
+        job["values"] = curvature_to_values(curvature, bake_type, contrast)
+    else:
+        extent = np.ptp(positions, axis=0).max() if len(positions) else 0.0
+        job["triangles"] = read_triangle_vertices(mesh)
+        job["bvh"] = None
+        job["bias"] = max(extent * 1e-5, 1e-6)
+        job["values"] = np.ones(len(positions), dtype=np.float32)
+    return job
+
+
+# funkce pro paprsky bloků jobu začínajících na starts, BVH se postaví až u prvního bloku
+def bake_job_rays(job, bake_type, samples, distance, seed, starts):
+    if job["bvh"] is None:
+        job["bvh"] = build_mesh_bvh(job["positions"], job["triangles"])
+    for start in starts:
+        chunk = slice(start, start + BAKE_CHUNK_SIZE)
+        job["values"][chunk] = bake_ray_chunk(
+            job["bvh"], job["positions"][chunk], job["normals"][chunk],
+            bake_type, samples, distance, job["bias"], seed + start,
+        )
+
+
+# funkce pro bake hodnot 0..1 po vertexech meshe v aktuálním procesu (bez UI, např. pro dávkové zpracování)
+def bake_mesh_values(mesh, bake_type, contrast=1.0, samples=16, distance=1.0, seed=0):
+    job = read_bake_job(mesh, bake_type, contrast)
+    if bake_type in {'AO', 'THICKNESS'}:
+        starts = [start for _, start in get_bake_chunks([len(job["positions"])])]
+        bake_job_rays(job, bake_type, samples, distance, seed, starts)
+    return job["values"]
+
+
+# třída pro paprsky bake v procesech Blenderu na pozadí, proces worker počítá každý worker_count-tý blok
+class BakeWorkers:
+    """
+    BVHTree.ray_cast drží GIL, víc jader proto využijí jen samostatné procesy.
+    Pozice, normály a trojúhelníky jdou workerům přes .npy v dočasné složce,
+    hodnoty zapisují do sdíleného memmap souboru (NaN = blok ještě nespočítaný).
+    """
+    __slots__ = ("directory", "processes", "logs", "values")
+
+    def __init__(self, jobs, bake_type, samples, distance, seed, worker_count):
+        import subprocess
+        import tempfile
+
+        self.directory = tempfile.mkdtemp(prefix="vtx_bake_")
+        self.processes = []
+        self.logs = []
+        self.values = []
+        header = {"bake_type": bake_type, "samples": samples, "distance": distance, "seed": seed, "jobs": []}
+        for index, job in enumerate(jobs):
+            paths = {
+                name: os.path.join(self.directory, f"{name}_{index}.npy")
+                for name in ("positions", "normals", "triangles", "values")
+            }
+            for name in ("positions", "normals", "triangles"):
+                np.save(paths[name], job[name])
+            values = np.lib.format.open_memmap(
+                paths["values"], mode='w+', dtype=np.float32, shape=(len(job["positions"]),)
+            )
+            values[:] = np.nan
+            values.flush()
+            self.values.append(values)
+            header["jobs"].append(dict(paths, count=len(job["positions"]), bias=float(job["bias"])))
+
+        header_path = os.path.join(self.directory, "bake.json")
+        with open(header_path, "w", encoding="utf-8") as f:
+            json.dump(header, f)
+
+        for worker in range(worker_count):
+            log = open(os.path.join(self.directory, f"worker_{worker}.log"), "w", encoding="utf-8")
+            self.logs.append(log)
+            self.processes.append(subprocess.Popen(
+                [
+                    bpy.app.binary_path, "-b", "--factory-startup", "-noaudio",
+                    "-P", os.path.abspath(__file__), "--",
+                    "--vtx-bake-worker", header_path, str(worker), str(worker_count),
+                ],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            ))
+
+    # podíl spočítaných vertexů 0..1
+    def fraction(self):
+        total = sum(len(values) for values in self.values)
+        done = sum(int(np.count_nonzero(~np.isnan(values))) for values in self.values)
+        return done / total if total else 1.0
+
+    # True, když všechny procesy doběhly; spadlý proces vyvolá RuntimeError
+    def poll(self):
+        finished = True
+        for worker, process in enumerate(self.processes):
+            code = process.poll()
+            if code is None:
+                finished = False
+            elif code != 0:
+                with open(self.logs[worker].name, encoding="utf-8", errors="replace") as f:
+                    output = f.read().strip().splitlines() or [""]
+                raise RuntimeError(f"Bake worker exited with code {code}: {output[-1]}")
+        return finished
+
+    def wait(self):
+        for process in self.processes:
+            process.wait()
+        self.poll()
+
+    # kopie spočítaných hodnot pro každý job
+    def results(self):
+        results = [np.array(values) for values in self.values]
+        if any(np.isnan(values).any() for values in results):
+            raise RuntimeError("Bake workers did not finish all vertices.")
+        return results
+
+    # ukončí běžící procesy a smaže dočasnou složku
+    def close(self):
+        import shutil
+
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+                process.wait()
+        for log in self.logs:
+            log.close()
+        self.processes = []
+        self.logs = []
+        self.values = []
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# funkce pro běh bake workeru (blender -b -P vertex_color_tool.py -- --vtx-bake-worker bake.json worker count)
+def run_bake_worker(header_path, worker, worker_count):
+    with open(header_path, encoding="utf-8") as f:
+        header = json.load(f)
+
+    chunks = get_bake_chunks([job["count"] for job in header["jobs"]])[worker::worker_count]
+    for index, paths in enumerate(header["jobs"]):
+        starts = [start for job_index, start in chunks if job_index == index]
+        if not starts:
+            continue
+        job = {
+            "positions": np.load(paths["positions"]),
+            "normals": np.load(paths["normals"]),
+            "triangles": np.load(paths["triangles"]),
+            "bias": paths["bias"],
+            "bvh": None,
+            "values": np.load(paths["values"], mmap_mode='r+'),
+        }
+        bake_job_rays(job, header["bake_type"], header["samples"], header["distance"], header["seed"], starts)
+        job["values"].flush()
+
+
+# třída pro prostorový index zdrojového meshe přenosu barev (KD-tree vertexů, BVH trojúhelníků)
+class TransferIndex:
+    __slots__ = ("fingerprint", "kdtree", "bvh", "tri_verts", "tri_loops", "positions")
+
+    def __init__(self, fingerprint):
+        self.fingerprint = fingerprint
+        self.kdtree = None
+        self.bvh = None
+        self.tri_verts = None
+        self.tri_loops = None
+        self.positions = None
+
+
+# LRU cache prostorových indexů zdrojových meshů (BVH velkých meshů zabírá hodně paměti)
+TRANSFER_CACHE_SIZE = 2
+_transfer_cache = OrderedDict()
+
+
+# pomocná funkce pro prostorový index zdrojového meshe s využitím cache (stromy se staví až při použití)
+def get_transfer_index(mesh, mode):
+    key = get_mesh_key(mesh)
+    fingerprint = get_topology_fingerprint(mesh)
+
+    index = _transfer_cache.get(key)
+    if index is None or index.fingerprint != fingerprint:
+        index = TransferIndex(fingerprint)
+        index.positions = read_vertex_positions(mesh)
+        _transfer_cache[key] = index
+    _transfer_cache.move_to_end(key)
+    while len(_transfer_cache) > TRANSFER_CACHE_SIZE:
+        _transfer_cache.popitem(last=False)
+
+    if mode == 'VERTEX' and index.kdtree is None:
+        kdtree = KDTree(len(index.positions))
+        insert = kdtree.insert
+        for i, co in enumerate(index.positions.tolist()):
+            insert(co, i)
+        kdtree.balance()
+        index.kdtree = kdtree
+
+    if mode == 'SURFACE' and index.bvh is None:
+        mesh.calc_loop_triangles()
+        tri_count = len(mesh.loop_triangles)
+        tri_verts = np.empty(tri_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", tri_verts)
+        tri_loops = np.empty(tri_count * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", tri_loops)
+        index.tri_verts = tri_verts.reshape(-1, 3)
+        index.tri_loops = tri_loops.reshape(-1, 3)
+        index.bvh = BVHTree.FromPolygons(index.positions.tolist(), index.tri_verts.tolist(), all_triangles=True)
+
+    return index
+
+
+# pomocná funkce pro zneplatnění prostorových indexů (bez argumentů smaže vše)
+def invalidate_transfer_cache(mesh=None):
+    if mesh is None:
+        _transfer_cache.clear()
+    else:
+        _transfer_cache.pop(get_mesh_key(mesh), None)
+
+
+# pomocná funkce pro barycentrické váhy bodů (N, 3) v trojúhelnících a, b, c (N, 3)
+def compute_barycentric_weights(points, a, b, c):
+    v0 = b - a
+    v1 = c - a
+    v2 = points - a
+    d00 = np.einsum('ij,ij->i', v0, v0)
+    d01 = np.einsum('ij,ij->i', v0, v1)
+    d11 = np.einsum('ij,ij->i', v1, v1)
+    d20 = np.einsum('ij,ij->i', v2, v0)
+    d21 = np.einsum('ij,ij->i', v2, v1)
+    denom = d00 * d11 - d01 * d01
+    denom = np.where(np.abs(denom) > 1e-20, denom, 1.0)
+
+    v = (d11 * d20 - d01 * d21) / denom
+    w = (d00 * d21 - d01 * d20) / denom
+    weights = np.stack((1.0 - v - w, v, w), axis=1)
+
+    # body na hraně mohou mít kvůli zaokrouhlení malé záporné váhy
+    np.maximum(weights, 0.0, out=weights)
+    weights /= np.maximum(weights.sum(axis=1), 1e-20)[:, None]
+    return weights.astype(np.float32)
+
+
+# funkce pro navzorkování barev zdrojového meshe v bodech (N, 3) v jeho lokálním prostoru
+def sample_source_colors(source_mesh, source_colors, source_domain, points, mode, max_distance):
+    """
+    VERTEX vezme barvu nejbližšího vertexu (rohy vertexu se průměrují), SURFACE najde
+    nejbližší bod povrchu a barvu interpoluje barycentricky z rohů trojúhelníku.
+    Vrací barvy (N, 4) a masku bodů, pro které se zdroj našel do max_distance.
+    """
+    index = get_transfer_index(source_mesh, mode)
+    distance = max_distance if max_distance > 0.0 else 1.0e30
+    found = np.zeros(len(points), dtype=bool)
+    result = np.zeros((len(points), 4), dtype=np.float32)
+
+    if mode == 'VERTEX':
+        vertex_colors = convert_domain_colors(source_mesh, source_colors, source_domain, 'POINT')
+        nearest = np.zeros(len(points), dtype=np.int32)
+        find = index.kdtree.find
+        for i, co in enumerate(points.tolist()):
+            location, vert_index, vert_distance = find(co)
+            if location is not None and vert_distance <= distance:
+                nearest[i] = vert_index
+                found[i] = True
+        result[found] = vertex_colors[nearest[found]]
+        return result, found
+
+    locations = np.zeros((len(points), 3), dtype=np.float32)
+    triangles = np.zeros(len(points), dtype=np.int32)
+    find_nearest = index.bvh.find_nearest
+    for i, co in enumerate(points.tolist()):
+        location, normal, tri_index, hit_distance = find_nearest(co, distance)
+        if location is not None:
+            locations[i] = location
+            triangles[i] = tri_index
+            found[i] = True
+
+    tri_verts = index.tri_verts[triangles[found]]
+    positions = index.positions
+    weights = compute_barycentric_weights(
+        locations[found], positions[tri_verts[:, 0]], positions[tri_verts[:, 1]], positions[tri_verts[:, 2]]
+    )
+    corners = index.tri_loops[triangles[found]] if source_domain == 'CORNER' else tri_verts
+    result[found] = np.einsum('ij,ijk->ik', weights, source_colors[corners])
+    return result, found
+
+
+# funkce pro kernel přenosu barev ze zdrojového objektu (vzorkuje se jednou na vertex cílového meshe)
+def compile_color_transfer(source_object, mode='SURFACE', max_distance=0.0):
+    source_mesh = source_object.data
+    source_layer = source_mesh.color_attributes.get(COLOR_ATTRIBUTE_NAME) or source_mesh.color_attributes.active_color
+    if source_layer is None:
+        raise ValueError(f"Source '{source_object.name}' has no color attribute.")
+    source_colors = read_mesh_colors(source_mesh, source_layer.name)
+    source_domain = source_layer.domain
+    source_inverse = np.linalg.inv(np.array(source_object.matrix_world, dtype=np.float64))
+
+    def transfer_kernel(mesh, colors, corner_indices, context):
+        used_verts, corner_lookup = get_used_vertices(mesh, corner_indices)
+
+        # pozice cíle se převedou do lokálního prostoru zdroje (world -> zdroj)
+        matrix = source_inverse @ get_mesh_world_matrix(context, mesh)
+        points = read_vertex_positions(mesh)[used_verts] @ matrix[:3, :3].T + matrix[:3, 3]
+
+        sampled, found = sample_source_colors(
+            source_mesh, source_colors, source_domain, points.astype(np.float32), mode, max_distance
+        )
+        result = colors.copy()
+        corner_found = found[corner_lookup]
+        result[corner_found] = sampled[corner_lookup[corner_found]]
+        invalidate_color_snapshot(mesh)
+        return result
+
+    return transfer_kernel
+
+
+# třída pro sousednost vertexů ve tvaru CSR (sousedé vertexu v jsou neighbors[offsets[v]:offsets[v + 1]])
+class VertexAdjacency:
+    __slots__ = ("fingerprint", "offsets", "neighbors")
+
+    def __init__(self, fingerprint, offsets, neighbors):
+        self.fingerprint = fingerprint
+        self.offsets = offsets
+        self.neighbors = neighbors
+
+
+# LRU cache sousedností podle meshe
+ADJACENCY_CACHE_SIZE = 4
+_adjacency_cache = OrderedDict()
+
+
+# pomocná funkce pro CSR (offsets, sousedé) z orientovaných dvojic uzlů (zdroj, cíl)
+def build_csr(sources, targets, count):
+    order = np.argsort(sources, kind='stable')
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=count), out=offsets[1:])
+    return offsets, targets[order].astype(np.int32)
+
+
+# pomocná funkce pro sestavení CSR sousednosti z hran načtených jedním foreach_get
+def build_vertex_adjacency(mesh):
+    edges = read_edge_vertices(mesh)
+    offsets, neighbors = build_csr(
+        np.concatenate((edges[:, 0], edges[:, 1])), np.concatenate((edges[:, 1], edges[:, 0])), len(mesh.vertices)
+    )
+    return VertexAdjacency(get_topology_fingerprint(mesh), offsets, neighbors)
+
+
+# funkce pro sousednost rohů podle barvy: uzel = vertex + barva jeho rohů (švy CORNER domain)
+def build_corner_color_adjacency(mesh, colors):
+    """
+    Rohy jednoho vertexu se stejnou barvou (kvantovanou jako v indexu barev) tvoří uzel,
+    uzly spojují hrany faces mezi sousedními rohy. Strany švu (rohy vertexu s různými
+    barvami) tak nejsou sousedé a filtr je nesmíchá. Bez švů vrací None a použije se
+    cachovaná sousednost vertexů. Jinak vrací (sousednost uzlů, uzel každého rohu, barvy
+    uzlů (3, N) jako průměr jejich rohů).
+    """
+    loop_verts = get_cached_loop_vertices(mesh)
+    keys = (loop_verts.astype(np.int64) << 32) | (quantize_colors(colors) >> 8).astype(np.int64)
+    node_keys, corner_nodes = np.unique(keys, return_inverse=True)
+    corner_nodes = corner_nodes.astype(np.int64).ravel()
+    if len(node_keys) == len(np.unique(loop_verts)):
+        return None
+
+    # roh a následující roh téže face leží na hraně, poslední roh face navazuje na první
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    profile_count(bytes_moved=loop_starts.nbytes + loop_totals.nbytes)
+    next_loops = np.arange(1, len(loop_verts) + 1, dtype=np.int64)
+    next_loops[loop_starts + loop_totals - 1] = loop_starts
+
+    # hrana sdílená dvěma faces stejné strany švu se započte jednou
+    count = len(node_keys)
+    a, b = corner_nodes, corner_nodes[next_loops]
+    pairs = np.unique(np.concatenate((a * count + b, b * count + a)))
+    offsets, neighbors = build_csr(pairs // count, pairs % count, count)
+
+    node_counts = np.bincount(corner_nodes, minlength=count).astype(np.float32)
+    values = np.empty((3, count), dtype=np.float32)
+    for channel in range(3):
+        values[channel] = np.bincount(corner_nodes, colors[:, channel], count) / node_counts
+    return VertexAdjacency(None, offsets, neighbors), corner_nodes, values
+
+
+# pomocná funkce pro sousednost meshe s využitím cache
+def get_vertex_adjacency(mesh):
+    key = get_mesh_key(mesh)
+    adjacency = _adjacency_cache.get(key)
+    if adjacency is None or adjacency.fingerprint != get_topology_fingerprint(mesh):
+        adjacency = build_vertex_adjacency(mesh)
+        _adjacency_cache[key] = adjacency
+    _adjacency_cache.move_to_end(key)
+    while len(_adjacency_cache) > ADJACENCY_CACHE_SIZE:
+        _adjacency_cache.popitem(last=False)
+    return adjacency
+
+
+# pomocná funkce pro explicitní zneplatnění sousedností (bez argumentu smaže vše)
+def invalidate_adjacency_cache(mesh=None):
+    if mesh is None:
+        _adjacency_cache.clear()
+    else:
+        _adjacency_cache.pop(get_mesh_key(mesh), None)
+
+
+# pomocná funkce pro jeden krok filtru nad souvislým úsekem vybraných vertexů (jeden kanál)
+def filter_channel_chunk(channel, vertex_indices, neighbors, starts, inverse_degree, filter_type, factor):
+    neighbor_values = channel[neighbors]
+    current = channel[vertex_indices]
+    if filter_type == 'DILATE':
+        filtered = np.maximum(np.maximum.reduceat(neighbor_values, starts), current)
+    elif filter_type == 'ERODE':
+        filtered = np.minimum(np.minimum.reduceat(neighbor_values, starts), current)
+    else:
+        mean = np.add.reduceat(neighbor_values, starts)
+        mean *= inverse_degree
+        if filter_type == 'SHARPEN':
+            filtered = np.maximum(current + (current - mean), 0.0)
+        else:
+            filtered = mean
+    filtered -= current
+    filtered *= factor
+    filtered += current
+    return filtered
+
+
+# funkce pro filtr barev po vertexech (3, N) po kanálech, mění jen vertexy z vertex_indices
+def filter_vertex_colors(adjacency, values, vertex_indices, filter_type, iterations, factor, progress=None):
+    """
+    Pro vybrané vertexy se jednou sestaví podmnožina CSR (jen jejich sousedé), každá iterace
+    je pak hromadné načtení sousedů a np.*.reduceat po segmentech, rozdělené na úseky mezi
+    vlákna (numpy při tom uvolňuje GIL). Vertexy bez sousedů se nemění, nevybraní sousedé
+    do filtru vstupují, ale sami zůstávají. SMOOTH = průměr sousedů, SHARPEN = odečtení
+    průměru (unsharp), DILATE / ERODE = maximum / minimum sousedů po kanálech.
+    factor míchá výsledek s původní barvou. S progress je blokem jeden průchod kanálu,
+    při zrušení vrací None.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    offsets = adjacency.offsets
+    degree = (offsets[1:] - offsets[:-1])[vertex_indices]
+    vertex_indices = vertex_indices[degree > 0]
+    degree = degree[degree > 0]
+    if len(vertex_indices) == 0:
+        return values
+
+    # segmenty sousedů vybraných vertexů za sebou, starts jsou začátky segmentů
+    starts = np.zeros(len(degree) + 1, dtype=np.int64)
+    np.cumsum(degree, out=starts[1:])
+    positions = np.repeat(offsets[vertex_indices] - starts[:-1], degree) + np.arange(starts[-1], dtype=np.int64)
+    neighbors = adjacency.neighbors[positions]
+    inverse_degree = (1.0 / degree).astype(np.float32)
+
+    workers = max(1, min(os.cpu_count() or 1, len(vertex_indices) // FILTER_MIN_CHUNK))
+    bounds = np.linspace(0, len(vertex_indices), workers + 1).astype(np.int64)
+    chunks = [
+        (
+            vertex_indices[lo:hi],
+            neighbors[starts[lo]:starts[hi]],
+            starts[lo:hi] - starts[lo],
+            inverse_degree[lo:hi],
+        )
+        for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo
+    ]
+
+    if progress is not None:
+        progress.total = iterations * len(values)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for _ in range(iterations):
+            for channel in values:
+                if progress is not None:
+                    if progress.cancel_event.is_set():
+                        return None
+                    progress.done += 1
+                results = list(executor.map(
+                    lambda chunk: filter_channel_chunk(channel, *chunk, filter_type, factor), chunks
+                ))
+                channel[vertex_indices] = np.concatenate(results)
+
+    return values
+
+
+# funkce pro kernel filtru barev nad sousedností vertexů (rohy berou filtrovanou barvu svého vertexu)
+def compile_color_filter(filter_type='SMOOTH', iterations=1, factor=1.0):
+    if filter_type not in COLOR_FILTERS:
+        raise ValueError(f"Unknown color filter: {filter_type}")
+
+    def color_filter_kernel(mesh, colors, corner_indices, context):
+        # filtr potřebuje barvy i nevybraných sousedů; u CORNER domain se švy filtruje po uzlech
+        # vertex + barva (build_corner_color_adjacency), jinak po vertexech jako průměr rohů
+        domain = get_color_domain(mesh)
+        all_colors = read_mesh_colors(mesh)
+        corner_graph = build_corner_color_adjacency(mesh, all_colors) if domain == 'CORNER' else None
+        if corner_graph is not None:
+            adjacency, corner_nodes, values = corner_graph
+            element_nodes = corner_nodes[corner_indices]
+        else:
+            adjacency = get_vertex_adjacency(mesh)
+            values = np.ascontiguousarray(convert_domain_colors(mesh, all_colors, domain, 'POINT')[:, :3].T)
+            element_nodes = get_element_vertices(mesh, corner_indices)
+        used_nodes = np.flatnonzero(np.bincount(element_nodes, minlength=values.shape[1]))
+        invalidate_color_snapshot(mesh)
+
+        def compute(progress=None):
+            filtered = filter_vertex_colors(adjacency, values, used_nodes, filter_type, iterations, factor, progress)
+            if filtered is None:
+                return None
+            result = colors.copy()
+            result[:, :3] = filtered[:, element_nodes].T
+            return result
+
+        return compute
+
+    return split_kernel(color_filter_kernel)
+
+
+# funkce pro kernel, který zapíše hodnoty po vertexech do vybraných rohů (šedá nebo násobení)
+def compile_vertex_values(values, multiply_existing=False):
+    def vertex_values_kernel(mesh, colors, corner_indices, context):
+        corner_values = values[get_element_vertices(mesh, corner_indices)][:, None]
+        result = colors.copy()
+        if multiply_existing:
+            result[:, :3] *= corner_values
+        else:
+            result[:, :3] = corner_values
+        result[:, 3] = 1.0
+        invalidate_color_snapshot(mesh)
+        return result
+
+    return vertex_values_kernel
+
+
+# pomocná funkce pro hromadné načtení mapy roh -> face (rohy faces jsou v meshi uložené souvisle)
+def read_corner_faces(mesh):
+    loop_totals = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", loop_totals)
+    profile_count(bytes_moved=loop_totals.nbytes)
+    return np.repeat(np.arange(len(loop_totals), dtype=np.int32), loop_totals)
+
+
+# pomocná funkce pro spojení prvků do komponent podle dvojic (a, b), vrací kořen (nejmenší index) každého prvku
+def label_components(count, a, b):
+    parent = np.arange(count, dtype=np.int64)
+    while True:
+        root_a = parent[a]
+        root_b = parent[b]
+        changed = root_a != root_b
+        if not changed.any():
+            return parent
+        # větší kořen se připojí k menšímu, pak se cesty zkrátí (pointer jumping)
+        np.minimum.at(
+            parent, np.maximum(root_a, root_b)[changed], np.minimum(root_a, root_b)[changed]
+        )
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+
+# pomocná funkce pro UV ostrovy po faces (faces spojuje společný vertex se stejnou UV souřadnicí)
+def compute_uv_islands(mesh, corner_faces, loop_verts):
+    uv_layer = mesh.uv_layers.active
+    if uv_layer is None:
+        raise ValueError("Mesh has no UV map.")
+
+    uvs = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    uv_layer.data.foreach_get("uv", uvs)
+    profile_count(bytes_moved=uvs.nbytes)
+    keys = np.round(uvs.reshape(-1, 2) / UV_ISLAND_PRECISION).astype(np.int64)
+
+    # rohy se seřadí podle (vertex, u, v), každá skupina stejných klíčů spojí své faces s první z nich
+    order = np.lexsort((keys[:, 1], keys[:, 0], loop_verts))
+    sorted_keys = np.column_stack((loop_verts[order], keys[order]))
+    group_start = np.ones(len(order), dtype=bool)
+    group_start[1:] = (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)
+    group_first = order[np.flatnonzero(group_start)][np.cumsum(group_start) - 1]
+
+    return label_components(len(mesh.polygons), corner_faces[order], corner_faces[group_first])
+
+
+# pomocná funkce pro nejsilnější vertex group každého vertexu (-1 = bez skupiny)
+def read_dominant_vertex_groups(mesh):
+    groups = np.full(len(mesh.vertices), -1, dtype=np.int32)
+    # váhy vertex groups nemají hromadné foreach_get, čtou se po vertexech
+    for vertex in mesh.vertices:
+        best = max(vertex.groups, key=lambda g: g.weight, default=None)
+        if best is not None and best.weight > 0.0:
+            groups[vertex.index] = best.group
+    return groups
+
+
+# pomocná funkce pro přečíslování hodnot na pořadí 0..n-1 (záporné hodnoty zůstanou -1)
+def rank_group_values(values):
+    ranked = np.full(len(values), -1, dtype=np.int32)
+    valid = values >= 0
+    ranked[valid] = np.unique(values[valid], return_inverse=True)[1]
+    return ranked
+
+
+# funkce pro skupinu každého prvku color attribute podle mapování (-1 = prvek se nemění)
+def compute_element_groups(mesh, mapping):
+    """
+    MATERIAL = index material slotu, FACE_SET = face sety ze sculptu, UV_ISLAND = ostrovy
+    aktivní UV mapy, VERTEX_GROUP = nejsilnější vertex group vertexu. Skupiny jsou čísla
+    0..n-1, položka palety se vybírá jako skupina % délka palety. U POINT domain vezme
+    vertex na hranici face skupin skupinu jednoho ze svých faces.
+    """
+    loop_verts = get_cached_loop_vertices(mesh)
+
+    if mapping == 'VERTEX_GROUP':
+        vertex_groups = read_dominant_vertex_groups(mesh)
+        if get_color_domain(mesh) == 'POINT':
+            return vertex_groups
+        return vertex_groups[loop_verts]
+
+    corner_faces = read_corner_faces(mesh)
+    if mapping == 'MATERIAL':
+        face_groups = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("material_index", face_groups)
+    elif mapping == 'FACE_SET':
+        attribute = mesh.attributes.get(FACE_SET_ATTRIBUTE)
+        if attribute is None or attribute.domain != 'FACE':
+            raise ValueError("Mesh has no face sets.")
+        face_sets = np.empty(len(mesh.polygons), dtype=np.int32)
+        attribute.data.foreach_get("value", face_sets)
+        face_groups = rank_group_values(np.abs(face_sets))
+    elif mapping == 'UV_ISLAND':
+        face_groups = rank_group_values(compute_uv_islands(mesh, corner_faces, loop_verts))
+    else:
+        raise ValueError(f"Unknown palette mapping '{mapping}'.")
+
+    corner_groups = face_groups[corner_faces]
+    if get_color_domain(mesh) == 'POINT':
+        vertex_groups = np.full(len(mesh.vertices), -1, dtype=np.int32)
+        vertex_groups[loop_verts] = corner_groups
+        return vertex_groups
+    return corner_groups
+
+
+# funkce pro kernel, který v jednom průchodu obarví všechny skupiny barvami z palety
+def compile_palette_mapping(palette_colors, mapping):
+    palette = np.asarray(palette_colors, dtype=np.float32).reshape(-1, 3)
+    if len(palette) == 0:
+        raise ValueError("Palette is empty.")
+
+    def palette_kernel(mesh, colors, corner_indices, context):
+        groups = compute_element_groups(mesh, mapping)[corner_indices]
+        mapped = groups >= 0
+        result = colors.copy()
+        result[mapped, :3] = palette[groups[mapped] % len(palette)]
+        result[mapped, 3] = 1.0
+        invalidate_color_snapshot(mesh)
+        return result
+
+    return palette_kernel
+
+
+# pomocná funkce pro zápis palety do JSON
+def write_palette_json(path, entries):
+    data = {
+        "version": PALETTE_FORMAT_VERSION,
+        "colors": [{"name": name, "color": list(color)} for name, color in entries],
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+
+
+# pomocná funkce pro načtení palety z JSON (seznam dvojic (název, barva))
+def read_palette_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get("version") != PALETTE_FORMAT_VERSION:
+        raise ValueError("Unsupported palette file.")
+    return [(str(item.get("name", "")), tuple(item["color"][:3])) for item in data["colors"]]
+
+
+# pomocná funkce pro zápis palety jako Palette datablocku do .blend knihovny
+def write_palette_blend(path, name, entries):
+    palette = bpy.data.palettes.new(name)
+    try:
+        for _, color in entries:
+            palette.colors.new().color = color
+        bpy.data.libraries.write(path, {palette}, fake_user=True)
+    finally:
+        bpy.data.palettes.remove(palette)
+
+
+# pomocná funkce pro načtení všech Palette datablocků z .blend knihovny
+def read_palette_blend(path):
+    with bpy.data.libraries.load(path, link=False) as (data_from, data_to):
+        data_to.palettes = list(data_from.palettes)
+
+    entries = []
+    for palette in data_to.palettes:
+        if palette is None:
+            continue
+        entries.extend(
+            (f"{palette.name} {i + 1}", tuple(color.color)) for i, color in enumerate(palette.colors)
+        )
+        bpy.data.palettes.remove(palette)
+    return entries
+
+
+# pomocná funkce pro hromadné načtení vah jedné vertex group (vertex mimo skupinu = 0.0)
+def read_vertex_group_weights(mesh, group_index):
+    weights = np.zeros(len(mesh.vertices), dtype=np.float32)
+    # váhy vertex groups nemají hromadné foreach_get, čtou se po vertexech (výsledek se cachuje)
+    for vertex in mesh.vertices:
+        for element in vertex.groups:
+            if element.group == group_index:
+                weights[vertex.index] = element.weight
+                break
+    return weights
+
+
+# pomocná funkce pro převod hodnot (N,) mezi domain (FACE -> rohy, CORNER -> POINT průměruje rohy vertexu)
+def convert_domain_values(mesh, values, source_domain, target_domain):
+    if source_domain == 'FACE':
+        values = values[read_corner_faces(mesh)]
+        source_domain = 'CORNER'
+    if source_domain not in ('POINT', 'CORNER'):
+        raise ValueError(f"Attributes on the {source_domain.title()} domain cannot be used as weights.")
+    if source_domain == target_domain:
+        return values
+
+    loop_verts = get_cached_loop_vertices(mesh)
+    if target_domain == 'CORNER':
+        return values[loop_verts]
+
+    vert_count = len(mesh.vertices)
+    counts = np.bincount(loop_verts, minlength=vert_count).astype(np.float32)
+    return (np.bincount(loop_verts, values, vert_count) / np.maximum(counts, 1.0)).astype(np.float32)
+
+
+# funkce pro váhy všech prvků color attribute ze zdroje (VERTEX_GROUP, ATTRIBUTE, COLOR), hodnoty 0..1
+def read_element_weights(context, mesh, source, name):
+    """
+    VERTEX_GROUP = váha skupiny objektu, který mesh používá, ATTRIBUTE = float attribute
+    na POINT, CORNER nebo FACE domain, COLOR = jas (Rec. 709) jiného color attribute
+    použitého jako maska. Hodnoty se převedou na domain color attribute a ořežou na 0..1.
+    """
+    if source == 'VERTEX_GROUP':
+        obj = get_mesh_object(context, mesh)
+        group = obj.vertex_groups.get(name) if obj else None
+        if group is None:
+            raise ValueError(f"Vertex group '{name}' not found.")
+        values, domain = read_vertex_group_weights(mesh, group.index), 'POINT'
+    elif source == 'ATTRIBUTE':
+        attribute = mesh.attributes.get(name)
+        if attribute is None or attribute.data_type != 'FLOAT':
+            raise ValueError(f"Float attribute '{name}' not found.")
+        domain = attribute.domain
+        if mesh.is_editmode:
+            elements, layers = get_edit_mesh_elements(mesh, domain)
+            layer = layers.float[name]
+            values = np.array([element[layer] for element in elements], dtype=np.float32)
+        else:
+            values = np.empty(len(attribute.data), dtype=np.float32)
+            attribute.data.foreach_get("value", values)
+    elif source == 'COLOR':
+        if name == COLOR_ATTRIBUTE_NAME:
+            raise ValueError(f"'{COLOR_ATTRIBUTE_NAME}' cannot be its own mask.")
+        mask_layer = mesh.color_attributes.get(name)
+        if mask_layer is None:
+            raise ValueError(f"Color attribute '{name}' not found.")
+        values = read_mesh_colors(mesh, name)[:, :3] @ np.array((0.2126, 0.7152, 0.0722), dtype=np.float32)
+        domain = mask_layer.domain
+    else:
+        raise ValueError(f"Unknown weight source: {source}")
+
+    profile_count(bytes_moved=values.nbytes)
+    values = convert_domain_values(mesh, values, domain, get_color_domain(mesh))
+    return np.clip(values, 0.0, 1.0).astype(np.float32)
+
+
+# třída pro váhy prvků color attribute z jednoho zdroje
+class WeightMap:
+    __slots__ = ("fingerprint", "source", "name", "domain", "weights")
+
+    def __init__(self, fingerprint, source, name, domain, weights):
+        self.fingerprint = fingerprint
+        self.source = source
+        self.name = name
+        self.domain = domain
+        self.weights = weights
+
+
+# LRU cache vah podle meshe (jeden zdroj na mesh), maže se při změně geometrie nebo vah
+WEIGHT_CACHE_SIZE = 4
+_weight_cache = OrderedDict()
+
+
+# pomocná funkce pro váhy meshe s využitím cache
+def get_element_weights(context, mesh, source, name):
+    key = get_mesh_key(mesh)
+    fingerprint = get_topology_fingerprint(mesh)
+    domain = get_color_domain(mesh)
+    weight_map = _weight_cache.get(key)
+    if (weight_map is None or weight_map.fingerprint != fingerprint or weight_map.domain != domain
+            or weight_map.source != source or weight_map.name != name):
+        weights = read_element_weights(context, mesh, source, name)
+        weight_map = WeightMap(fingerprint, source, name, domain, weights)
+        _weight_cache[key] = weight_map
+    _weight_cache.move_to_end(key)
+    while len(_weight_cache) > WEIGHT_CACHE_SIZE:
+        _weight_cache.popitem(last=False)
+    return weight_map.weights
+
+
+# pomocná funkce pro explicitní zneplatnění vah (bez argumentu smaže vše)
+def invalidate_weight_cache(mesh=None):
+    if mesh is None:
+        _weight_cache.clear()
+    else:
+        _weight_cache.pop(get_mesh_key(mesh), None)
+
+
+# funkce pro kernel váženého malování (síla = váha prvku ze zdroje)
+def compile_weighted_paint(source, name, mode='COLOR', strength=1.0, invert=False):
+    """
+    COLOR prolne barvy s barvou color pickeru podle váhy, BRIGHTNESS násobí uložené
+    původní barvy (snapshot jako u Apply Brightness) faktorem, který váha posouvá od 1.0
+    k vtx_brightness_slider. Váhy celého meshe se načtou jednou a cachují, kernel z nich
+    jen vybere prvky corner_indices, takže stačí jeden průchod nad celým meshem.
+    """
+    if mode not in ('COLOR', 'BRIGHTNESS'):
+        raise ValueError(f"Unknown weighted paint mode: {mode}")
+
+    def weighted_paint_kernel(mesh, colors, corner_indices, context):
+        weights = get_element_weights(context, mesh, source, name)[corner_indices]
+        if mode == 'COLOR':
+            target = np.array((*context.scene.vtx_color_picker[:3], 1.0), dtype=np.float32)
+            invalidate_color_snapshot(mesh)
+        else:
+            snapshot = get_color_snapshot(mesh, COLOR_ATTRIBUTE_NAME, corner_indices)
+            if snapshot is None:
+                snapshot = store_color_snapshot(mesh, COLOR_ATTRIBUTE_NAME, corner_indices, colors)
+            factor = context.scene.vtx_brightness_slider
+            snapshot_colors = snapshot.colors
+
+        def compute(progress=None):
+            result = np.empty_like(colors)
+
+            def compute_rows(rows):
+                amount = (1.0 - weights[rows] if invert else weights[rows]) * np.float32(strength)
+                if mode == 'COLOR':
+                    result[rows] = colors[rows] + (target - colors[rows]) * amount[:, None]
+                else:
+                    result[rows, :3] = snapshot_colors[rows] * (1.0 + (factor - 1.0) * amount)[:, None]
+                    result[rows, 3] = 1.0
+
+            return result if compute_in_chunks(len(colors), compute_rows, progress) else None
+
+        return compute
+
+    return split_kernel(weighted_paint_kernel)
+
+
+# záložní cesta pro vlastní callbacky volané po jednotlivých loops
+def run_per_loop_callback(colors, corner_indices, context, operation_callback):
+    result = colors.copy()
+    for i, loop_index in enumerate(corner_indices.tolist()):
+        result[i] = operation_callback(tuple(colors[i]), loop_index, context)
+    return result
+
+
+# pomocná funkce pro získání cílových meshů, objekty se sdíleným meshem jsou ve skupině
+def get_target_meshes(context):
+    obj = context.active_object
+
+    if not context.scene.vtx_batch_selected:
+        return [(obj.data, [obj])]
+
+    candidates = [obj]
+    candidates.extend(getattr(context, "objects_in_mode_unique_data", []))
+    candidates.extend(context.selected_objects)
+
+    groups = {}
+    for candidate in candidates:
+        if not candidate or candidate.type != MESH_TYPE:
+            continue
+        mesh, objects = groups.setdefault(get_mesh_key(candidate.data), (candidate.data, []))
+        if candidate not in objects:
+            objects.append(candidate)
+
+    return list(groups.values())
+
+
+# pomocná funkce pro výpočet nových barev vybraných rohů
+def compute_new_colors(context, mesh, selected_colors, corner_indices, operation_callback, array_operation):
+    if array_operation is not None:
+        new_colors = array_operation(mesh, selected_colors, corner_indices, context)
+    else:
+        new_colors = run_per_loop_callback(selected_colors, corner_indices, context, operation_callback)
+    record_color_delta(mesh, corner_indices, selected_colors, new_colors)
+    return new_colors
+
+
+# pomocná funkce pro aplikaci operace na jeden mesh (mesh nesmí být v Edit Mode)
+def process_mesh_colors(context, mesh, operation_callback, array_operation, corner_indices=None):
+    color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
+    if corner_indices is None:
+        with profile_phase("selection"):
+            corner_indices = get_cached_element_indices(mesh, color_layer.domain)
+
+    if len(corner_indices) > 0:
+        with profile_phase("color_read"):
+            colors = read_color_attribute(color_layer)
+            selected_colors = colors[corner_indices]
+        with profile_phase("compute"):
+            new_colors = compute_new_colors(
+                context, mesh, selected_colors, corner_indices, operation_callback, array_operation
+            )
+        with profile_phase("write_back"):
+            colors[corner_indices] = new_colors
+            write_color_attribute(color_layer, colors)
+        mark_own_update(mesh)
+        with profile_phase("mesh_update"):
+            mesh.update()
+
+    profile_count(corners=len(corner_indices))
+    return len(corner_indices)
+
+
+# pomocná funkce pro aplikaci operace přímo v Edit Mode bez přepnutí do Object Mode
+def process_edit_mesh_colors(context, obj, operation_callback, array_operation, corner_indices=None, synced=False):
+    """
+    Výběr a mapování rohů se čtou hromadně z mesh dat po update_from_editmode, barvy
+    vybraných prvků se čtou i zapisují po prvcích BMesh (EditMeshColors), protože data
+    color attribute v Edit Mode přes RNA číst nejdou. Edit mesh se nepřestavuje, práce
+    v Pythonu roste jen s počtem vybraných prvků. synced=True přeskočí update_from_editmode,
+    pokud ho volající už provedl (sync_edit_meshes).
+    """
+    mesh = obj.data
+
+    if not synced:
+        with profile_phase("sync_edit_mesh"):
+            obj.update_from_editmode()
+
+    if corner_indices is None:
+        with profile_phase("selection"):
+            corner_indices = get_cached_element_indices(mesh, get_color_domain(mesh))
+    if len(corner_indices) == 0:
+        return 0
+
+    with profile_phase("color_read"):
+        edit_colors = EditMeshColors(mesh, corner_indices)
+        colors = edit_colors.read()
+    with profile_phase("compute"):
+        new_colors = compute_new_colors(
+            context, mesh, colors, corner_indices, operation_callback, array_operation
+        )
+    with profile_phase("write_back"):
+        edit_colors.write(new_colors)
+    mark_own_update(mesh)
+
+    profile_count(corners=len(corner_indices))
+    return len(corner_indices)
+
+
+# funkce pro zpracování barev jednoho meshe po oknech s omezenou pamětí (generátor, mesh nesmí být v Edit Mode)
+def stream_mesh_colors(context, mesh, array_operation, memory_budget, selected_only=True):
+    """
+    Indexy prvků a mezivýsledky kernelu vznikají jen pro jedno okno prvků, jehož velikost
+    se odvodí z memory_budget (bajty). Špičku paměti ale rozpočet neomezuje: bpy neumí
+    číst ani zapisovat výřezy color attribute, barvy se proto načtou a zapíšou jedním
+    foreach_get/foreach_set pro celý mesh (16 B na prvek) a stejně celé jsou i výběr
+    vertexů (1 B na vertex) a mapa roh -> vertex (4 B na roh, z cache).
+    array_operation musí zpracovat každý prvek nezávisle (výplň, compile_color_pipeline),
+    kernely počítající s celým výběrem (gradient, jas se snapshotem) sem nepatří.
+    Po každém okně vrací (zpracované prvky, celkem prvků); barvy se zapíšou až po
+    posledním okně, při přerušení (close) zůstane mesh beze změny.
+    """
+    color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
+    count = len(color_layer.data)
+    window = max(STREAM_MIN_WINDOW, int(memory_budget) // STREAM_BYTES_PER_ELEMENT)
+
+    colors = read_color_attribute(color_layer)
+    vert_select = read_vertex_selection(mesh) if selected_only else None
+    loop_verts = get_cached_loop_vertices(mesh) if selected_only and color_layer.domain == 'CORNER' else None
+
+    modified = 0
+    for start in range(0, count, window):
+        stop = min(start + window, count)
+        if vert_select is None:
+            element_indices = np.arange(start, stop, dtype=np.int32)
+            colors[start:stop] = array_operation(mesh, colors[start:stop], element_indices, context)
+        else:
+            window_select = vert_select[start:stop] if loop_verts is None else vert_select[loop_verts[start:stop]]
+            element_indices = np.flatnonzero(window_select).astype(np.int32)
+            element_indices += start
+            if len(element_indices):
+                colors[element_indices] = array_operation(mesh, colors[element_indices], element_indices, context)
+        modified += len(element_indices)
+        yield stop, count
+
+    write_color_attribute(color_layer, colors)
+    mark_own_update(mesh)
+    mesh.update()
+    profile_count(corners=modified)
+
+
+# pomocná funkce pro přiřazení materiálu k meshi (vrací False, pokud už byl přiřazen)
+def assign_vtx_color_material(mesh, mat):
+    if mat.name in [m.name for m in mesh.materials if m is not None]:
+        return False
+    mesh.materials.append(mat)
+    return True
+
+
+# pomocná funkce pro vytvoření color attribute (vrací False, pokud už existoval)
+def ensure_color_attribute(mesh, domain='CORNER', data_type='FLOAT_COLOR'):
+    if COLOR_ATTRIBUTE_NAME in mesh.color_attributes:
+        return mesh.color_attributes[COLOR_ATTRIBUTE_NAME], False
+
+    color_attr = mesh.color_attributes.new(
+        name=COLOR_ATTRIBUTE_NAME,
+        type=data_type,
+        domain=domain
+    )
+    mesh.color_attributes.active_color = color_attr
+    return color_attr, True
+
+
+# pomocná funkce pro převod barev mezi domain (CORNER -> POINT průměruje rohy vertexu)
+def convert_domain_colors(mesh, colors, source_domain, target_domain):
+    if source_domain == target_domain:
+        return colors
+
+    loop_verts = get_cached_loop_vertices(mesh)
+    if target_domain == 'CORNER':
+        return colors[loop_verts]
+
+    vert_count = len(mesh.vertices)
+    counts = np.bincount(loop_verts, minlength=vert_count).astype(np.float32)
+    result = np.empty((vert_count, 4), dtype=np.float32)
+    for channel in range(4):
+        result[:, channel] = np.bincount(loop_verts, colors[:, channel], vert_count)
+    result /= np.maximum(counts, 1.0)[:, None]
+    result[counts == 0] = (0.0, 0.0, 0.0, 1.0)
+    return result
+
+
+# pomocná funkce pro hromadný převod color attribute na jiný domain a typ (mesh nesmí být v Edit Mode)
+def convert_color_attribute(mesh, domain, data_type):
+    color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
+    if color_layer.domain == domain and color_layer.data_type == data_type:
+        return False
+
+    was_active = mesh.color_attributes.active_color_name == COLOR_ATTRIBUTE_NAME
+    was_render = mesh.color_attributes.render_color_index == mesh.color_attributes.find(COLOR_ATTRIBUTE_NAME)
+    colors = convert_domain_colors(mesh, read_color_attribute(color_layer), color_layer.domain, domain)
+
+    mesh.color_attributes.remove(color_layer)
+    color_layer = mesh.color_attributes.new(name=COLOR_ATTRIBUTE_NAME, type=data_type, domain=domain)
+    write_color_attribute(color_layer, colors)
+
+    if was_active:
+        mesh.color_attributes.active_color = color_layer
+    if was_render:
+        mesh.color_attributes.render_color_index = mesh.color_attributes.find(COLOR_ATTRIBUTE_NAME)
+
+    invalidate_color_snapshot(mesh)
+    mark_own_update(mesh)
+    mesh.update()
+    return True
+
+
+# pomocná funkce pro cestu k JSON popisu souboru barev (vedle .npy)
+def get_color_file_header_path(path):
+    return os.path.splitext(path)[0] + ".json"
+
+
+# funkce pro export color attribute do .npy (float32 RGBA) s JSON popisem a otiskem topologie (edit mesh musí být synchronizovaný)
+def export_color_attribute(mesh, path):
+    color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
+    colors = read_mesh_colors(mesh)
+    np.save(path, colors, allow_pickle=False)
+
+    header = {
+        "version": COLOR_FILE_VERSION,
+        "mesh": mesh.name,
+        "attribute": COLOR_ATTRIBUTE_NAME,
+        "domain": color_layer.domain,
+        "data_type": color_layer.data_type,
+        "count": len(colors),
+        "fingerprint": list(get_topology_fingerprint(mesh)),
+    }
+    with open(get_color_file_header_path(path), "w", encoding="utf-8") as f:
+        json.dump(header, f, indent=2)
+    return len(colors)
+
+
+# pomocná funkce pro načtení JSON popisu souboru barev
+def read_color_file_header(path):
+    with open(get_color_file_header_path(path), "r", encoding="utf-8") as f:
+        header = json.load(f)
+    if not isinstance(header, dict) or header.get("version") != COLOR_FILE_VERSION:
+        raise ValueError(f"Unsupported color file: '{path}'")
+    return header
+
+
+# funkce pro import color attribute z .npy přes memory mapping (mesh nesmí být v Edit Mode)
+def import_color_attribute(mesh, path):
+    """
+    Pole se nenačítá do paměti, foreach_set čte přímo z namapovaného souboru. Import
+    odmítne (ValueError) soubor s jiným otiskem topologie, domain nebo počtem prvků.
+    Chybějící color attribute se vytvoří s domain a typem ze souboru.
+    """
+    header = read_color_file_header(path)
+    if tuple(header["fingerprint"]) != get_topology_fingerprint(mesh):
+        raise ValueError(f"Topology of '{mesh.name}' does not match '{os.path.basename(path)}'.")
+
+    colors = np.load(path, mmap_mode='r', allow_pickle=False)
+    if colors.dtype != np.float32 or colors.ndim != 2 or colors.shape != (header["count"], 4):
+        raise ValueError(f"Unexpected color data in '{os.path.basename(path)}'.")
+
+    color_layer, _ = ensure_color_attribute(mesh, header["domain"], header["data_type"])
+    if color_layer.domain != header["domain"] or len(color_layer.data) != len(colors):
+        raise ValueError(f"Color domain of '{mesh.name}' does not match '{os.path.basename(path)}'.")
+
+    write_color_attribute(color_layer, colors)
+    invalidate_color_snapshot(mesh)
+    mark_own_update(mesh)
+    mesh.update()
+    return len(colors)
+
+
+# pomocná funkce pro název souboru barev meshe v dávkovém režimu
+def get_color_file_name(mesh):
+    return bpy.path.clean_name(mesh.name) + COLOR_FILE_EXTENSION
+
+
+# funkce pro export barev všech lokálních meshů s color attribute do adresáře, vrací počet meshů
+def export_all_color_attributes(directory):
+    os.makedirs(directory, exist_ok=True)
+    exported = 0
+    for mesh in bpy.data.meshes:
+        if mesh.library is None and validate_color_attribute(mesh):
+            export_color_attribute(mesh, os.path.join(directory, get_color_file_name(mesh)))
+            exported += 1
+    return exported
+
+
+# funkce pro import barev všech souborů v adresáři do meshů podle názvu, vrací (importováno, chyby)
+def import_all_color_attributes(directory):
+    meshes = {mesh.name: mesh for mesh in bpy.data.meshes if mesh.library is None}
+    imported = 0
+    errors = []
+    for file_name in sorted(os.listdir(directory)):
+        if not file_name.endswith(COLOR_FILE_EXTENSION):
+            continue
+        path = os.path.join(directory, file_name)
+        try:
+            mesh = meshes.get(read_color_file_header(path)["mesh"])
+            if mesh is None:
+                raise ValueError(f"No mesh for '{file_name}'.")
+            if mesh.is_editmode:
+                raise ValueError(f"Mesh '{mesh.name}' is in Edit Mode.")
+            import_color_attribute(mesh, path)
+            imported += 1
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            errors.append(str(e))
+    return imported, errors
+
+
+# pomocná funkce pro hromadné nastavení výběru podle masky prvků color attribute (mesh nesmí být v Edit Mode)
+def select_by_element_mask(mesh, element_mask, domain, select_mode, extend):
+    """
+    VERTEX vybere vertexy, jejichž barva (nebo barva kteréhokoli jejich rohu) odpovídá,
+    FACE vybere faces, jejichž všechny rohy odpovídají. Hrany a faces se dopočítají
+    jako při flush výběru, skryté prvky se nevybírají. Vrací počet vybraných prvků.
+    """
+    loop_verts = get_cached_loop_vertices(mesh)
+    corner_match = element_mask[loop_verts] if domain == 'POINT' else element_mask
+
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    edges = read_edge_vertices(mesh)
+
+    vert_hide = np.zeros(len(mesh.vertices), dtype=bool)
+    mesh.vertices.foreach_get("hide", vert_hide)
+    face_hide = np.zeros(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_get("hide", face_hide)
+
+    if select_mode == 'FACE':
+        face_select = np.logical_and.reduceat(corner_match, loop_starts) if len(loop_starts) else face_hide.copy()
+        face_select &= ~face_hide
+        loop_totals = np.diff(np.append(loop_starts, len(loop_verts)))
+        selected_corners = np.repeat(face_select, loop_totals)
+
+        vert_select = np.zeros(len(mesh.vertices), dtype=bool)
+        vert_select[loop_verts[selected_corners]] = True
+        loop_edges = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("edge_index", loop_edges)
+        edge_select = np.zeros(len(mesh.edges), dtype=bool)
+        edge_select[loop_edges[selected_corners]] = True
+    else:
+        if domain == 'POINT':
+            vert_select = element_mask.copy()
+        else:
+            vert_select = np.zeros(len(mesh.vertices), dtype=bool)
+            vert_select[loop_verts[corner_match]] = True
+        vert_select &= ~vert_hide
+        edge_select = vert_select[edges[:, 0]] & vert_select[edges[:, 1]]
+        if len(loop_starts):
+            face_select = np.logical_and.reduceat(vert_select[loop_verts], loop_starts) & ~face_hide
+        else:
+            face_select = face_hide.copy()
+
+    if extend:
+        vert_select |= read_vertex_selection(mesh)
+        current = np.zeros(len(mesh.edges), dtype=bool)
+        mesh.edges.foreach_get("select", current)
+        edge_select |= current
+        current = np.zeros(len(mesh.polygons), dtype=bool)
+        mesh.polygons.foreach_get("select", current)
+        face_select |= current
+
+    mesh.vertices.foreach_set("select", vert_select)
+    mesh.edges.foreach_set("select", edge_select)
+    mesh.polygons.foreach_set("select", face_select)
+    mesh.update()
+
+    return int(face_select.sum()) if select_mode == 'FACE' else int(vert_select.sum())
+
+
+# pomocná funkce pro nejčastější barvu mezi vybranými prvky (None bez výběru)
+def get_dominant_selected_color(mesh, index):
+    element_indices = get_cached_element_indices(mesh, index.domain)
+    if len(element_indices) == 0:
+        return None
+    counts = np.bincount(index.inverse[element_indices], minlength=len(index.colors))
+    return tuple(index.colors[np.argmax(counts), :3].tolist())
+
+
+# pomocná funkce pro práci s vertex colors
+def apply_vertex_color_operation(context, operation_callback, operation_name, array_operation=None):
+    """
+    array_operation(mesh, colors, corner_indices, context) dostane barvy vybraných rohů
+    (u color attribute v POINT domain vybraných vertexů, corner_indices jsou pak indexy vertexů)
+    jako pole (N, 4) float32 a vrací nové pole stejného tvaru. Pokud není zadán,
+    použije se operation_callback(current_color, loop_index, context) pro každý loop.
+    """
+    obj = context.active_object
+    
+    if not obj or obj.type != MESH_TYPE:
+        return ('CANCELLED', 'ERROR', "No active mesh object.")
+    
+    if obj.mode != 'EDIT':
+        return ('CANCELLED', 'ERROR', f"Must be in Edit Mode to apply {operation_name}.")
+    
+    targets = [
+        (mesh, objects) for mesh, objects in get_target_meshes(context)
+        if validate_color_attribute(mesh)
+    ]
+    if not targets:
+        return ('CANCELLED', 'ERROR', ERROR_MSG_ATTRIBUTE)
+    
+    original_mode = obj.mode
+    begin_profile(context, operation_name)
+    
+    if obj.mode != 'OBJECT' and not context.scene.vtx_edit_mode_native:
+        with profile_phase("mode_switch"):
+            bpy.ops.object.mode_set(mode='OBJECT')
+    
+    modified_count = 0
+    operation_start = time.perf_counter()
+    
+    try:
+        for mesh, objects in targets:
+            start = time.perf_counter()
+            if mesh.is_editmode:
+                edit_obj = next(o for o in objects if o.mode == 'EDIT')
+                count = process_edit_mesh_colors(context, edit_obj, operation_callback, array_operation)
+            else:
+                count = process_mesh_colors(context, mesh, operation_callback, array_operation)
+            # časy po objektech jdou jen do záznamu profilování (panel, export JSON / Chrome trace)
+            profile_mesh(", ".join(o.name for o in objects), start, count)
+            modified_count += count
+    except Exception as e:
+        end_profile()
+        return ('CANCELLED', 'ERROR', f"Failed to access mesh data: {str(e)}")
+    finally:
+        try:
+            if obj and obj.mode != original_mode:
+                with profile_phase("mode_switch"):
+                    bpy.ops.object.mode_set(mode=original_mode)
+        except Exception as e:
+            print(f"Warning: Could not restore mode: {str(e)}")
+    
+    total_time = time.perf_counter() - operation_start
+    with profile_phase("redraw"):
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+    end_profile()
+    
+    if modified_count > 0:
+        if len(targets) > 1:
+            return ('FINISHED', 'INFO',
+                    f"{operation_name} applied to {modified_count} vertices "
+                    f"on {len(targets)} meshes in {total_time * 1000.0:.1f} ms.")
+        return ('FINISHED', 'INFO', f"{operation_name} applied to {modified_count} vertices.")
+    else:
+        return ('FINISHED', 'WARNING', "No vertices selected.")
+    
+
+# pomocná funkce pro získání 3D viewport shadingu
+def get_viewport_shading(context):
+    """získá shading objekt z aktivního 3D viewportu"""
+    for area in context.screen.areas:
+        if area.type == 'VIEW_3D':
+            for space in area.spaces:
+                if space.type == 'VIEW_3D':
+                    return space.shading
+    return None
+
+
+# pomocná funkce pro získání shading typu
+def get_viewport_shading_type(context, property_name, default_value):
+    shading = get_viewport_shading(context)
+    if shading and hasattr(shading, property_name):
+        return getattr(shading, property_name, default_value)
+    return default_value
+
+
+# pomocná funkce pro kontrolu zda je vertex color toggle dostupný
+def is_vertex_toggle_enabled(context):
+    return get_viewport_shading_type(context, 'type', 'SOLID') == 'SOLID'
+
+
+# pomocná funkce pro validaci aktivního mesh objektu
+def validate_active_mesh_object(context):
+    obj = context.active_object
+    if not obj or obj.type != MESH_TYPE:
+        return None, "No active mesh object."
+    return obj, None
+
+
+# pomocná funkce pro kontrolu color attribute
+def validate_color_attribute(mesh):
+    return COLOR_ATTRIBUTE_NAME in mesh.color_attributes
+
+
+# pomocná funkce pro kontrolu, zda je materiál připraven
+def validate_material_prepared(mesh):
+
+    mat_name = MATERIAL_NAME
+    for mat in mesh.materials:
+        if mat and mat.name == mat_name:
+            return True
+    return False
+
+
+# pomocná funkce pro kompletní validaci před aplikací vertex operací
+def validate_for_vertex_operation(context):
+
+    obj, error = validate_active_mesh_object(context)
+    if error:
+        return False, 'ERROR', error
+    
+    mesh = obj.data
+    
+    if not validate_material_prepared(mesh):
+        return False, 'ERROR', ERROR_MSG_MATERIAL
+    
+    return True, None, None
+
+
+# pomocná funkce pro hromadné načtení vstupů background výpočtu na hlavním vlákně
+def prepare_background_jobs(context, targets, kernel, get_indices):
+    sync_edit_meshes(targets)
+
+    jobs = []
+    for mesh, objects in targets:
+        # synchronizace edit meshe už je zápis do mesh dat, výpočet pak trvá přes více cyklů
+        if mesh.is_editmode:
+            mark_own_update(mesh)
+        domain = get_color_domain(mesh)
+        corner_indices = get_indices(mesh)
+        if len(corner_indices) == 0:
+            continue
+
+        colors = read_element_colors(mesh, corner_indices)
+        jobs.append({
+            "mesh": mesh,
+            "fingerprint": get_topology_fingerprint(mesh),
+            "domain": domain,
+            "corner_indices": corner_indices,
+            "colors": colors,
+            "compute": kernel.prepare(mesh, colors, corner_indices, context),
+            "result": None,
+        })
+    return jobs
+
+
+# funkce pro kernel, který zapíše hotový výsledek background výpočtu
+def compile_background_result(job):
+    def background_result_kernel(mesh, colors, corner_indices, context):
+        # barvy změněné během výpočtu (jiný operátor, undo) se nepřepisují
+        if not np.array_equal(colors, job["colors"]):
+            raise RuntimeError(f"Colors of '{mesh.name}' changed during the computation.")
+        return job["result"]
+
+    return background_result_kernel
+
+
+# funkce pro zápis výsledků background výpočtu na hlavním vlákně, vrací počet zapsaných prvků
+def commit_background_jobs(context, jobs):
+    for job in jobs:
+        mesh = job["mesh"]
+        if (not validate_color_attribute(mesh)
+                or get_topology_fingerprint(mesh) != job["fingerprint"]
+                or get_color_domain(mesh) != job["domain"]):
+            raise RuntimeError(f"Mesh '{mesh.name}' changed during the computation.")
+
+    obj = context.active_object
+    original_mode = obj.mode if obj else 'OBJECT'
+    if original_mode != 'OBJECT' and not context.scene.vtx_edit_mode_native:
+        with profile_phase("mode_switch"):
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+    corner_count = 0
+    try:
+        for job in jobs:
+            mesh = job["mesh"]
+            kernel = compile_background_result(job)
+            if mesh.is_editmode:
+                edit_obj = next(o for o in bpy.data.objects if o.data == mesh and o.mode == 'EDIT')
+                corner_count += process_edit_mesh_colors(context, edit_obj, None, kernel, job["corner_indices"])
+            else:
+                corner_count += process_mesh_colors(context, mesh, None, kernel, job["corner_indices"])
+    finally:
+        try:
+            if obj and obj.mode != original_mode:
+                with profile_phase("mode_switch"):
+                    bpy.ops.object.mode_set(mode=original_mode)
+        except Exception as e:
+            print(f"Warning: Could not restore mode: {str(e)}")
+
+    for area in context.screen.areas if context.screen else ():
+        if area.type == 'VIEW_3D':
+            area.tag_redraw()
+    return corner_count
+
+
+# třída se společným modálním během pro operátory, jejichž výpočet jde do worker vlákna
+class BackgroundColorCompute:
+    """
+    Operátor dodá build_operation(context) -> (název, kernel). Se zapnutým Background Compute
+    invoke hromadně načte barvy vybraných prvků na hlavním vlákně, kernel.prepare z nich
+    sestaví výpočet bez přístupu k bpy a ten běží ve worker vlákně po blocích. Timer v modalu
+    ukazuje hotové bloky a výsledky zapíše na hlavním vlákně jedním foreach_set. Esc nastaví
+    cancel_event, výpočty skončí po rozpracovaném bloku a nic se nezapíše.
+    Kernel bez prepare (viz split_kernel) nebo vypnutá volba vedou na obyčejné execute.
+    """
+    requires_edit_mode = True
+
+    def get_element_indices(self, mesh):
+        return get_cached_element_indices(mesh, get_color_domain(mesh))
+
+    def invoke(self, context, event):
+        if not context.scene.vtx_background_compute:
+            return self.execute(context)
+
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        try:
+            name, kernel = self.build_operation(context)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        if kernel is None or not hasattr(kernel, "prepare"):
+            return self.execute(context)
+
+        if self.requires_edit_mode and context.active_object.mode != 'EDIT':
+            self.report({'ERROR'}, f"Must be in Edit Mode to apply {name}.")
+            return {'CANCELLED'}
+
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        try:
+            self._jobs = prepare_background_jobs(context, targets, kernel, self.get_element_indices)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to access mesh data: {str(e)}")
+            return {'CANCELLED'}
+        if not self._jobs:
+            self.report({'WARNING'}, "No vertices selected.")
+            return {'CANCELLED'}
+
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._name = name
+        self._start = time.perf_counter()
+        self._cancel_event = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=min(len(self._jobs), os.cpu_count() or 1))
+        self._futures = []
+        for job in self._jobs:
+            job["progress"] = ComputeProgress(self._cancel_event)
+            self._futures.append(self._executor.submit(job["compute"], job["progress"]))
+        self._element_count = sum(len(job["corner_indices"]) for job in self._jobs)
+
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(BACKGROUND_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def end_background(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            # běžící výpočty skončí na začátku dalšího bloku, čekající se vůbec nespustí
+            self._cancel_event.set()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self.end_background(context)
+            self._jobs = []
+            self.report({'WARNING'}, f"{self._name} cancelled.")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        done = sum(1 for future in self._futures if future.done())
+        elapsed = time.perf_counter() - self._start
+        # průběh po blocích, meshe váží počtem prvků
+        percent = int(100 * sum(
+            len(job["corner_indices"]) * (1.0 if future.done() else job["progress"].fraction())
+            for job, future in zip(self._jobs, self._futures)
+        ) / max(self._element_count, 1))
+        context.window_manager.progress_update(percent)
+        context.workspace.status_text_set(
+            f"Computing {self._name}: {percent} %, {done}/{len(self._futures)} meshes, {elapsed:.1f} s (Esc to cancel)"
+        )
+        if done < len(self._futures):
+            return {'PASS_THROUGH'}
+
+        self.end_background(context)
+        self._executor.shutdown()
+        return self.finish_background(context, elapsed)
+
+    def finish_background(self, context, elapsed):
+        # operátory bez UNDO v bl_options zapisují undo krok ručně (viz Lightweight Undo)
+        manual_undo = 'UNDO' not in self.bl_options
+        if manual_undo:
+            begin_color_history(context, self._name)
+        begin_profile(context, self._name)
+        try:
+            for job, future in zip(self._jobs, self._futures):
+                job["result"] = future.result()
+            corner_count = commit_background_jobs(context, self._jobs)
+        except Exception as e:
+            self.report({'ERROR'}, f"{self._name} failed: {str(e)}")
+            return {'CANCELLED'}
+        finally:
+            end_profile()
+            if manual_undo:
+                end_color_history(context)
+            self._jobs = []
+
+        if manual_undo:
+            push_global_undo(context, self.bl_label)
+        self.report(
+            {'INFO'},
+            f"{self._name} applied to {corner_count} vertices (computed in background in {elapsed * 1000.0:.0f} ms)."
+        )
+        return {'FINISHED'}
+
+
+# třída operátoru pro přípravu materiálu a color attribute
+class VTXCOLOR_prepare(bpy.types.Operator):
+    bl_idname = "material.prepare_vtx_color"
+    bl_label = "Prepare Material"
+    bl_description = DESC_PREPARE
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        obj, error = validate_active_mesh_object(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        mat, material_created = create_vtx_color_material()
+        mesh = obj.data
+
+        if assign_vtx_color_material(mesh, mat):
+            if material_created:
+                self.report({'INFO'}, f"Material: '{mat.name}' created and assigned to object.")
+            else:
+                self.report({'INFO'}, f"Material: '{mat.name}' assigned to object.")
+        else:
+            if material_created:
+                self.report({'WARNING'}, f"Material: '{mat.name}' created (already assigned).")
+            else:
+                self.report({'WARNING'}, f"Material: '{mat.name}' already assigned to object.")
+
+        scene = context.scene
+        color_attr, attribute_created = ensure_color_attribute(mesh, scene.vtx_color_domain, scene.vtx_color_type)
+        invalidate_panel_cache(mesh)
+        if not attribute_created:
+            if (color_attr.domain, color_attr.data_type) != (scene.vtx_color_domain, scene.vtx_color_type):
+                self.report({'WARNING'}, f"Color Attribute: '{color_attr.name}' already exists "
+                                         f"({color_attr.domain}, {color_attr.data_type}), use 'Convert' to change it.")
+            else:
+                self.report({'WARNING'}, f"Color Attribute: '{color_attr.name}' already exists.")
+        else:
+            self.report({'INFO'}, "Color Attribute created and set as default for rendering.")
+
+        return {'FINISHED'}
+
+
+# třída operátoru pro převod color attribute na zvolený domain a typ
+class VTXCOLOR_convert_domain(bpy.types.Operator):
+    bl_idname = "mesh.convert_vertex_color_domain"
+    bl_label = "Convert Color Attribute"
+    bl_description = DESC_CONVERT_DOMAIN
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        obj, error = validate_active_mesh_object(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        targets = [
+            mesh for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        original_mode = obj.mode
+        if original_mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        scene = context.scene
+        try:
+            converted = sum(convert_color_attribute(mesh, scene.vtx_color_domain, scene.vtx_color_type) for mesh in targets)
+        finally:
+            if obj.mode != original_mode:
+                bpy.ops.object.mode_set(mode=original_mode)
+
+        if converted == 0:
+            self.report({'INFO'}, "Color Attribute already uses the chosen domain and type.")
+        else:
+            self.report({'INFO'}, f"Color Attribute converted to {scene.vtx_color_domain}, "
+                                  f"{scene.vtx_color_type} on {converted} meshes.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro aplikaci barvy na vybrané vertices
+class VTXCOLOR_apply(BackgroundColorCompute, bpy.types.Operator):
+    bl_idname = "mesh.apply_vertex_color"
+    bl_label = "Apply Color"
+    bl_description = DESC_APPLY
+    # undo krok se zapisuje ručně, s Lightweight Undo jen do vlastní historie barev
+    bl_options = {'REGISTER'}
+
+    def build_operation(self, context):
+        return "Color", color_fill_kernel
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+        
+        name, kernel = self.build_operation(context)
+        begin_color_history(context, name)
+        try:
+            status, msg_type, message = apply_vertex_color_operation(
+                context, None, name, array_operation=kernel
+            )
+        finally:
+            end_color_history(context)
+        if status == 'FINISHED':
+            push_global_undo(context, self.bl_label)
+        
+        self.report({msg_type}, message)
+        return {status}
+
+
+# třída operátoru pro úpravu barev řetězcem operací (hodnoty lze ladit v redo panelu)
+class VTXCOLOR_adjust(BackgroundColorCompute, bpy.types.Operator):
+    bl_idname = "mesh.adjust_vertex_colors"
+    bl_label = "Adjust Colors"
+    bl_description = DESC_ADJUST
+    bl_options = {'REGISTER', 'UNDO'}
+
+    hue: bpy.props.FloatProperty(name="Hue Shift", default=0.0, min=-0.5, max=0.5)
+    saturation: bpy.props.FloatProperty(name="Saturation", default=1.0, min=0.0, max=4.0)
+    value: bpy.props.FloatProperty(name="Value", default=1.0, min=0.0, max=4.0)
+    contrast: bpy.props.FloatProperty(name="Contrast", default=1.0, min=0.0, max=4.0)
+    gamma: bpy.props.FloatProperty(name="Gamma", default=1.0, min=0.1, max=5.0)
+    blend_mode: bpy.props.EnumProperty(
+        name="Blend",
+        items=[
+            ('NONE', "None", "Do not blend with the picker color"),
+            ('MIX', "Mix", "Mix with the picker color"),
+            ('MULTIPLY', "Multiply", "Multiply by the picker color"),
+            ('OVERLAY', "Overlay", "Overlay the picker color"),
+            ('SCREEN', "Screen", "Screen with the picker color"),
+            ('ADD', "Add", "Add the picker color"),
+        ],
+        default='NONE',
+    )
+    blend_factor: bpy.props.FloatProperty(name="Blend Factor", default=1.0, min=0.0, max=1.0)
+    channels: bpy.props.BoolVectorProperty(
+        name="Channels",
+        size=3,
+        default=(True, True, True),
+        description="Color channels (R, G, B) that are written, alpha is kept",
+    )
+
+    def build_steps(self):
+        steps = []
+        if self.hue != 0.0 or self.saturation != 1.0 or self.value != 1.0:
+            steps.append({"type": 'hsv', "hue": self.hue, "saturation": self.saturation, "value": self.value})
+        if self.contrast != 1.0:
+            steps.append({"type": 'contrast', "contrast": self.contrast})
+        if self.gamma != 1.0:
+            steps.append({"type": 'gamma', "gamma": self.gamma})
+        if self.blend_mode != 'NONE':
+            steps.append({"type": 'mix', "mode": self.blend_mode, "factor": self.blend_factor})
+        return steps
+
+    def build_operation(self, context):
+        steps = self.build_steps()
+        if not steps:
+            return "Adjustment", None
+        return "Adjustment", compile_color_pipeline(steps, tuple(self.channels))
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        name, kernel = self.build_operation(context)
+        if kernel is None:
+            self.report({'INFO'}, "No adjustment set.")
+            return {'FINISHED'}
+
+        status, msg_type, message = apply_vertex_color_operation(
+            context, None, name, array_operation=kernel
+        )
+
+        self.report({msg_type}, message)
+        return {status}
+
+
+# třída operátoru pro filtry barev nad sousedností vertexů (hodnoty lze ladit v redo panelu)
+class VTXCOLOR_filter(BackgroundColorCompute, bpy.types.Operator):
+    bl_idname = "mesh.filter_vertex_colors"
+    bl_label = "Filter Colors"
+    bl_description = DESC_FILTER
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_type: bpy.props.EnumProperty(
+        name="Filter",
+        items=[
+            ('SMOOTH', "Smooth", "Average with the neighboring vertices"),
+            ('SHARPEN', "Sharpen", "Push away from the neighbor average"),
+            ('DILATE', "Dilate", "Grow bright colors (maximum of the neighbors per channel)"),
+            ('ERODE', "Erode", "Grow dark colors (minimum of the neighbors per channel)"),
+        ],
+        default='SMOOTH',
+    )
+    iterations: bpy.props.IntProperty(name="Iterations", default=5, min=1, max=200)
+    factor: bpy.props.FloatProperty(name="Factor", default=1.0, min=0.0, max=1.0)
+
+    def build_operation(self, context):
+        return self.filter_type.title(), compile_color_filter(self.filter_type, self.iterations, self.factor)
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        name, kernel = self.build_operation(context)
+        status, msg_type, message = apply_vertex_color_operation(
+            context, None, name, array_operation=kernel
+        )
+
+        self.report({msg_type}, message)
+        return {status}
+
+
+# třída zastávky gradientu (pozice a barva)
+class VTXCOLOR_gradient_stop(bpy.types.PropertyGroup):
+    position: bpy.props.FloatProperty(name="Position", default=0.0, min=0.0, max=1.0)
+    color: bpy.props.FloatVectorProperty(name="Color", subtype='COLOR', default=(1.0, 1.0, 1.0), min=0.0, max=1.0)
+
+
+# třída operátoru pro přidání zastávky gradientu s barvou z color pickeru
+class VTXCOLOR_gradient_stop_add(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_gradient_stop_add"
+    bl_label = "Add Gradient Stop"
+    bl_description = DESC_GRADIENT_STOP_ADD
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        stops = context.scene.vtx_gradient_stops
+        stop = stops.add()
+        stop.position = 0.0 if len(stops) == 1 else 1.0
+        stop.color = context.scene.vtx_color_picker
+        return {'FINISHED'}
+
+
+# třída operátoru pro odebrání zastávky gradientu
+class VTXCOLOR_gradient_stop_remove(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_gradient_stop_remove"
+    bl_label = "Remove Gradient Stop"
+    bl_description = DESC_GRADIENT_STOP_REMOVE
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: bpy.props.IntProperty(default=0)
+
+    def execute(self, context):
+        stops = context.scene.vtx_gradient_stops
+        if 0 <= self.index < len(stops):
+            stops.remove(self.index)
+        return {'FINISHED'}
+
+
+# třída operátoru pro gradientní výplň vybraných vertexů (hodnoty lze ladit v redo panelu)
+class VTXCOLOR_gradient(BackgroundColorCompute, bpy.types.Operator):
+    bl_idname = "mesh.vertex_color_gradient"
+    bl_label = "Gradient Fill"
+    bl_description = DESC_GRADIENT
+    bl_options = {'REGISTER', 'UNDO'}
+
+    gradient_type: bpy.props.EnumProperty(
+        name="Type",
+        items=[
+            ('LINEAR', "Linear", "Along a direction across the selection"),
+            ('AXIS', "Axis", "Along a world axis across the selection"),
+            ('RADIAL', "Radial", "From the center of the selection outwards"),
+            ('CURSOR', "3D Cursor", "By distance from the 3D cursor within the radius"),
+        ],
+        default='LINEAR',
+    )
+    axis: bpy.props.EnumProperty(
+        name="Axis",
+        items=[('X', "X", ""), ('Y', "Y", ""), ('Z', "Z", "")],
+        default='Z',
+    )
+    direction: bpy.props.FloatVectorProperty(name="Direction", subtype='DIRECTION', default=(0.0, 0.0, 1.0))
+    radius: bpy.props.FloatProperty(name="Radius", subtype='DISTANCE', default=1.0, min=0.0001)
+    falloff: bpy.props.EnumProperty(
+        name="Falloff",
+        items=[
+            ('LINEAR', "Linear", ""),
+            ('SMOOTH', "Smooth", ""),
+            ('SPHERE', "Sphere", ""),
+            ('SHARP', "Sharp", ""),
+            ('ROOT', "Root", ""),
+        ],
+        default='LINEAR',
+    )
+    reverse: bpy.props.BoolProperty(name="Reverse", default=False)
+    fade_to_existing: bpy.props.BoolProperty(
+        name="Fade to Existing",
+        default=False,
+        description="Blend the gradient into the current colors towards its end",
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "gradient_type")
+        if self.gradient_type == 'AXIS':
+            layout.prop(self, "axis", expand=True)
+        elif self.gradient_type == 'LINEAR':
+            layout.prop(self, "direction")
+        elif self.gradient_type == 'CURSOR':
+            layout.prop(self, "radius")
+        layout.prop(self, "falloff")
+        layout.prop(self, "reverse")
+        layout.prop(self, "fade_to_existing")
+
+    def build_operation(self, context):
+        stops = [(stop.position, tuple(stop.color)) for stop in context.scene.vtx_gradient_stops]
+        if len(stops) < 2:
+            raise ValueError("Add at least two gradient stops.")
+
+        return "Gradient", compile_gradient_fill(
+            stops, self.gradient_type, self.axis, tuple(self.direction), self.radius,
+            self.falloff, self.reverse, self.fade_to_existing
+        )
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        try:
+            name, kernel = self.build_operation(context)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        status, msg_type, message = apply_vertex_color_operation(
+            context, None, name, array_operation=kernel
+        )
+
+        self.report({msg_type}, message)
+        return {status}
+
+
+# třída operátoru pro bake cavity/curvature/AO/thickness do color attribute
+class VTXCOLOR_bake(bpy.types.Operator):
+    bl_idname = "mesh.bake_vertex_colors"
+    bl_label = "Bake From Mesh"
+    bl_description = DESC_BAKE
+    bl_options = {'REGISTER', 'UNDO'}
+
+    bake_type: bpy.props.EnumProperty(
+        name="Bake",
+        items=[
+            ('CAVITY', "Cavity", "Darken concave areas (edge angles)"),
+            ('CURVATURE', "Curvature", "Convex bright, flat gray, concave dark (edge angles)"),
+            ('AO', "Ambient Occlusion", "Fraction of unoccluded hemisphere rays"),
+            ('THICKNESS', "Thickness", "Average distance of rays cast into the mesh"),
+        ],
+        default='CAVITY',
+    )
+    contrast: bpy.props.FloatProperty(name="Contrast", default=1.0, min=0.01, max=10.0)
+    samples: bpy.props.IntProperty(name="Samples", default=16, min=1, max=256)
+    distance: bpy.props.FloatProperty(name="Distance", subtype='DISTANCE', default=1.0, min=0.0001)
+    seed: bpy.props.IntProperty(name="Seed", default=0, min=0)
+    processes: bpy.props.IntProperty(
+        name="Processes",
+        default=0,
+        min=0,
+        max=256,
+        description="Background Blender processes casting the rays (0 = one per CPU core, 1 = only this Blender)",
+    )
+    selected_only: bpy.props.BoolProperty(name="Selected Only", default=False)
+    multiply_existing: bpy.props.BoolProperty(
+        name="Multiply Existing",
+        default=False,
+        description="Multiply the current colors by the baked value instead of replacing them",
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "bake_type")
+        if self.bake_type in {'CAVITY', 'CURVATURE'}:
+            layout.prop(self, "contrast")
+        else:
+            layout.prop(self, "samples")
+            layout.prop(self, "distance")
+            layout.prop(self, "seed")
+            layout.prop(self, "processes")
+        layout.prop(self, "selected_only")
+        layout.prop(self, "multiply_existing")
+
+    def prepare(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            return error_message
+
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            return ERROR_MSG_ATTRIBUTE
+
+        # všechna data se načtou hromadně v Object Mode, paprsky pak pracují jen s kopiemi
+        self._original_mode = context.active_object.mode
+        if self._original_mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        self._jobs = [read_bake_job(mesh, self.bake_type, self.contrast) for mesh, objects in targets]
+        self._workers = None
+        return None
+
+    # pomocná metoda pro počet procesů na paprsky (1 = jen tento Blender, malé bake nestojí za start procesů)
+    def get_worker_count(self):
+        rays = sum(len(job["positions"]) for job in self._jobs) * self.samples
+        if not bpy.app.binary_path or rays < BAKE_WORKER_MIN_RAYS:
+            return 1
+        return max(min(self.processes or os.cpu_count() or 1, len(self._chunks)), 1)
+
+    def start_rays(self):
+        self._chunks = get_bake_chunks([len(job["positions"]) for job in self._jobs])
+        self._done = 0
+
+        worker_count = self.get_worker_count()
+        if worker_count > 1:
+            try:
+                self._workers = BakeWorkers(
+                    self._jobs, self.bake_type, self.samples, self.distance, self.seed, worker_count
+                )
+            except OSError as e:
+                print(f"Warning: Could not start bake workers, casting rays in this process: {str(e)}")
+                self.stop_workers()
+
+    # pomocná metoda pro výpočet dalších bloků paprsků, nejvýše zhruba time_limit sekund
+    def run_rays(self, time_limit=None):
+        start_time = time.perf_counter()
+        while self._done < len(self._chunks):
+            index, start = self._chunks[self._done]
+            bake_job_rays(self._jobs[index], self.bake_type, self.samples, self.distance, self.seed, [start])
+            self._done += 1
+            if time_limit is not None and time.perf_counter() - start_time >= time_limit:
+                break
+
+    # pomocná metoda pro převzetí hodnot od workerů, vrací False, dokud ještě počítají
+    def collect_workers(self, wait=False):
+        if wait:
+            self._workers.wait()
+        elif not self._workers.poll():
+            return False
+
+        for job, values in zip(self._jobs, self._workers.results()):
+            job["values"] = values
+        self.stop_workers()
+        return True
+
+    def stop_workers(self):
+        workers, self._workers = getattr(self, "_workers", None), None
+        if workers is not None:
+            workers.close()
+
+    def progress(self):
+        if self._workers is not None:
+            return self._workers.fraction()
+        return self._done / len(self._chunks) if self._chunks else 1.0
+
+    def commit(self, context):
+        corner_count = 0
+        for job in self._jobs:
+            mesh = job["mesh"]
+            if get_topology_fingerprint(mesh) != job["fingerprint"]:
+                raise RuntimeError(f"Mesh '{mesh.name}' changed during the bake.")
+            corner_indices = None if self.selected_only else get_all_element_indices(mesh)
+            corner_count += process_mesh_colors(
+                context, mesh, None, compile_vertex_values(job["values"], self.multiply_existing), corner_indices
+            )
+        return corner_count
+
+    def finish(self, context):
+        status = {'FINISHED'}
+        try:
+            corner_count = self.commit(context)
+            self.report({'INFO'}, f"Bake applied to {corner_count} vertices.")
+        except (ReferenceError, RuntimeError) as e:
+            self.report({'ERROR'}, f"Bake failed: {str(e)}")
+            status = {'CANCELLED'}
+
+        self.restore_mode(context)
+        return status
+
+    def restore_mode(self, context):
+        self.stop_workers()
+        self._jobs = []
+        try:
+            if context.active_object and context.active_object.mode != self._original_mode:
+                bpy.ops.object.mode_set(mode=self._original_mode)
+        except Exception as e:
+            print(f"Warning: Could not restore mode: {str(e)}")
+
+    def execute(self, context):
+        error = self.prepare(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        if self.bake_type in {'AO', 'THICKNESS'}:
+            self.start_rays()
+            if self._workers is None:
+                self.run_rays()
+            else:
+                try:
+                    self.collect_workers(wait=True)
+                except RuntimeError as e:
+                    self.report({'ERROR'}, f"Bake failed: {str(e)}")
+                    self.restore_mode(context)
+                    return {'CANCELLED'}
+        return self.finish(context)
+
+    def invoke(self, context, event):
+        if self.bake_type in {'CAVITY', 'CURVATURE'}:
+            return self.execute(context)
+
+        error = self.prepare(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        self.start_rays()
+        wm = context.window_manager
+        wm.progress_begin(0, 100)
+        self._timer = wm.event_timer_add(BAKE_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def end_modal(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.end_modal(context)
+            self.restore_mode(context)
+            self.report({'WARNING'}, "Bake cancelled.")
+            return {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        # procesy na pozadí se jen hlídají, jinak bloky běží v hlavním vlákně jen část intervalu časovače
+        if self._workers is not None:
+            workers = f" in {len(self._workers.processes)} processes"
+            try:
+                finished = self.collect_workers()
+            except RuntimeError as e:
+                self.end_modal(context)
+                self.restore_mode(context)
+                self.report({'ERROR'}, f"Bake failed: {str(e)}")
+                return {'CANCELLED'}
+        else:
+            self.run_rays(BAKE_STEP_TIME)
+            finished = self._done >= len(self._chunks)
+            workers = ""
+
+        percent = 100 if finished else int(self.progress() * 100)
+        context.window_manager.progress_update(percent)
+        context.workspace.status_text_set(
+            f"Baking {self.bake_type.title()}{workers}: {percent} % (Esc to cancel)"
+        )
+        if not finished:
+            return {'PASS_THROUGH'}
+
+        self.end_modal(context)
+        return self.finish(context)
+
+
+# třída operátoru pro zpracování barev velkých meshů po oknech s omezenou pamětí (Esc = zrušit)
+class VTXCOLOR_stream(bpy.types.Operator):
+    bl_idname = "mesh.stream_vertex_colors"
+    bl_label = "Stream Colors"
+    bl_description = DESC_STREAM
+    bl_options = {'REGISTER', 'UNDO'}
+
+    operation: bpy.props.EnumProperty(
+        name="Operation",
+        items=[
+            ('COLOR', "Color", "Fill with the picker color"),
+            ('BRIGHTNESS', "Brightness", "Multiply the current colors by the brightness slider"),
+            ('PIPELINE', "Pipeline", "Steps of compile_color_pipeline given as JSON"),
+        ],
+        default='COLOR',
+    )
+    pipeline: bpy.props.StringProperty(
+        name="Pipeline",
+        default="",
+        description='JSON list of pipeline steps, e.g. [{"type": "hsv", "saturation": 0.5}]',
+    )
+    selected_only: bpy.props.BoolProperty(name="Selected Only", default=True)
+
+    def build_kernel(self, context):
+        if self.operation == 'COLOR':
+            return color_fill_kernel
+        if self.operation == 'BRIGHTNESS':
+            return compile_color_pipeline([{"type": 'multiply', "factor": context.scene.vtx_brightness_slider}])
+        try:
+            steps = json.loads(self.pipeline)
+        except ValueError as e:
+            raise ValueError(f"Invalid pipeline JSON: {str(e)}")
+        if not isinstance(steps, list) or not all(isinstance(step, dict) for step in steps):
+            raise ValueError("Pipeline must be a JSON list of steps.")
+        return compile_color_pipeline(steps)
+
+    def prepare(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            return error_message
+
+        targets = [mesh for mesh, objects in get_target_meshes(context) if validate_color_attribute(mesh)]
+        if not targets:
+            return ERROR_MSG_ATTRIBUTE
+
+        try:
+            kernel = self.build_kernel(context)
+        except ValueError as e:
+            return str(e)
+
+        # okna se zapisují přímo do mesh dat, proto se do Object Mode přepne jen jednou
+        self._original_mode = context.active_object.mode
+        if self._original_mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        budget = context.scene.vtx_stream_budget * 1048576
+        self._streams = deque(
+            (mesh, stream_mesh_colors(context, mesh, kernel, budget, self.selected_only)) for mesh in targets
+        )
+        self._total = sum(len(mesh.color_attributes[COLOR_ATTRIBUTE_NAME].data) for mesh in targets)
+        self._done = 0
+        self._progress = 0
+        self._finished = 0
+        return None
+
+    def step(self):
+        """Zpracuje jedno okno, vrací False po dokončení všech meshů."""
+        while self._streams:
+            mesh, stream = self._streams[0]
+            try:
+                processed, count = next(stream)
+                self._progress = self._done + processed
+                return True
+            except StopIteration:
+                self._streams.popleft()
+                self._done += len(mesh.color_attributes[COLOR_ATTRIBUTE_NAME].data)
+                self._finished += 1
+        return False
+
+    def restore_mode(self, context):
+        for mesh, stream in self._streams:
+            stream.close()
+        self._streams.clear()
+        try:
+            if context.active_object and context.active_object.mode != self._original_mode:
+                bpy.ops.object.mode_set(mode=self._original_mode)
+        except Exception as e:
+            print(f"Warning: Could not restore mode: {str(e)}")
+
+        for area in context.screen.areas if context.screen else ():
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+    def execute(self, context):
+        error = self.prepare(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        wm = context.window_manager
+        begin_profile(context, "Stream")
+        wm.progress_begin(0, self._total)
+        try:
+            while self.step():
+                wm.progress_update(self._progress)
+        finally:
+            wm.progress_end()
+            end_profile()
+            self.restore_mode(context)
+
+        self.report({'INFO'}, f"Colors streamed on {self._finished} meshes ({self._total} elements).")
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        error = self.prepare(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        wm = context.window_manager
+        wm.progress_begin(0, self._total)
+        self._timer = wm.event_timer_add(STREAM_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def end_modal(self, context):
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        context.workspace.status_text_set(None)
+        self.restore_mode(context)
+
+    def modal(self, context, event):
+        if event.type == 'ESC' and event.value == 'PRESS':
+            self.end_modal(context)
+            self.report({'WARNING'}, f"Streaming cancelled, {self._finished} meshes written.")
+            return {'FINISHED'} if self._finished else {'CANCELLED'}
+
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+
+        # okna se zpracovávají po časových dávkách, aby UI zůstalo responzivní
+        deadline = time.perf_counter() + STREAM_INTERVAL
+        running = True
+        while running and time.perf_counter() < deadline:
+            running = self.step()
+
+        if running:
+            context.window_manager.progress_update(self._progress)
+            context.workspace.status_text_set(
+                f"Streaming colors: {self._progress * 100 // max(self._total, 1)} % (Esc to cancel)"
+            )
+            return {'PASS_THROUGH'}
+
+        self.end_modal(context)
+        self.report({'INFO'}, f"Colors streamed on {self._finished} meshes ({self._total} elements).")
+        return {'FINISHED'}
+
+
+# pomocná funkce pro synchronizaci edit meshů cílových meshů do mesh dat
+def sync_edit_meshes(targets):
+    for mesh, objects in targets:
+        if mesh.is_editmode:
+            next(o for o in objects if o.mode == 'EDIT').update_from_editmode()
+
+
+# třída operátoru pro sestavení indexu barev a výpis unikátních barev
+class VTXCOLOR_list_colors(bpy.types.Operator):
+    bl_idname = "mesh.list_vertex_colors"
+    bl_label = "List Colors"
+    bl_description = DESC_LIST_COLORS
+
+    def execute(self, context):
+        obj, error = validate_active_mesh_object(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+        if not validate_color_attribute(obj.data):
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        try:
+            if obj.mode == 'EDIT':
+                obj.update_from_editmode()
+            index = get_color_index(obj.data)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to access mesh data: {str(e)}")
+            return {'CANCELLED'}
+        self.report({'INFO'}, f"{len(index.colors)} distinct colors on {len(index.inverse)} elements.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro výběr vertexů nebo faces podle barvy
+class VTXCOLOR_select_by_color(bpy.types.Operator):
+    bl_idname = "mesh.select_by_vertex_color"
+    bl_label = "Select by Color"
+    bl_description = DESC_SELECT_BY_COLOR
+    bl_options = {'REGISTER', 'UNDO'}
+
+    source: bpy.props.EnumProperty(
+        name="Color",
+        items=[
+            ('PICKER', "Picker", "Color from the color picker"),
+            ('SELECTION', "Selection", "Most common color of the current selection"),
+            ('COLOR', "Color", "The color given below"),
+        ],
+        default='PICKER',
+    )
+    color: bpy.props.FloatVectorProperty(name="Color", subtype='COLOR', default=(1.0, 1.0, 1.0), min=0.0)
+    tolerance: bpy.props.FloatProperty(name="Tolerance", default=0.01, min=0.0, max=1.0)
+    select_mode: bpy.props.EnumProperty(
+        name="Select",
+        items=[
+            ('VERTEX', "Vertices", "Select vertices with a matching color"),
+            ('FACE', "Faces", "Select faces whose corners all match"),
+        ],
+        default='VERTEX',
+    )
+    extend: bpy.props.BoolProperty(name="Extend", default=False)
+
+    def execute(self, context):
+        obj, error = validate_active_mesh_object(context)
+        if error:
+            self.report({'ERROR'}, error)
+            return {'CANCELLED'}
+
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        color = None
+        try:
+            sync_edit_meshes(targets)
+            if self.source == 'PICKER':
+                color = tuple(context.scene.vtx_color_picker)
+            elif self.source == 'COLOR':
+                color = tuple(self.color)
+            elif obj.data in [mesh for mesh, objects in targets]:
+                color = get_dominant_selected_color(obj.data, get_color_index(obj.data))
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to access mesh data: {str(e)}")
+            return {'CANCELLED'}
+        if color is None:
+            self.report({'WARNING'}, "No vertices selected.")
+            return {'CANCELLED'}
+
+        original_mode = obj.mode
+        if original_mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        selected = 0
+        try:
+            for mesh, objects in targets:
+                index = get_color_index(mesh)
+                selected += select_by_element_mask(
+                    mesh, index.element_mask(color, self.tolerance), index.domain, self.select_mode, self.extend
+                )
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to access mesh data: {str(e)}")
+            return {'CANCELLED'}
+        finally:
+            if original_mode == 'EDIT':
+                context.tool_settings.mesh_select_mode = (self.select_mode == 'VERTEX', False, self.select_mode == 'FACE')
+            if obj.mode != original_mode:
+                bpy.ops.object.mode_set(mode=original_mode)
+
+        kind = "faces" if self.select_mode == 'FACE' else "vertices"
+        self.report({'INFO'}, f"{selected} {kind} selected.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro nahrazení barvy barvou z color pickeru na celém meshi
+class VTXCOLOR_replace_color(bpy.types.Operator):
+    bl_idname = "mesh.replace_vertex_color"
+    bl_label = "Replace Color"
+    bl_description = DESC_REPLACE_COLOR
+    bl_options = {'REGISTER', 'UNDO'}
+
+    color: bpy.props.FloatVectorProperty(
+        name="Replace",
+        subtype='COLOR',
+        default=(1.0, 1.0, 1.0),
+        min=0.0,
+        description="Color to replace (the most common color of the selection when invoked without one)",
+    )
+    use_selection_color: bpy.props.BoolProperty(name="From Selection", default=True)
+    tolerance: bpy.props.FloatProperty(name="Tolerance", default=0.01, min=0.0, max=1.0)
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        obj = context.active_object
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        replaced = 0
+        try:
+            sync_edit_meshes(targets)
+            if self.use_selection_color:
+                color = None
+                if validate_color_attribute(obj.data):
+                    color = get_dominant_selected_color(obj.data, get_color_index(obj.data))
+                if color is None:
+                    self.report({'WARNING'}, "No vertices selected.")
+                    return {'CANCELLED'}
+                self.color = color
+                self.use_selection_color = False
+
+            for mesh, objects in targets:
+                index = get_color_index(mesh)
+                element_indices = np.flatnonzero(index.element_mask(self.color, self.tolerance)).astype(np.int32)
+                if len(element_indices) == 0:
+                    continue
+                if mesh.is_editmode:
+                    edit_obj = next(o for o in objects if o.mode == 'EDIT')
+                    replaced += process_edit_mesh_colors(context, edit_obj, None, color_fill_kernel, element_indices, synced=True)
+                else:
+                    replaced += process_mesh_colors(context, mesh, None, color_fill_kernel, element_indices)
+        except Exception as e:
+            self.report({'ERROR'}, f"Failed to access mesh data: {str(e)}")
+            return {'CANCELLED'}
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+        if replaced == 0:
+            self.report({'WARNING'}, "No matching colors found.")
+        else:
+            self.report({'INFO'}, f"Color replaced on {replaced} vertices.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro přenos barev z druhého vybraného meshe na aktivní mesh
+class VTXCOLOR_transfer(bpy.types.Operator):
+    bl_idname = "mesh.transfer_vertex_colors"
+    bl_label = "Transfer Colors"
+    bl_description = DESC_TRANSFER
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode: bpy.props.EnumProperty(
+        name="Sample",
+        items=[
+            ('SURFACE', "Nearest Surface", "Barycentric interpolation at the nearest point of the source surface"),
+            ('VERTEX', "Nearest Vertex", "Color of the nearest source vertex"),
+        ],
+        default='SURFACE',
+    )
+    max_distance: bpy.props.FloatProperty(
+        name="Max Distance",
+        subtype='DISTANCE',
+        default=0.0,
+        min=0.0,
+        description="Keep the current color where the source is farther away (0 = unlimited)",
+    )
+    selected_only: bpy.props.BoolProperty(name="Selected Only", default=False)
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        obj = context.active_object
+        if not validate_color_attribute(obj.data):
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        source = next((
+            o for o in context.selected_objects
+            if o != obj and o.type == MESH_TYPE and o.data != obj.data and len(o.data.color_attributes)
+        ), None)
+        if source is None:
+            self.report({'ERROR'}, "Select a source mesh with colors, then the target mesh as active.")
+            return {'CANCELLED'}
+
+        if source.mode == 'EDIT':
+            source.update_from_editmode()
+
+        try:
+            kernel = compile_color_transfer(source, self.mode, self.max_distance)
+            mesh = obj.data
+            element_indices = None if self.selected_only else get_all_element_indices(mesh)
+            if mesh.is_editmode:
+                count = process_edit_mesh_colors(context, obj, None, kernel, element_indices)
+            else:
+                count = process_mesh_colors(context, mesh, None, kernel, element_indices)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+        self.report({'INFO'}, f"Colors transferred from '{source.name}' to {count} vertices.")
+        return {'FINISHED'}
+
+
+# třída položky palety (název a barva)
+class VTXCOLOR_palette_entry(bpy.types.PropertyGroup):
+    name: bpy.props.StringProperty(name="Name", default="Color")
+    color: bpy.props.FloatVectorProperty(name="Color", subtype='COLOR', default=(1.0, 1.0, 1.0), min=0.0, max=1.0)
+
+
+# třída seznamu palety v panelu
+class VTXCOLOR_UL_palette(bpy.types.UIList):
+    def draw_item(self, context, layout, data, item, icon, active_data, active_propname, index):
+        row = layout.row(align=True)
+        row.prop(item, "color", text="")
+        row.prop(item, "name", text="", emboss=False)
+        row.operator("scene.vtxcolor_palette_pick", text="", icon='EYEDROPPER').index = index
+
+
+# třída operátoru pro přidání barvy z color pickeru do palety
+class VTXCOLOR_palette_add(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_palette_add"
+    bl_label = "Add Palette Color"
+    bl_description = DESC_PALETTE_ADD
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        palette = context.scene.vtx_palette
+        entry = palette.add()
+        entry.name = f"Color {len(palette)}"
+        entry.color = context.scene.vtx_color_picker
+        context.scene.vtx_palette_index = len(palette) - 1
+        return {'FINISHED'}
+
+
+# třída operátoru pro odebrání aktivní položky palety
+class VTXCOLOR_palette_remove(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_palette_remove"
+    bl_label = "Remove Palette Color"
+    bl_description = DESC_PALETTE_REMOVE
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        scene = context.scene
+        if 0 <= scene.vtx_palette_index < len(scene.vtx_palette):
+            scene.vtx_palette.remove(scene.vtx_palette_index)
+            scene.vtx_palette_index = min(scene.vtx_palette_index, len(scene.vtx_palette) - 1)
+        return {'FINISHED'}
+
+
+# třída operátoru pro nastavení color pickeru na barvu z palety
+class VTXCOLOR_palette_pick(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_palette_pick"
+    bl_label = "Use Palette Color"
+    bl_description = DESC_PALETTE_PICK
+    bl_options = {'REGISTER', 'UNDO'}
+
+    index: bpy.props.IntProperty(default=0)
+
+    def execute(self, context):
+        scene = context.scene
+        if not 0 <= self.index < len(scene.vtx_palette):
+            return {'CANCELLED'}
+        scene.vtx_color_picker = scene.vtx_palette[self.index].color
+        scene.vtx_palette_index = self.index
+        return {'FINISHED'}
+
+
+# třída operátoru pro uložení palety do JSON nebo .blend knihovny (podle přípony)
+class VTXCOLOR_palette_export(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_palette_export"
+    bl_label = "Export Palette"
+    bl_description = DESC_PALETTE_EXPORT
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = PALETTE_NAME + ".json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        entries = [(entry.name, tuple(entry.color)) for entry in context.scene.vtx_palette]
+        if not entries:
+            self.report({'WARNING'}, "Palette is empty.")
+            return {'CANCELLED'}
+
+        path = bpy.path.abspath(self.filepath)
+        try:
+            if path.lower().endswith(".blend"):
+                write_palette_blend(path, PALETTE_NAME, entries)
+            else:
+                write_palette_json(path, entries)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to write palette: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"{len(entries)} colors exported to '{path}'.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro načtení palety z JSON nebo .blend knihovny (podle přípony)
+class VTXCOLOR_palette_import(bpy.types.Operator):
+    bl_idname = "scene.vtxcolor_palette_import"
+    bl_label = "Import Palette"
+    bl_description = DESC_PALETTE_IMPORT
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    replace: bpy.props.BoolProperty(name="Replace", default=True, description="Replace the current palette instead of appending")
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        path = bpy.path.abspath(self.filepath)
+        try:
+            if path.lower().endswith(".blend"):
+                entries = read_palette_blend(path)
+            else:
+                entries = read_palette_json(path)
+        except (OSError, ValueError, KeyError, TypeError, IndexError) as e:
+            self.report({'ERROR'}, f"Failed to read palette: {str(e)}")
+            return {'CANCELLED'}
+
+        if not entries:
+            self.report({'WARNING'}, "No palette colors found.")
+            return {'CANCELLED'}
+
+        palette = context.scene.vtx_palette
+        if self.replace:
+            palette.clear()
+        for name, color in entries:
+            entry = palette.add()
+            entry.name = name or f"Color {len(palette)}"
+            entry.color = color
+        context.scene.vtx_palette_index = 0
+
+        self.report({'INFO'}, f"{len(entries)} colors imported from '{path}'.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro obarvení skupin (material slot, face set, UV ostrov, vertex group) paletou
+class VTXCOLOR_palette_map(bpy.types.Operator):
+    bl_idname = "mesh.vertex_color_palette_map"
+    bl_label = "Paint by Mapping"
+    bl_description = DESC_PALETTE_MAP
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mapping: bpy.props.EnumProperty(
+        name="Mapping",
+        items=[
+            ('MATERIAL', "Material Slot", "Palette entry N for material slot N"),
+            ('FACE_SET', "Face Set", "One palette entry per face set"),
+            ('UV_ISLAND', "UV Island", "One palette entry per island of the active UV map"),
+            ('VERTEX_GROUP', "Vertex Group", "Palette entry N for the vertex group N with the highest weight"),
+        ],
+        default='MATERIAL',
+    )
+    selected_only: bpy.props.BoolProperty(name="Selected Only", default=False)
+
+    def execute(self, context):
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
+            return {'CANCELLED'}
+
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
+
+        try:
+            kernel = compile_palette_mapping([tuple(entry.color) for entry in context.scene.vtx_palette], self.mapping)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+
+        sync_edit_meshes(targets)
+        begin_profile(context, "Palette Mapping")
+        count = 0
+        try:
+            for mesh, objects in targets:
+                element_indices = None if self.selected_only else get_all_element_indices(mesh)
+                if mesh.is_editmode:
+                    edit_obj = next(o for o in objects if o.mode == 'EDIT')
+                    count += process_edit_mesh_colors(context, edit_obj, None, kernel, element_indices, synced=True)
+                else:
+                    count += process_mesh_colors(context, mesh, None, kernel, element_indices)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        finally:
+            end_profile()
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+        self.report({'INFO'}, f"Palette mapped to {count} vertices.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro export barev aktivního meshe (nebo všech meshů) do .npy
+class VTXCOLOR_colors_export(bpy.types.Operator):
+    bl_idname = "mesh.export_vertex_colors"
+    bl_label = "Export Colors"
+    bl_description = DESC_COLORS_EXPORT
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    all_meshes: bpy.props.BoolProperty(
+        name="All Meshes",
+        default=False,
+        description="Export every mesh of the file with a color attribute into the folder of the chosen path",
+    )
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            obj = context.active_object
+            name = obj.data.name if obj and obj.type == MESH_TYPE else COLOR_ATTRIBUTE_NAME
+            self.filepath = bpy.path.clean_name(name) + COLOR_FILE_EXTENSION
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        path = bpy.path.abspath(self.filepath)
+        for obj in context.objects_in_mode_unique_data if context.mode == 'EDIT_MESH' else ():
+            obj.update_from_editmode()
+
+        try:
+            if self.all_meshes:
+                count = export_all_color_attributes(os.path.dirname(path))
+                self.report({'INFO'}, f"Colors of {count} meshes exported to '{os.path.dirname(path)}'.")
+                return {'FINISHED'}
+
+            obj, error = validate_active_mesh_object(context)
+            if error:
+                self.report({'ERROR'}, error)
+                return {'CANCELLED'}
+            if not validate_color_attribute(obj.data):
+                self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+                return {'CANCELLED'}
+            if not path.endswith(COLOR_FILE_EXTENSION):
+                path += COLOR_FILE_EXTENSION
+            count = export_color_attribute(obj.data, path)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to write colors: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"{count} colors exported to '{path}'.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro import barev z .npy do aktivního meshe (nebo do všech meshů podle názvu)
+class VTXCOLOR_colors_import(bpy.types.Operator):
+    bl_idname = "mesh.import_vertex_colors"
+    bl_label = "Import Colors"
+    bl_description = DESC_COLORS_IMPORT
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    all_meshes: bpy.props.BoolProperty(
+        name="All Meshes",
+        default=False,
+        description="Import every color file in the folder of the chosen path into the mesh of the same name",
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        path = bpy.path.abspath(self.filepath)
+        obj = context.active_object
+
+        # zápis jde přímo do mesh dat, Edit Mode se opustí jen na dobu importu
+        original_mode = obj.mode if obj else 'OBJECT'
+        if original_mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+
+        try:
+            if self.all_meshes:
+                count, errors = import_all_color_attributes(os.path.dirname(path))
+                for error in errors:
+                    print(f"Import Colors: {error}")
+                if errors:
+                    self.report({'WARNING'}, f"Colors imported into {count} meshes, {len(errors)} files skipped (see console).")
+                else:
+                    self.report({'INFO'}, f"Colors imported into {count} meshes.")
+                return {'FINISHED'}
+
+            if not obj or obj.type != MESH_TYPE:
+                self.report({'ERROR'}, "No active mesh object.")
+                return {'CANCELLED'}
+            count = import_color_attribute(obj.data, path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.report({'ERROR'}, f"Failed to import colors: {str(e)}")
+            return {'CANCELLED'}
+        finally:
+            if obj and obj.mode != original_mode:
+                bpy.ops.object.mode_set(mode=original_mode)
+            for area in context.screen.areas if context.screen else ():
+                if area.type == 'VIEW_3D':
+                    area.tag_redraw()
 
+        self.report({'INFO'}, f"{count} colors imported from '{path}'.")
+        return {'FINISHED'}
 
-# třída operátoru pro přípravu materiálu a color attribute
-class VTXCOLOR_prepare(bpy.types.Operator):
-    bl_idname = "material.prepare_vtx_color"
-    bl_label = "Prepare Material"
-    bl_description = DESC_PREPARE
+
+# třída operátoru pro vážené malování barvou nebo jasem podle vertex group, attributu nebo masky
+class VTXCOLOR_weighted_paint(BackgroundColorCompute, bpy.types.Operator):
+    bl_idname = "mesh.weighted_vertex_color"
+    bl_label = "Weighted Paint"
+    bl_description = DESC_WEIGHTED_PAINT
     bl_options = {'REGISTER', 'UNDO'}
+    requires_edit_mode = False
+
+    mode: bpy.props.EnumProperty(
+        name="Mode",
+        items=[
+            ('COLOR', "Color", "Blend towards the picker color by the weight"),
+            ('BRIGHTNESS', "Brightness", "Apply the brightness slider by the weight"),
+        ],
+        default='COLOR',
+    )
+    strength: bpy.props.FloatProperty(name="Strength", default=1.0, min=0.0, max=1.0)
+    invert: bpy.props.BoolProperty(name="Invert", default=False)
+    selected_only: bpy.props.BoolProperty(
+        name="Selected Only",
+        default=False,
+        description="Limit the weights to the selection (Edit Mode), otherwise the whole mesh is painted",
+    )
+
+    def get_element_indices(self, mesh):
+        if self.selected_only and mesh.is_editmode:
+            return get_cached_element_indices(mesh, get_color_domain(mesh))
+        return get_all_element_indices(mesh)
+
+    def build_operation(self, context):
+        scene = context.scene
+        if not scene.vtx_weight_name:
+            raise ValueError("Choose a weight source first.")
+        kernel = compile_weighted_paint(
+            scene.vtx_weight_source, scene.vtx_weight_name, self.mode, self.strength, self.invert
+        )
+        return f"Weighted {self.mode.title()}", kernel
 
     def execute(self, context):
-        obj, error = validate_active_mesh_object(context)
-        if error:
-            self.report({'ERROR'}, error)
+        success, error_type, error_message = validate_for_vertex_operation(context)
+        if not success:
+            self.report({error_type}, error_message)
             return {'CANCELLED'}
 
-        mat, material_created = create_vtx_color_material()
-        mesh = obj.data
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
+            self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
+            return {'CANCELLED'}
 
-        if mat.name not in [m.name for m in mesh.materials if m is not None]:
-            mesh.materials.append(mat)
-            if material_created:
-                self.report({'INFO'}, f"Material: '{mat.name}' created and assigned to object.")
-            else:
-                self.report({'INFO'}, f"Material: '{mat.name}' assigned to object.")
-        else:
-            if material_created:
-                self.report({'WARNING'}, f"Material: '{mat.name}' created (already assigned).")
-            else:
-                self.report({'WARNING'}, f"Material: '{mat.name}' already assigned to object.")
+        try:
+            name, kernel = self.build_operation(context)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
 
-        if COLOR_ATTRIBUTE_NAME in mesh.color_attributes:
-            self.report({'WARNING'}, f"Color Attribute: '{mesh.color_attributes[COLOR_ATTRIBUTE_NAME].name}' already exists.")
-        else:
-            color_attr = mesh.color_attributes.new(
-                name=COLOR_ATTRIBUTE_NAME,
-                type='FLOAT_COLOR',
-                domain='CORNER'
-            )
-            mesh.color_attributes.active_color = color_attr
-            self.report({'INFO'}, "Color Attribute created and set as default for rendering.")
+        sync_edit_meshes(targets)
+        begin_profile(context, name)
+        painted = 0
+        try:
+            for mesh, objects in targets:
+                element_indices = self.get_element_indices(mesh)
+                if len(element_indices) == 0:
+                    continue
+                if mesh.is_editmode:
+                    edit_obj = next(o for o in objects if o.mode == 'EDIT')
+                    painted += process_edit_mesh_colors(context, edit_obj, None, kernel, element_indices, synced=True)
+                else:
+                    painted += process_mesh_colors(context, mesh, None, kernel, element_indices)
+        except ValueError as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        finally:
+            end_profile()
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
 
+        if painted == 0:
+            self.report({'WARNING'}, "No vertices selected.")
+        else:
+            self.report({'INFO'}, f"{name} applied to {painted} vertices.")
         return {'FINISHED'}
 
 
-# třída operátoru pro aplikaci barvy na vybrané vertices
-class VTXCOLOR_apply(bpy.types.Operator):
-    bl_idname = "mesh.apply_vertex_color"
-    bl_label = "Apply Color"
-    bl_description = DESC_APPLY
-    bl_options = {'REGISTER', 'UNDO'}
+# třída operátoru pro aplikaci jasu na vybrané vertices
+class VTXCOLOR_brightness(BackgroundColorCompute, bpy.types.Operator):
+    bl_idname = "mesh.apply_vertex_brightness"
+    bl_label = "Apply Brightness"
+    bl_description = DESC_BRIGHTNESS
+    # undo krok se zapisuje ručně, s Lightweight Undo jen do vlastní historie barev
+    bl_options = {'REGISTER'}
+
+    def build_operation(self, context):
+        return "Brightness", brightness_kernel
 
     def execute(self, context):
         success, error_type, error_message = validate_for_vertex_operation(context)
@@ -254,103 +4432,216 @@ class VTXCOLOR_apply(bpy.types.Operator):
             self.report({error_type}, error_message)
             return {'CANCELLED'}
         
-        def apply_color_callback(current_color, loop_index, context):
-            color = context.scene.vtx_color_picker
-            return (color[0], color[1], color[2], 1.0)
-        
-        status, msg_type, message = apply_vertex_color_operation(
-            context, apply_color_callback, "Color"
-        )
+        name, kernel = self.build_operation(context)
+        begin_color_history(context, name)
+        try:
+            status, msg_type, message = apply_vertex_color_operation(
+                context, None, name, array_operation=kernel
+            )
+        finally:
+            end_color_history(context)
+        if status == 'FINISHED':
+            push_global_undo(context, self.bl_label)
         
         self.report({msg_type}, message)
         return {status}
 
 
-# třída operátoru pro aplikaci jasu na vybrané vertices
-class VTXCOLOR_brightness(bpy.types.Operator):
-    bl_idname = "mesh.apply_vertex_brightness"
-    bl_label = "Apply Brightness"
-    bl_description = DESC_BRIGHTNESS
-    bl_options = {'REGISTER', 'UNDO'}
-
-    def execute(self, context):
-        import json
+# třída modálního operátoru pro živý náhled jasu řízený sliderem
+class VTXCOLOR_brightness_preview(bpy.types.Operator):
+    bl_idname = "mesh.vertex_brightness_preview"
+    bl_label = "Live Brightness"
+    bl_description = DESC_BRIGHTNESS_PREVIEW
+    bl_options = {'REGISTER'}
 
+    def invoke(self, context, event):
         success, error_type, error_message = validate_for_vertex_operation(context)
         if not success:
             self.report({error_type}, error_message)
             return {'CANCELLED'}
-        
+
         obj = context.active_object
-        mesh = obj.data
-        
-        if COLOR_ATTRIBUTE_NAME not in mesh.color_attributes:
+        if obj.mode != 'EDIT':
+            self.report({'ERROR'}, "Must be in Edit Mode to apply Brightness.")
+            return {'CANCELLED'}
+
+        targets = [
+            (mesh, objects) for mesh, objects in get_target_meshes(context)
+            if validate_color_attribute(mesh)
+        ]
+        if not targets:
             self.report({'ERROR'}, ERROR_MSG_ATTRIBUTE)
             return {'CANCELLED'}
-        
-        original_mode = obj.mode
-        if obj.mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode='OBJECT')
-        
-        color_layer = mesh.color_attributes[COLOR_ATTRIBUTE_NAME]
-        
-        if not context.scene.vtx_original_colors:
-            original_colors = {}
-            bm = bmesh.new()
-            try:
-                bm.from_mesh(mesh)
-                bm.verts.ensure_lookup_table()
-                
-                for face in bm.faces:
-                    for loop in face.loops:
-                        if loop.vert.select:
-                            loop_idx = loop.index
-                            current_color = color_layer.data[loop_idx].color
-                            original_colors[str(loop_idx)] = [
-                                current_color[0],
-                                current_color[1], 
-                                current_color[2]
-                            ]
-            finally:
-                bm.free()
-            
-            if not original_colors:
-                if obj.mode != original_mode:
-                    bpy.ops.object.mode_set(mode=original_mode)
-                self.report({'WARNING'}, "No vertices selected.")
-                return {'CANCELLED'}
-            
-            context.scene.vtx_original_colors = json.dumps(original_colors)
-            self.report({'INFO'}, f"Original colors stored for {len(original_colors)} vertex loops.")
-        
-        if obj.mode != original_mode:
-            bpy.ops.object.mode_set(mode=original_mode)
-        
-        def apply_brightness_callback(current_color, loop_index, context):
-            try:
-                original_colors = json.loads(context.scene.vtx_original_colors)
-            except:
-                return current_color
-            
-            loop_key = str(loop_index)
-            
-            if loop_key in original_colors:
-                orig_color = original_colors[loop_key]
-                brightness = context.scene.vtx_brightness_slider
-                return (
-                    orig_color[0] * brightness,
-                    orig_color[1] * brightness,
-                    orig_color[2] * brightness,
-                    1.0
-                )
-            return current_color
-        
-        status, msg_type, message = apply_vertex_color_operation(
-            context, apply_brightness_callback, "Brightness"
-        )
-        
-        self.report({msg_type}, message)
-        return {status}
+
+        # edit meshe se do mesh dat zapíšou jen jednou pro výběr a výchozí barvy, náhled pak
+        # píše jen vybrané prvky přímo do edit meshe a Edit Mode se neopouští
+        sync_edit_meshes(targets)
+
+        self._sessions = []
+        for mesh, objects in targets:
+            corner_indices = get_cached_element_indices(mesh, get_color_domain(mesh))
+            if len(corner_indices) == 0:
+                continue
+
+            # meshe mimo Edit Mode (batch výběr) se dál čtou a zapisují celým bufferem do mesh dat
+            if mesh.is_editmode:
+                writer = EditMeshColors(mesh, corner_indices)
+                colors = None
+                selected_colors = writer.read()
+            else:
+                writer = None
+                colors = read_color_attribute(mesh.color_attributes[COLOR_ATTRIBUTE_NAME])
+                selected_colors = colors[corner_indices]
+            snapshot = get_color_snapshot(mesh, COLOR_ATTRIBUTE_NAME, corner_indices)
+            if snapshot is None:
+                snapshot = store_color_snapshot(mesh, COLOR_ATTRIBUTE_NAME, corner_indices, selected_colors)
+            preview = np.empty_like(selected_colors)
+            preview[:, 3] = 1.0
+            self._sessions.append((mesh, writer, corner_indices, colors, selected_colors, snapshot, preview))
+
+        if not self._sessions:
+            self.report({'WARNING'}, "No vertices selected.")
+            return {'CANCELLED'}
+
+        self._brightness = None
+        self._pending = 0
+        self.update_preview(context)
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(PREVIEW_INTERVAL, window=context.window)
+        wm.modal_handler_add(self)
+        context.workspace.status_text_set("Live Brightness: drag the slider, Enter to apply, Esc to cancel")
+        return {'RUNNING_MODAL'}
+
+    # pomocná metoda pro zápis barev vybraných prvků jedné session
+    def write_session(self, mesh, writer, corner_indices, colors, values):
+        if writer is not None:
+            writer.write(values)
+        else:
+            colors[corner_indices] = values
+            write_color_attribute(mesh.color_attributes[COLOR_ATTRIBUTE_NAME], colors)
+            mesh.update_tag()
+        mark_own_update(mesh)
+
+    # pomocná metoda pro zápis čekajícího náhledu po blocích, nejvýše zhruba time_limit sekund
+    def write_pending(self, time_limit=None):
+        """
+        Edit meshe se zapisují po prvcích BMesh v Pythonu, u velkého výběru by jeden krok
+        slideru trval déle než snímek. Náhled se proto doplňuje po blocích PREVIEW_CHUNK_SIZE
+        prvků s časovým limitem na tick; _pending je pozice v prvcích všech sessions.
+        Meshe mimo Edit Mode se zapisují celé jedním foreach_set.
+        """
+        start_time = time.perf_counter()
+        offset = 0
+        for mesh, writer, corner_indices, colors, selected_colors, snapshot, preview in self._sessions:
+            size = len(corner_indices)
+            if self._pending >= offset + size:
+                offset += size
+                continue
+
+            if writer is None:
+                self.write_session(mesh, writer, corner_indices, colors, preview)
+                self._pending = offset + size
+            while self._pending < offset + size:
+                start = self._pending - offset
+                writer.write(preview[start:start + PREVIEW_CHUNK_SIZE], start)
+                mark_own_update(mesh)
+                self._pending = min(self._pending + PREVIEW_CHUNK_SIZE, offset + size)
+                if time_limit is not None and time.perf_counter() - start_time >= time_limit:
+                    return
+            offset += size
+
+    def update_preview(self, context, time_limit=PREVIEW_STEP_TIME):
+        brightness = context.scene.vtx_brightness_slider
+        if brightness != self._brightness:
+            self._brightness = brightness
+            self._pending = 0
+            for mesh, writer, corner_indices, colors, selected_colors, snapshot, preview in self._sessions:
+                np.multiply(snapshot.colors, brightness, out=preview[:, :3])
+        elif self._pending >= sum(len(session[2]) for session in self._sessions):
+            return
+
+        self.write_pending(time_limit)
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+    def end_preview(self, context):
+        context.window_manager.event_timer_remove(self._timer)
+        context.workspace.status_text_set(None)
+
+    def finish(self, context, commit):
+        if not commit:
+            for mesh, writer, corner_indices, colors, selected_colors, snapshot, preview in self._sessions:
+                self.write_session(mesh, writer, corner_indices, colors, selected_colors)
+
+        self.end_preview(context)
+
+        corner_count = sum(len(session[2]) for session in self._sessions)
+        if commit:
+            if begin_color_history(context, "Brightness"):
+                for mesh, writer, corner_indices, colors, selected_colors, snapshot, preview in self._sessions:
+                    record_color_delta(mesh, corner_indices, selected_colors, preview)
+                end_color_history(context)
+            push_global_undo(context, self.bl_label)
+        self._sessions = []
+
+        if commit:
+            self.report({'INFO'}, f"Brightness applied to {corner_count} vertices.")
+            return {'FINISHED'}
+        return {'CANCELLED'}
+
+    def modal(self, context, event):
+        try:
+            if event.type == 'TIMER':
+                self.update_preview(context)
+            elif event.type in {'RET', 'NUMPAD_ENTER'} and event.value == 'PRESS':
+                self.update_preview(context, time_limit=None)
+                return self.finish(context, commit=True)
+            elif event.type == 'ESC' and event.value == 'PRESS':
+                return self.finish(context, commit=False)
+        except ReferenceError:
+            # edit mesh se během náhledu přestavěl (změna topologie, undo), prvky BMesh už neplatí
+            self.end_preview(context)
+            self._sessions = []
+            self.report({'ERROR'}, "Mesh changed during the preview.")
+            return {'CANCELLED'}
+
+        return {'PASS_THROUGH'}
+
+
+# třída operátoru pro undo/redo kroku vlastní historie barev
+class VTXCOLOR_history_undo(bpy.types.Operator):
+    bl_idname = "mesh.vtxcolor_history_undo"
+    bl_label = "Undo Color"
+    bl_description = DESC_HISTORY_UNDO
+
+    redo: bpy.props.BoolProperty(default=False, options={'SKIP_SAVE'})
+
+    def execute(self, context):
+        source, target = (_history_redo, _history_undo) if self.redo else (_history_undo, _history_redo)
+        if not source:
+            self.report({'WARNING'}, "Nothing to redo." if self.redo else "Nothing to undo.")
+            return {'CANCELLED'}
+
+        step = source.pop()
+        try:
+            count = restore_color_history_step(context, step, undo=not self.redo)
+        except (ValueError, StopIteration) as e:
+            # historie už neodpovídá meshům, zbytek kroků by se nedal bezpečně provést
+            invalidate_color_history()
+            self.report({'ERROR'}, f"{str(e) or 'Mesh is not available.'} Color history cleared.")
+            return {'CANCELLED'}
+        target.append(step)
+
+        for area in context.screen.areas:
+            if area.type == 'VIEW_3D':
+                area.tag_redraw()
+
+        action = "Redo" if self.redo else "Undo"
+        self.report({'INFO'}, f"{action} {step.name}: {count} vertices restored.")
+        return {'FINISHED'}
 
 
 # třída operátoru pro přepínání zobrazení vertex colors
@@ -371,11 +4662,64 @@ class VTXCOLOR_toggle(bpy.types.Operator):
             else:
                 shading.color_type = 'VERTEX'
                 shading_name = 'Vertex Color'
+            invalidate_shading_cache()
             self.report({'INFO'}, f"Shading Type set to {shading_name}")
 
         return {'FINISHED'}
 
 
+# třída operátoru pro export naměřených časů
+class VTXCOLOR_profile_export(bpy.types.Operator):
+    bl_idname = "wm.vtxcolor_profile_export"
+    bl_label = "Export Timings"
+    bl_description = DESC_PROFILE_EXPORT
+
+    filepath: bpy.props.StringProperty(subtype='FILE_PATH')
+    export_format: bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('JSON', "JSON", "Per-operation phase totals, corners and bytes moved"),
+            ('TRACE', "Chrome Trace", "Trace events for chrome://tracing or Perfetto"),
+        ],
+        default='TRACE',
+    )
+
+    def invoke(self, context, event):
+        if not self.filepath:
+            self.filepath = "vtx_color_profile.json"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        if not _profile_history:
+            self.report({'WARNING'}, "No timings recorded.")
+            return {'CANCELLED'}
+
+        path = bpy.path.abspath(self.filepath)
+        try:
+            if self.export_format == 'TRACE':
+                export_profile_trace(path)
+            else:
+                export_profile_json(path)
+        except OSError as e:
+            self.report({'ERROR'}, f"Failed to write timings: {str(e)}")
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"{len(_profile_history)} timings exported to '{path}'.")
+        return {'FINISHED'}
+
+
+# třída operátoru pro smazání naměřených časů
+class VTXCOLOR_profile_clear(bpy.types.Operator):
+    bl_idname = "wm.vtxcolor_profile_clear"
+    bl_label = "Clear Timings"
+    bl_description = DESC_PROFILE_CLEAR
+
+    def execute(self, context):
+        _profile_history.clear()
+        return {'FINISHED'}
+
+
 # třída panelu pro uživatelské rozhraní
 class VTXCOLOR_panel(bpy.types.Panel):
     bl_label = "Vertex Color Tool"
@@ -391,12 +4735,19 @@ class VTXCOLOR_panel(bpy.types.Panel):
         row = layout.row()
         row.scale_y = UI_SCALE_LARGE
         row.operator("material.prepare_vtx_color", text="Prepare Material", icon='MATERIAL')
+
+        row = layout.row(align=True)
+        row.prop(context.scene, "vtx_color_domain", expand=True)
+        row.prop(context.scene, "vtx_color_type", text="")
+        row.operator("mesh.convert_vertex_color_domain", text="", icon='FILE_REFRESH')
         
-        shading_color_type = get_viewport_shading_type(context, 'color_type', 'MATERIAL')
+        # draw běží při každém pohybu myši nad viewportem, stav se proto čte z cache
+        shading_type, shading_color_type = get_cached_shading_state(context)
+        toggle_enabled = shading_type == 'SOLID'
 
         row = layout.row()
         row.scale_y = UI_SCALE_LARGE
-        row.enabled = is_vertex_toggle_enabled(context)
+        row.enabled = toggle_enabled
         
         if shading_color_type == 'VERTEX':
             row.operator(
@@ -411,7 +4762,7 @@ class VTXCOLOR_panel(bpy.types.Panel):
                 icon='HIDE_OFF',
             )
 
-        if not is_vertex_toggle_enabled(context):
+        if not toggle_enabled:
             info_row = layout.row()
             info_row.label(text="Switch to Solid Shading Type", icon='INFO')
 
@@ -430,12 +4781,12 @@ class VTXCOLOR_panel(bpy.types.Panel):
             warning_msg = []
             
             if obj and obj.type == MESH_TYPE:
-                mesh = obj.data
+                material_ready, attribute_ready = get_mesh_readiness(obj.data)
                 
-                if not validate_material_prepared(mesh):
+                if not material_ready:
                     warning_msg.append("Material not prepared")
                 
-                if not validate_color_attribute(mesh):
+                if not attribute_ready:
                     warning_msg.append("Color attribute missing")
                 
                 if not warning_msg:
@@ -448,6 +4799,13 @@ class VTXCOLOR_panel(bpy.types.Panel):
 
             row = box.row()
             row.prop(context.scene, "vtx_brightness_slider", slider=True)
+
+            row = box.row()
+            row.prop(context.scene, "vtx_batch_selected")
+            row.prop(context.scene, "vtx_edit_mode_native")
+
+            row = box.row()
+            row.prop(context.scene, "vtx_background_compute")
             
             can_apply = is_prepared and obj and obj.mode == 'EDIT'
 
@@ -460,6 +4818,77 @@ class VTXCOLOR_panel(bpy.types.Panel):
             row.scale_y = UI_SCALE_MEDIUM
             row.enabled = can_apply
             row.operator("mesh.apply_vertex_brightness", text="Apply Brightness", icon='LIGHT_SUN')
+            row.operator("mesh.vertex_brightness_preview", text="Live", icon='PLAY')
+
+            row = box.row(align=True)
+            row.prop(context.scene, "vtx_color_history")
+            if context.scene.vtx_color_history:
+                sub = row.row(align=True)
+                sub.enabled = bool(_history_undo)
+                sub.operator("mesh.vtxcolor_history_undo", text="", icon='LOOP_BACK')
+                sub = row.row(align=True)
+                sub.enabled = bool(_history_redo)
+                sub.operator("mesh.vtxcolor_history_undo", text="", icon='LOOP_FORWARDS').redo = True
+                row = box.row()
+                row.prop(context.scene, "vtx_color_history_limit")
+                row.label(text=f"{len(_history_undo)} steps, {get_color_history_size() / 1048576.0:.1f} MB")
+
+            row = box.row()
+            row.scale_y = UI_SCALE_MEDIUM
+            row.enabled = can_apply
+            row.operator("mesh.adjust_vertex_colors", text="Adjust Colors", icon='MOD_HUE_SATURATION')
+
+            row = box.row(align=True)
+            row.enabled = can_apply
+            row.operator("mesh.filter_vertex_colors", text="Smooth", icon='MOD_SMOOTH').filter_type = 'SMOOTH'
+            row.operator("mesh.filter_vertex_colors", text="Sharpen").filter_type = 'SHARPEN'
+            row.operator("mesh.filter_vertex_colors", text="Dilate").filter_type = 'DILATE'
+            row.operator("mesh.filter_vertex_colors", text="Erode").filter_type = 'ERODE'
+
+            col = box.column(align=True)
+            col.label(text="Gradient Stops", icon='COLORSET_13_VEC')
+            for index, stop in enumerate(context.scene.vtx_gradient_stops):
+                row = col.row(align=True)
+                row.prop(stop, "color", text="")
+                row.prop(stop, "position", text="", slider=True)
+                row.operator("scene.vtxcolor_gradient_stop_remove", text="", icon='X').index = index
+            col.operator("scene.vtxcolor_gradient_stop_add", text="Add Stop", icon='ADD')
+
+            row = box.row()
+            row.scale_y = UI_SCALE_MEDIUM
+            row.enabled = can_apply and len(context.scene.vtx_gradient_stops) >= 2
+            row.operator("mesh.vertex_color_gradient", text="Gradient Fill", icon='IPO_EASE_IN_OUT')
+
+            row = box.row(align=True)
+            row.scale_y = UI_SCALE_MEDIUM
+            row.enabled = is_prepared
+            row.operator("mesh.bake_vertex_colors", text="Cavity", icon='SHADING_RENDERED').bake_type = 'CAVITY'
+            row.operator("mesh.bake_vertex_colors", text="Curvature").bake_type = 'CURVATURE'
+            row.operator("mesh.bake_vertex_colors", text="AO").bake_type = 'AO'
+            row.operator("mesh.bake_vertex_colors", text="Thickness").bake_type = 'THICKNESS'
+
+            row = box.row(align=True)
+            row.enabled = is_prepared
+            row.operator("mesh.stream_vertex_colors", text="Stream Color", icon='SORTTIME').operation = 'COLOR'
+            row.operator("mesh.stream_vertex_colors", text="Stream Brightness").operation = 'BRIGHTNESS'
+            row = box.row()
+            row.prop(context.scene, "vtx_stream_budget")
+
+            row = box.row()
+            row.scale_y = UI_SCALE_MEDIUM
+            row.enabled = is_prepared
+            row.operator("mesh.transfer_vertex_colors", text="Transfer From Selected", icon='MOD_DATA_TRANSFER')
+
+            row = box.row(align=True)
+            row.enabled = is_prepared
+            row.operator("mesh.export_vertex_colors", text="Export", icon='EXPORT')
+            row.operator("mesh.import_vertex_colors", text="Import", icon='IMPORT')
+
+            self.draw_weighted_paint(context, box, obj, is_prepared)
+
+            self.draw_palette(context, box, is_prepared)
+
+            self.draw_color_ids(context, box, obj, is_prepared)
             
             if warning_msg:
                 for msg in warning_msg:
@@ -471,19 +4900,234 @@ class VTXCOLOR_panel(bpy.types.Panel):
                 row = box.row()
                 row.label(text="Switch to Edit Mode", icon='INFO')
 
+        self.draw_profile(context, layout)
+
+    def draw_palette(self, context, layout, is_prepared):
+        col = layout.column(align=True)
+        col.label(text="Palette", icon='COLOR')
+
+        row = col.row()
+        row.template_list("VTXCOLOR_UL_palette", "", context.scene, "vtx_palette", context.scene, "vtx_palette_index", rows=4)
+        side = row.column(align=True)
+        side.operator("scene.vtxcolor_palette_add", text="", icon='ADD')
+        side.operator("scene.vtxcolor_palette_remove", text="", icon='REMOVE')
+        side.separator()
+        side.operator("scene.vtxcolor_palette_import", text="", icon='IMPORT')
+        side.operator("scene.vtxcolor_palette_export", text="", icon='EXPORT')
+
+        row = col.row(align=True)
+        row.enabled = is_prepared and len(context.scene.vtx_palette) > 0
+        row.operator("mesh.vertex_color_palette_map", text="Material", icon='MATERIAL').mapping = 'MATERIAL'
+        row.operator("mesh.vertex_color_palette_map", text="Face Set").mapping = 'FACE_SET'
+        row.operator("mesh.vertex_color_palette_map", text="UV Island").mapping = 'UV_ISLAND'
+        row.operator("mesh.vertex_color_palette_map", text="Group").mapping = 'VERTEX_GROUP'
+
+    def draw_weighted_paint(self, context, layout, obj, is_prepared):
+        col = layout.column(align=True)
+        col.label(text="Weighted Paint", icon='MOD_VERTEX_WEIGHT')
+
+        scene = context.scene
+        row = col.row(align=True)
+        row.prop(scene, "vtx_weight_source", text="")
+        if obj and obj.type == MESH_TYPE:
+            if scene.vtx_weight_source == 'VERTEX_GROUP':
+                row.prop_search(scene, "vtx_weight_name", obj, "vertex_groups", text="")
+            elif scene.vtx_weight_source == 'ATTRIBUTE':
+                row.prop_search(scene, "vtx_weight_name", obj.data, "attributes", text="")
+            else:
+                row.prop_search(scene, "vtx_weight_name", obj.data, "color_attributes", text="")
+
+        row = col.row(align=True)
+        row.enabled = is_prepared and bool(scene.vtx_weight_name)
+        row.operator("mesh.weighted_vertex_color", text="Weighted Color", icon='BRUSH_DATA').mode = 'COLOR'
+        row.operator("mesh.weighted_vertex_color", text="Weighted Brightness", icon='LIGHT_SUN').mode = 'BRIGHTNESS'
+
+    def draw_color_ids(self, context, layout, obj, is_prepared):
+        col = layout.column(align=True)
+        col.label(text="Color IDs", icon='GROUP_VCOL')
+
+        row = col.row(align=True)
+        row.enabled = is_prepared
+        row.operator("mesh.list_vertex_colors", text="List", icon='SORTSIZE')
+        row.operator("mesh.select_by_vertex_color", text="Select", icon='RESTRICT_SELECT_OFF')
+        row.operator("mesh.replace_vertex_color", text="Replace", icon='FILE_REFRESH')
+
+        index = peek_color_index(obj.data) if is_prepared else None
+        if index is None:
+            return
+
+        order = index.most_common(COLOR_LIST_LIMIT)
+        for color, count in zip(index.colors[order].tolist(), index.counts[order].tolist()):
+            row = col.row(align=True)
+            row.label(text=f"{color[0]:.2f} {color[1]:.2f} {color[2]:.2f}    {count}")
+            op = row.operator("mesh.select_by_vertex_color", text="", icon='RESTRICT_SELECT_OFF')
+            op.source = 'COLOR'
+            op.color = color[:3]
+            op = row.operator("mesh.replace_vertex_color", text="", icon='FILE_REFRESH')
+            op.use_selection_color = False
+            op.color = color[:3]
+        if len(index.colors) > COLOR_LIST_LIMIT:
+            col.label(text=f"... {len(index.colors) - COLOR_LIST_LIMIT} more")
+
+    def draw_profile(self, context, layout):
+        box = layout.box()
+        row = box.row()
+        row.prop(context.scene, "vtx_profile_enabled", icon='TIME')
+
+        if not context.scene.vtx_profile_enabled:
+            return
+
+        if _profile_history:
+            record = _profile_history[-1]
+            col = box.column(align=True)
+            col.label(text=f"{record.operation}: {record.total * 1000.0:.1f} ms")
+            for name, duration in record.phase_totals().items():
+                col.label(text=f"    {name}: {duration * 1000.0:.1f} ms")
+            if len(record.meshes) > 1:
+                name, start, duration, corners = max(record.meshes, key=lambda mesh: mesh[2])
+                col.label(text=f"{len(record.meshes)} meshes, slowest {name}: {duration * 1000.0:.1f} ms")
+            col.label(text=f"{record.corners} corners, {record.bytes_moved / 1048576.0:.1f} MB moved")
+        else:
+            box.label(text="Run an operator to record timings", icon='INFO')
+
+        row = box.row(align=True)
+        row.enabled = bool(_profile_history)
+        row.operator("wm.vtxcolor_profile_export", text="Export", icon='EXPORT')
+        row.operator("wm.vtxcolor_profile_clear", text="Clear", icon='TRASH')
+
 
 # tuple všech tříd pro registraci
 classes = (
+    VTXCOLOR_gradient_stop,
+    VTXCOLOR_palette_entry,
     VTXCOLOR_prepare,
+    VTXCOLOR_convert_domain,
     VTXCOLOR_apply,
+    VTXCOLOR_adjust,
+    VTXCOLOR_filter,
+    VTXCOLOR_gradient,
+    VTXCOLOR_gradient_stop_add,
+    VTXCOLOR_gradient_stop_remove,
+    VTXCOLOR_bake,
+    VTXCOLOR_stream,
+    VTXCOLOR_list_colors,
+    VTXCOLOR_select_by_color,
+    VTXCOLOR_replace_color,
+    VTXCOLOR_transfer,
+    VTXCOLOR_colors_export,
+    VTXCOLOR_colors_import,
+    VTXCOLOR_UL_palette,
+    VTXCOLOR_palette_add,
+    VTXCOLOR_palette_remove,
+    VTXCOLOR_palette_pick,
+    VTXCOLOR_palette_export,
+    VTXCOLOR_palette_import,
+    VTXCOLOR_palette_map,
+    VTXCOLOR_weighted_paint,
     VTXCOLOR_brightness,
+    VTXCOLOR_brightness_preview,
+    VTXCOLOR_history_undo,
     VTXCOLOR_toggle,
+    VTXCOLOR_profile_export,
+    VTXCOLOR_profile_clear,
     VTXCOLOR_panel,
 )
 
 
+# pomocná funkce pro převod objektu se __slots__ na slovník (předání stavu mezi verzemi modulu)
+def pack_slots(obj):
+    return {name: getattr(obj, name, None) for name in obj.__slots__}
+
+
+# pomocná funkce pro sestavení objektu ze slovníku (při změně __slots__ vyhodí ValueError)
+def unpack_slots(cls, data):
+    if set(data) != set(cls.__slots__):
+        raise ValueError(f"Layout of {cls.__name__} changed.")
+    obj = cls.__new__(cls)
+    for name, value in data.items():
+        setattr(obj, name, value)
+    return obj
+
+
+# pomocná funkce pro převod kroku historie barev na slovník
+def pack_history_step(step):
+    return {"name": step.name, "nbytes": step.nbytes, "deltas": [pack_slots(delta) for delta in step.deltas]}
+
+
+# pomocná funkce pro sestavení kroku historie barev ze slovníku
+def unpack_history_step(data):
+    step = ColorHistoryStep(data["name"])
+    step.deltas = [unpack_slots(ColorDelta, delta) for delta in data["deltas"]]
+    step.nbytes = data["nbytes"]
+    return step
+
+
+# funkce pro export cache před reloadem addonu (volá vertex_color_tool_reload.py před unregister)
+def export_reload_state():
+    """
+    Stav obsahuje jen slovníky, seznamy a numpy/mathutils objekty, ne instance tříd
+    tohoto modulu, aby ho mohla načíst nová verze modulu. Pole se nekopírují.
+    """
+    return {
+        "version": RELOAD_STATE_VERSION,
+        "color_snapshots": [(key, pack_slots(value)) for key, value in _color_snapshots.items()],
+        "selection_cache": [(key, pack_slots(value)) for key, value in _selection_cache.items()],
+        "color_index": [(key, pack_slots(value)) for key, value in _color_index_cache.items()],
+        "transfer_cache": [(key, pack_slots(value)) for key, value in _transfer_cache.items()],
+        "adjacency_cache": [(key, pack_slots(value)) for key, value in _adjacency_cache.items()],
+        "weight_cache": [(key, pack_slots(value)) for key, value in _weight_cache.items()],
+        "history_undo": [pack_history_step(step) for step in _history_undo],
+        "history_redo": [pack_history_step(step) for step in _history_redo],
+        "profile_history": [pack_slots(record) for record in _profile_history],
+    }
+
+
+# funkce pro import cache po reloadu addonu (jiná verze stavu nebo změněné třídy = studený start)
+def import_reload_state(state):
+    if not isinstance(state, dict) or state.get("version") != RELOAD_STATE_VERSION:
+        return False
+
+    try:
+        color_snapshots = {key: unpack_slots(ColorSnapshot, value) for key, value in state["color_snapshots"]}
+        selection_cache = OrderedDict(
+            (key, unpack_slots(SelectionIndex, value)) for key, value in state["selection_cache"]
+        )
+        color_index = {key: unpack_slots(ColorIndex, value) for key, value in state["color_index"]}
+        transfer_cache = OrderedDict(
+            (key, unpack_slots(TransferIndex, value)) for key, value in state["transfer_cache"]
+        )
+        adjacency_cache = OrderedDict(
+            (key, unpack_slots(VertexAdjacency, value)) for key, value in state["adjacency_cache"]
+        )
+        weight_cache = OrderedDict(
+            (key, unpack_slots(WeightMap, value)) for key, value in state["weight_cache"]
+        )
+        history_undo = [unpack_history_step(step) for step in state["history_undo"]]
+        history_redo = [unpack_history_step(step) for step in state["history_redo"]]
+        profile_history = [unpack_slots(ProfileRecord, record) for record in state["profile_history"]]
+    except (KeyError, TypeError, ValueError):
+        return False
+
+    _color_snapshots.update(color_snapshots)
+    _selection_cache.update(selection_cache)
+    _color_index_cache.update(color_index)
+    _transfer_cache.update(transfer_cache)
+    _adjacency_cache.update(adjacency_cache)
+    _weight_cache.update(weight_cache)
+    _history_undo.extend(history_undo)
+    _history_redo.extend(history_redo)
+    _profile_history.extend(profile_history)
+    return True
+
+
+# pomocná funkce pro naměřené časy startu (import, register a odložené importy) v sekundách
+def get_startup_timings():
+    return dict(_startup_timings)
+
+
 # funkce pro registraci pluginu a properties
 def register():
+    start = time.perf_counter()
     for cls in classes:
         bpy.utils.register_class(cls)
     
@@ -502,12 +5146,6 @@ def register():
         description="Expand or collapse the Vertex Color Painter section"
     )
 
-    bpy.types.Scene.vtx_original_colors = bpy.props.StringProperty(
-        name="Original Colors Cache",
-        default="",
-        description="Cache for storing original vertex colors before brightness adjustment"
-    )
-
     bpy.types.Scene.vtx_brightness_slider = bpy.props.FloatProperty(
         name="Brightness",
         default=1.0,
@@ -517,15 +5155,166 @@ def register():
         description="Adjust brightness of selected vertices (0.0 = black, 1.0 = original)"
     )
 
+    bpy.types.Scene.vtx_batch_selected = bpy.props.BoolProperty(
+        name="All Selected Meshes",
+        default=False,
+        description="Apply to every selected mesh object (including multi-object Edit Mode) in one call"
+    )
+
+    bpy.types.Scene.vtx_edit_mode_native = bpy.props.BoolProperty(
+        name="Stay in Edit Mode",
+        default=True,
+        description="Write colors directly into the edit mesh instead of switching to Object Mode and back"
+    )
+
+    bpy.types.Scene.vtx_weight_source = bpy.props.EnumProperty(
+        name="Weights",
+        items=[
+            ('VERTEX_GROUP', "Vertex Group", "Weights of a vertex group of the object"),
+            ('ATTRIBUTE', "Attribute", "Values of a float attribute (point, corner or face)"),
+            ('COLOR', "Color Mask", "Brightness of another color attribute"),
+        ],
+        default='VERTEX_GROUP',
+        description="Source of the painting strength for 'Weighted Paint'"
+    )
+
+    bpy.types.Scene.vtx_weight_name = bpy.props.StringProperty(
+        name="Weight Source",
+        default="",
+        description="Vertex group, float attribute or color attribute giving the painting strength"
+    )
+
+    bpy.types.Scene.vtx_background_compute = bpy.props.BoolProperty(
+        name="Background Compute",
+        default=False,
+        description="Compute colors on a worker thread and write them when done, the UI stays responsive (Esc = cancel)"
+    )
+
+    bpy.types.Scene.vtx_color_domain = bpy.props.EnumProperty(
+        name="Domain",
+        items=[
+            ('CORNER', "Corner", "One color per face corner, allows hard color seams"),
+            ('POINT', "Point", "One color per vertex, smaller and faster to write"),
+        ],
+        default='CORNER',
+        description="Domain of the color attribute created by 'Prepare Material' or used by 'Convert'"
+    )
+
+    bpy.types.Scene.vtx_color_type = bpy.props.EnumProperty(
+        name="Type",
+        items=[
+            ('FLOAT_COLOR', "Float", "32-bit float per channel"),
+            ('BYTE_COLOR', "Byte", "8-bit per channel (sRGB)"),
+        ],
+        default='FLOAT_COLOR',
+        description="Data type of the color attribute created by 'Prepare Material' or used by 'Convert'"
+    )
+
+    bpy.types.Scene.vtx_gradient_stops = bpy.props.CollectionProperty(
+        type=VTXCOLOR_gradient_stop,
+        name="Gradient Stops",
+        description="Color ramp used by Gradient Fill"
+    )
+
+    bpy.types.Scene.vtx_palette = bpy.props.CollectionProperty(
+        type=VTXCOLOR_palette_entry,
+        name="Palette",
+        description="Saved colors for the color picker and for Paint by Mapping"
+    )
+
+    bpy.types.Scene.vtx_palette_index = bpy.props.IntProperty(
+        name="Active Palette Color",
+        default=0,
+        min=0
+    )
+
+    bpy.types.Scene.vtx_color_history = bpy.props.BoolProperty(
+        name="Lightweight Undo",
+        default=False,
+        description="Apply Color and Apply Brightness keep only the changed colors in their own history "
+                    "instead of a global undo step (undo/redo with the arrow buttons, not Ctrl+Z)"
+    )
+
+    bpy.types.Scene.vtx_color_history_limit = bpy.props.IntProperty(
+        name="Memory (MB)",
+        default=256,
+        min=1,
+        description="Memory limit of the color history, the oldest steps are dropped first"
+    )
+
+    bpy.types.Scene.vtx_stream_budget = bpy.props.IntProperty(
+        name="Window Budget (MB)",
+        default=256,
+        min=16,
+        description="Size of one Stream Colors window in kernel working memory (the color buffer, vertex selection and corner map of the whole mesh come on top)"
+    )
+
+    bpy.types.Scene.vtx_profile_enabled = bpy.props.BoolProperty(
+        name="Record Timings",
+        default=False,
+        description="Record per-phase timings of the color operators (shown below, exportable as JSON or Chrome trace)"
+    )
+
+    bpy.app.handlers.load_post.append(clear_caches_on_load)
+    bpy.app.handlers.depsgraph_update_post.append(invalidate_caches_on_depsgraph_update)
+    bpy.app.handlers.undo_post.append(clear_panel_cache_on_undo)
+    bpy.app.handlers.redo_post.append(clear_panel_cache_on_undo)
+    bpy.app.handlers.undo_post.append(clear_color_history_on_undo)
+    bpy.app.handlers.redo_post.append(clear_color_history_on_undo)
+    subscribe_shading_updates()
+    _startup_timings["register"] = time.perf_counter() - start
+
 
 # funkce pro odregistraci pluginu a properties
 def unregister():
+    if clear_caches_on_load in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(clear_caches_on_load)
+    if invalidate_caches_on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(invalidate_caches_on_depsgraph_update)
+    for handlers in (bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if clear_panel_cache_on_undo in handlers:
+            handlers.remove(clear_panel_cache_on_undo)
+        if clear_color_history_on_undo in handlers:
+            handlers.remove(clear_color_history_on_undo)
+    bpy.msgbus.clear_by_owner(_msgbus_owner)
+    invalidate_color_snapshot()
+    invalidate_selection_cache()
+    invalidate_color_index()
+    invalidate_transfer_cache()
+    invalidate_adjacency_cache()
+    invalidate_weight_cache()
+    invalidate_panel_cache()
+    invalidate_color_history()
+    _profile_history.clear()
+
     for cls in reversed(classes):
         bpy.utils.unregister_class(cls)
     
     for prop in ['vtx_color_picker', 
                  'vtx_color_picker_expand',
-                 'vtx_original_colors',
-                 'vtx_brightness_slider']:
+                 'vtx_brightness_slider',
+                 'vtx_batch_selected',
+                 'vtx_edit_mode_native',
+                 'vtx_background_compute',
+                 'vtx_weight_source',
+                 'vtx_weight_name',
+                 'vtx_color_domain',
+                 'vtx_color_type',
+                 'vtx_gradient_stops',
+                 'vtx_palette',
+                 'vtx_palette_index',
+                 'vtx_color_history',
+                 'vtx_color_history_limit',
+                 'vtx_stream_budget',
+                 'vtx_profile_enabled']:
         if hasattr(bpy.types.Scene, prop):
             delattr(bpy.types.Scene, prop)
+
+
+_startup_timings["import"] = time.perf_counter() - _IMPORT_START
+
+
+# bake worker spuštěný z BakeWorkers (blender -b -P vertex_color_tool.py -- --vtx-bake-worker ...)
+if __name__ == "__main__" and "--vtx-bake-worker" in sys.argv:
+    _worker_args = sys.argv[sys.argv.index("--vtx-bake-worker") + 1:]
+    run_bake_worker(_worker_args[0], int(_worker_args[1]), int(_worker_args[2]))
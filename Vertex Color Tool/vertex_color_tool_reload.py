@@ -4,20 +4,24 @@ Development Reload Button
 
     - Not tested with previous Blender versions.
     - Development tool for reloading this plugin via the Blender API.
+    - The old module is unregistered first, warm caches are handed over to the new one
+      (export_reload_state / import_reload_state) and an unchanged file is not reloaded at all.
 
 """
 
 
 import bpy
-import importlib
+import hashlib
 import importlib.util
+import os
 import sys
+import time
 
 
 bl_info = {
     "name": "Vertex Color Tool Reloader",
     "author": "Pavel Círus, aka Reywn",
-    "version": (1, 0, 5),
+    "version": (1, 1, 0),
     "blender": (4, 5, 2),
     "location": "View3D > Sidebar > Reloader",
     "description": "Vertex Color Tool reload button",
@@ -25,45 +29,135 @@ bl_info = {
 }
 
 
-# třída operátoru pro načtení addonu z konkrétní cesty
+ADDON_FILE_NAME = "vertex_color_tool.py"
+
+
+# hashe zdrojů posledního načtení podle cesty (nezměněný soubor se nenačítá znovu)
+_source_hashes = {}
+
+
+# pomocná funkce pro výchozí cestu addonu (vedle tohoto souboru)
+def get_default_addon_path():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), ADDON_FILE_NAME)
+
+
+# pomocná funkce pro cestu addonu z preferencí (prázdná = výchozí)
+def get_addon_path(context):
+    addon = context.preferences.addons.get(__name__)
+    path = addon.preferences.addon_path if addon else ""
+    return bpy.path.abspath(path) if path else get_default_addon_path()
+
+
+# pomocná funkce pro hash zdrojového souboru
+def read_source_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# pomocná funkce pro nalezení už načteného modulu podle cesty, vrací (název modulu, modul nebo None)
+def find_loaded_module(path):
+    path = os.path.normcase(os.path.abspath(path))
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if module_file and os.path.normcase(os.path.abspath(module_file)) == path:
+            return name, module
+    return os.path.splitext(os.path.basename(path))[0], None
+
+
+# pomocná funkce pro načtení modulu ze souboru pod daným názvem
+def load_module(module_name, path):
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None:
+        raise ImportError(f"Cannot load spec from addon: '{path}'")
+
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[module_name]
+        raise
+    return module
+
+
+# třída preferencí s cestou k addonu
+class DEV_RELOAD_preferences(bpy.types.AddonPreferences):
+    bl_idname = __name__
+
+    addon_path: bpy.props.StringProperty(
+        name="Addon Path",
+        subtype='FILE_PATH',
+        default="",
+        description=f"Path to {ADDON_FILE_NAME} (empty = next to the reloader)"
+    )
+
+    def draw(self, context):
+        self.layout.prop(self, "addon_path")
+
+
+# třída operátoru pro načtení addonu z nastavené cesty
 class DEV_RELOAD_base(bpy.types.Operator):
     bl_idname = "dev.reload_vertex_addon"
     bl_label = "Reload Vertex Color Tool"
-    bl_description = "Reloads vertex_color_tool.py from specific path"
+    bl_description = "Reloads vertex_color_tool.py from the configured path, keeping its caches"
+
+    force: bpy.props.BoolProperty(name="Force", default=False, description="Reload even when the file did not change")
 
     def execute(self, context):
-        addon_name = "Vertex Color Tool"
-        addon_path = "C:/Users/pavel/AppData/Roaming/Blender Foundation/Blender/4.5/scripts/addons/vertex_color_tool.py"
+        addon_path = get_addon_path(context)
+        start = time.perf_counter()
 
         try:
-            if addon_name in sys.modules:
-                del sys.modules[addon_name]
-                self.report({'INFO'}, f"Addon: '{addon_name}' removed from cache")
-
-            spec = importlib.util.spec_from_file_location(addon_name, addon_path)
-            if spec is None:
-                raise Exception(f"Cannot load spec from addon: '{addon_path}'")
-            
-            module = importlib.util.module_from_spec(spec)
-            if module is None:
-                raise Exception(f"Cannot create addon from spec")
-
-            sys.modules[addon_name] = module
-            spec.loader.exec_module(module)
-
-            if hasattr(module, "register"):
-                module.register()
-                self.report({'INFO'}, f"Addon: '{addon_name}' reloaded successfully")
-            else:
-                self.report({'WARNING'}, f"Addon: '{addon_name}' has no register function()")
-
-        except FileNotFoundError:
+            source_hash = read_source_hash(addon_path)
+        except OSError:
             self.report({'ERROR'}, f"File not found: '{addon_path}'")
+            return {'CANCELLED'}
+
+        module_name, old_module = find_loaded_module(addon_path)
+        if old_module is not None and not self.force and _source_hashes.get(addon_path) == source_hash:
+            self.report({'INFO'}, f"Addon: '{module_name}' is up to date")
+            return {'FINISHED'}
+
+        state = None
+        if old_module is not None:
+            if hasattr(old_module, "export_reload_state"):
+                try:
+                    state = old_module.export_reload_state()
+                except Exception as e:
+                    print(f"Warning: Could not export addon state: {str(e)}")
+
+            # bez unregister by v Blenderu zůstaly staré třídy, Scene properties a handlery
+            if hasattr(old_module, "unregister"):
+                try:
+                    old_module.unregister()
+                except Exception as e:
+                    self.report({'ERROR'}, f"Error unregistering: {str(e)}")
+                    return {'CANCELLED'}
+            del sys.modules[module_name]
+
+        try:
+            module = load_module(module_name, addon_path)
+            if not hasattr(module, "register"):
+                raise ImportError(f"Addon: '{module_name}' has no register function()")
+            module.register()
         except Exception as e:
             self.report({'ERROR'}, f"Error reloading: {str(e)}")
-            if addon_name in sys.modules:
-                del sys.modules[addon_name]
-            
+            # chybná nová verze: vrátí se předchozí modul i se svým stavem
+            if old_module is not None:
+                sys.modules[module_name] = old_module
+                old_module.register()
+                if state is not None and hasattr(old_module, "import_reload_state"):
+                    old_module.import_reload_state(state)
+            return {'CANCELLED'}
+
+        restored = False
+        if state is not None and hasattr(module, "import_reload_state"):
+            restored = module.import_reload_state(state)
+        _source_hashes[addon_path] = source_hash
+
+        caches = "caches kept" if restored else "caches cleared"
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self.report({'INFO'}, f"Addon: '{module_name}' reloaded in {elapsed:.0f} ms ({caches})")
         return {'FINISHED'}
 
 
@@ -78,13 +172,15 @@ class DEV_RELOAD_panel(bpy.types.Panel):
     def draw(self, context):
         layout = self.layout
         layout.operator("dev.reload_vertex_addon")
-        layout.scale_x = 1.0 
+        layout.operator("dev.reload_vertex_addon", text="Force Reload").force = True
+        layout.scale_x = 1.0
         layout.scale_y = 2.0
 
 
 # tuple všech tříd pro registraci
 classes = (
-    DEV_RELOAD_base, 
+    DEV_RELOAD_preferences,
+    DEV_RELOAD_base,
     DEV_RELOAD_panel
 )
 
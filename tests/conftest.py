@@ -0,0 +1,80 @@
+"""
+Testy Vertex Color Tool potřebují bpy, tedy Blender jako Python modul (pip install bpy
+ve verzi Blenderu z bl_info) nebo Python přibalený k Blenderu:
+
+    python -m pytest tests
+    blender -b --factory-startup --python-expr "import sys, pytest; sys.exit(pytest.main(['tests']))"
+
+Bez bpy se všechny testy přeskočí.
+"""
+
+
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Vertex Color Tool")
+sys.path.insert(0, ADDON_DIR)
+
+
+# fixture pro modul addonu, globální cache se mezi testy vyčistí
+@pytest.fixture
+def vct():
+    pytest.importorskip("bpy")
+    import vertex_color_tool
+
+    yield vertex_color_tool
+
+    vertex_color_tool.invalidate_color_snapshot()
+    vertex_color_tool.invalidate_selection_cache()
+    vertex_color_tool.invalidate_color_index()
+    vertex_color_tool.invalidate_adjacency_cache()
+    vertex_color_tool.invalidate_weight_cache()
+    vertex_color_tool.invalidate_color_history()
+
+
+# fixture pro kontext s hodnotami scény, které kernely čtou (bez registrace Scene properties)
+@pytest.fixture
+def scene_context():
+    scene = types.SimpleNamespace(
+        vtx_color_picker=(1.0, 0.5, 0.25, 1.0),
+        vtx_brightness_slider=0.5,
+        vtx_color_history=False,
+        vtx_color_history_limit=64,
+        vtx_profile_enabled=False,
+        cursor=types.SimpleNamespace(location=(0.0, 0.0, 0.0)),
+    )
+    return types.SimpleNamespace(scene=scene, active_object=None, selected_objects=[])
+
+
+# fixture pro továrnu na mřížku (size x size vertexů) s colorset1 a náhodnými barvami
+@pytest.fixture
+def grid_mesh(vct):
+    import bpy
+
+    meshes = []
+
+    def make(size=6, data_type='FLOAT_COLOR', domain='CORNER', seed=0):
+        co = [(x, y, 0.0) for y in range(size) for x in range(size)]
+        faces = [
+            (y * size + x, y * size + x + 1, (y + 1) * size + x + 1, (y + 1) * size + x)
+            for y in range(size - 1) for x in range(size - 1)
+        ]
+        mesh = bpy.data.meshes.new("vct_test_grid")
+        mesh.from_pydata(co, [], faces)
+        meshes.append(mesh)
+
+        layer = mesh.color_attributes.new(vct.COLOR_ATTRIBUTE_NAME, data_type, domain)
+        colors = np.random.default_rng(seed).random((len(layer.data), 4), dtype=np.float32)
+        colors[:, 3] = 1.0
+        layer.data.foreach_set("color_srgb", colors.ravel())
+        return mesh
+
+    yield make
+
+    for mesh in meshes:
+        bpy.data.meshes.remove(mesh)
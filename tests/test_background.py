@@ -0,0 +1,51 @@
+import threading
+
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro barvy vybraných prvků tak, jak je kernely dostávají
+def read_selected_colors(vct, mesh, indices):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])[indices]
+
+
+# pomocná funkce pro kernely, které mají stejné výsledky synchronně i po blocích
+def build_kernels(vct):
+    return {
+        "fill": vct.color_fill_kernel,
+        "brightness": vct.brightness_kernel,
+        "pipeline": vct.compile_color_pipeline([{"type": 'hsv', "saturation": 0.5}, {"type": 'mix', "factor": 0.3}]),
+        "gradient": vct.compile_gradient_fill([(0.0, (1.0, 0.0, 0.0)), (1.0, (0.0, 0.0, 1.0))], 'RADIAL',
+                                              fade_to_existing=True),
+        "filter": vct.compile_color_filter('SMOOTH', iterations=3, factor=0.7),
+    }
+
+
+@pytest.mark.parametrize("name", ["fill", "brightness", "pipeline", "gradient", "filter"])
+def test_split_kernel_chunked_compute_matches_kernel(vct, grid_mesh, scene_context, monkeypatch, name):
+    mesh = grid_mesh(size=8)
+    indices = np.arange(0, len(mesh.loops), 2, dtype=np.int32)
+    colors = read_selected_colors(vct, mesh, indices)
+    kernel = build_kernels(vct)[name]
+
+    expected = kernel(mesh, colors, indices, scene_context)
+    monkeypatch.setattr(vct, "BACKGROUND_CHUNK_SIZE", 7)
+    progress = vct.ComputeProgress(threading.Event())
+    result = kernel.prepare(mesh, colors, indices, scene_context)(progress)
+
+    np.testing.assert_allclose(result, expected, rtol=1e-6, atol=1e-6)
+    assert progress.total > 1
+    assert progress.done == progress.total
+
+
+@pytest.mark.parametrize("name", ["fill", "brightness", "pipeline", "gradient", "filter"])
+def test_cancelled_compute_returns_none(vct, grid_mesh, scene_context, name):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    colors = read_selected_colors(vct, mesh, indices)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    progress = vct.ComputeProgress(cancel_event)
+
+    assert build_kernels(vct)[name].prepare(mesh, colors, indices, scene_context)(progress) is None
+    assert progress.done == 0
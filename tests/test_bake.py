@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro bake job zvlněné mřížky (size x size vertexů) bez meshe v bpy
+def wavy_grid_job(size):
+    xs, ys = np.meshgrid(np.linspace(-1.0, 1.0, size), np.linspace(-1.0, 1.0, size))
+    zs = 0.3 * np.sin(3.0 * xs) * np.cos(3.0 * ys)
+    positions = np.stack([xs, ys, zs], axis=-1).reshape(-1, 3).astype(np.float32)
+
+    grid = np.arange(size * size).reshape(size, size)
+    quads = np.stack([grid[:-1, :-1], grid[:-1, 1:], grid[1:, 1:], grid[1:, :-1]], axis=-1).reshape(-1, 4)
+    triangles = np.concatenate([quads[:, [0, 1, 2]], quads[:, [0, 2, 3]]]).astype(np.int32)
+
+    return {
+        "positions": positions,
+        "normals": np.tile(np.float32((0.0, 0.0, 1.0)), (len(positions), 1)),
+        "triangles": triangles,
+        "bvh": None,
+        "bias": 1e-4,
+        "values": np.ones(len(positions), dtype=np.float32),
+    }
+
+
+def test_bake_chunks_cover_every_vertex(vct):
+    chunks = vct.get_bake_chunks([vct.BAKE_CHUNK_SIZE + 1, 0, 3])
+
+    assert chunks == [(0, 0), (0, vct.BAKE_CHUNK_SIZE), (2, 0)]
+
+
+@pytest.mark.parametrize("bake_type", ['AO', 'THICKNESS'])
+def test_bake_workers_match_rays_in_this_process(vct, bake_type):
+    import bpy
+
+    if not bpy.app.binary_path:
+        pytest.skip("Bake workers need the Blender executable.")
+
+    size = int(np.ceil(np.sqrt(vct.BAKE_CHUNK_SIZE + 1)))
+    expected = wavy_grid_job(size)
+    starts = [start for _, start in vct.get_bake_chunks([len(expected["positions"])])]
+    vct.bake_job_rays(expected, bake_type, 2, 1.0, 7, starts)
+
+    workers = vct.BakeWorkers([wavy_grid_job(size)], bake_type, 2, 1.0, 7, 2)
+    try:
+        workers.wait()
+        assert workers.fraction() == 1.0
+        results = workers.results()
+    finally:
+        workers.close()
+
+    np.testing.assert_array_equal(results[0], expected["values"])
+    assert (expected["values"] < 1.0).any()
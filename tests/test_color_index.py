@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+
+PALETTE = np.array([
+    (1.0, 0.0, 0.0, 1.0),
+    (0.0, 1.0, 0.0, 1.0),
+    (0.2, 0.4, 0.6, 1.0),
+], dtype=np.float32)
+
+
+# pomocná funkce pro náhodné obarvení prvků barvami z PALETTE, vrací indexy do palety
+def paint_palette(vct, mesh, seed=0):
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    labels = np.random.default_rng(seed).integers(0, len(PALETTE), len(layer.data))
+    vct.write_color_attribute(layer, PALETTE[labels])
+    return labels
+
+
+def test_color_index_counts_distinct_colors(vct, grid_mesh):
+    mesh = grid_mesh()
+    labels = paint_palette(vct, mesh)
+
+    index = vct.get_color_index(mesh)
+
+    assert len(index.colors) == len(PALETTE)
+    assert index.counts.sum() == len(labels)
+    np.testing.assert_allclose(index.colors[index.inverse], PALETTE[labels], atol=0.5 / vct.COLOR_INDEX_LEVELS)
+    most_common = index.most_common(1)[0]
+    assert index.counts[most_common] == np.bincount(labels).max()
+
+
+def test_color_index_element_mask_uses_tolerance(vct, grid_mesh):
+    mesh = grid_mesh()
+    labels = paint_palette(vct, mesh)
+    index = vct.get_color_index(mesh)
+
+    np.testing.assert_array_equal(index.element_mask(PALETTE[2], 0.0), labels == 2)
+    np.testing.assert_array_equal(index.element_mask((0.25, 0.45, 0.55), 0.06), labels == 2)
+    assert not index.element_mask((0.5, 0.5, 0.5), 0.01).any()
+
+
+def test_color_index_is_cached_until_invalidated(vct, grid_mesh):
+    mesh = grid_mesh()
+    paint_palette(vct, mesh)
+
+    index = vct.get_color_index(mesh)
+    assert vct.get_color_index(mesh) is index
+    assert vct.peek_color_index(mesh) is index
+
+    vct.invalidate_color_index(mesh)
+    assert vct.peek_color_index(mesh) is None
+    assert vct.get_color_index(mesh) is not index
+
+
+def test_quantize_round_trip(vct):
+    colors = np.array([(0.0, 0.5, 1.0, 1.0), (0.25, 0.75, 0.1, 0.0)], dtype=np.float32)
+
+    restored = vct.dequantize_colors(vct.quantize_colors(colors))
+
+    np.testing.assert_allclose(restored, colors, atol=0.5 / vct.COLOR_INDEX_LEVELS)
+
+
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_select_by_color_on_uniform_colors(vct, grid_mesh, domain):
+    mesh = grid_mesh(domain=domain)
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    vct.write_color_attribute(layer, np.tile(PALETTE[2], (len(layer.data), 1)))
+    index = vct.get_color_index(mesh)
+
+    assert vct.select_by_element_mask(mesh, index.element_mask(PALETTE[2], 0.01), domain, 'VERTEX', False) \
+        == len(mesh.vertices)
+    assert vct.select_by_element_mask(mesh, index.element_mask(PALETTE[0], 0.01), domain, 'VERTEX', False) == 0
+
+
+def test_select_by_color_selects_matching_faces(vct, grid_mesh):
+    mesh = grid_mesh(size=4)
+    labels = paint_palette(vct, mesh)
+    index = vct.get_color_index(mesh)
+
+    selected = vct.select_by_element_mask(mesh, index.element_mask(PALETTE[1], 0.01), 'CORNER', 'FACE', False)
+
+    loop_starts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_start", loop_starts)
+    assert selected == np.logical_and.reduceat(labels == 1, loop_starts).sum()
+
+
+def test_color_index_in_edit_mode_matches_object_mode(vct, grid_mesh):
+    import bpy
+
+    mesh = grid_mesh()
+    labels = paint_palette(vct, mesh)
+    obj = bpy.data.objects.new("vct_test_object", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    try:
+        obj.update_from_editmode()
+        index = vct.get_color_index(mesh)
+    finally:
+        bpy.ops.object.mode_set(mode='OBJECT')
+        bpy.data.objects.remove(obj)
+
+    assert len(index.inverse) == len(labels)
+    np.testing.assert_array_equal(index.element_mask(PALETTE[0], 0.0), labels == 0)
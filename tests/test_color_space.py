@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro bajty sRGB barev color attribute (porovnání bez převodu na lineární barvy)
+def read_srgb_bytes(layer):
+    colors = np.empty(len(layer.data) * 4, dtype=np.float32)
+    layer.data.foreach_get("color_srgb", colors)
+    return np.round(colors * 255.0).astype(np.uint8)
+
+
+def identity_kernel(mesh, colors, corner_indices, context):
+    return colors.copy()
+
+
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_identity_keeps_byte_colors(vct, grid_mesh, scene_context, domain):
+    mesh = grid_mesh(data_type='BYTE_COLOR', domain=domain)
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    before = read_srgb_bytes(layer)
+
+    count = vct.process_mesh_colors(scene_context, mesh, None, identity_kernel, vct.get_all_element_indices(mesh))
+
+    assert count == len(layer.data)
+    np.testing.assert_array_equal(read_srgb_bytes(layer), before)
+
+
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_identity_keeps_byte_colors_in_edit_mode(vct, grid_mesh, domain):
+    import bpy
+
+    mesh = grid_mesh(data_type='BYTE_COLOR', domain=domain)
+    obj = bpy.data.objects.new("vct_test_object", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    before = read_srgb_bytes(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    try:
+        bpy.ops.mesh.select_all(action='SELECT')
+        count = vct.process_edit_mesh_colors(bpy.context, obj, None, identity_kernel)
+    finally:
+        bpy.ops.object.mode_set(mode='OBJECT')
+        bpy.data.objects.remove(obj)
+
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    assert count == len(layer.data)
+    np.testing.assert_array_equal(read_srgb_bytes(layer), before)
+
+
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_edit_mesh_colors_round_trip_keeps_byte_colors(vct, grid_mesh, domain):
+    import bpy
+
+    mesh = grid_mesh(data_type='BYTE_COLOR', domain=domain)
+    obj = bpy.data.objects.new("vct_test_object", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    before = read_srgb_bytes(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+    expected = vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+
+    bpy.ops.object.mode_set(mode='EDIT')
+    try:
+        obj.update_from_editmode()
+        edit_colors = vct.EditMeshColors(mesh)
+        colors = edit_colors.read()
+        edit_colors.write(colors)
+    finally:
+        bpy.ops.object.mode_set(mode='OBJECT')
+        bpy.data.objects.remove(obj)
+
+    # čtení z BMesh vrací lineární barvy stejně jako foreach_get("color")
+    np.testing.assert_allclose(colors, expected, atol=1e-5)
+    np.testing.assert_array_equal(read_srgb_bytes(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]), before)
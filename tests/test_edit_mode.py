@@ -0,0 +1,75 @@
+import contextlib
+
+import numpy as np
+import pytest
+
+
+# kontext pro objekt s meshem v Edit Mode, vybrané jsou vertexy s indexem pod select_below
+@contextlib.contextmanager
+def edit_mode_object(mesh, select_below=None):
+    import bpy
+    import bmesh
+
+    obj = bpy.data.objects.new("vct_test_object", mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode='EDIT')
+    try:
+        bpy.ops.mesh.select_all(action='SELECT' if select_below is None else 'DESELECT')
+        if select_below is not None:
+            for vert in bmesh.from_edit_mesh(mesh).verts:
+                vert.select = vert.index < select_below
+        yield obj
+    finally:
+        bpy.ops.object.mode_set(mode='OBJECT')
+        bpy.data.objects.remove(obj)
+
+
+# pomocná funkce pro všechny barvy color attribute (N, 4)
+def read_colors(vct, mesh):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+
+
+@pytest.mark.parametrize("data_type", ['FLOAT_COLOR', 'BYTE_COLOR'])
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_edit_mode_fill_changes_only_the_selection(vct, grid_mesh, scene_context, domain, data_type):
+    mesh = grid_mesh(domain=domain, data_type=data_type)
+    before = read_colors(vct, mesh)
+
+    with edit_mode_object(mesh, select_below=10) as obj:
+        count = vct.process_edit_mesh_colors(scene_context, obj, None, vct.color_fill_kernel)
+
+    after = read_colors(vct, mesh)
+    selected = vct.get_element_vertices(mesh, vct.get_all_element_indices(mesh)) < 10
+    assert count == selected.sum()
+    np.testing.assert_allclose(after[selected], np.tile((1.0, 0.5, 0.25, 1.0), (count, 1)), atol=0.01)
+    np.testing.assert_array_equal(after[~selected], before[~selected])
+
+
+def test_edit_mode_reads_the_whole_attribute(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    kernel = vct.compile_color_filter('SMOOTH', iterations=2)
+    indices = vct.get_all_element_indices(mesh)
+    expected = kernel(mesh, read_colors(vct, mesh), indices, scene_context)
+
+    with edit_mode_object(mesh) as obj:
+        obj.update_from_editmode()
+        np.testing.assert_array_equal(vct.get_all_element_indices(mesh), indices)
+        vct.invalidate_adjacency_cache()
+        result = kernel(mesh, vct.read_element_colors(mesh, indices), indices, scene_context)
+
+    np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_edit_mesh_colors_write_from_offset(vct, grid_mesh):
+    mesh = grid_mesh()
+    before = read_colors(vct, mesh)
+    indices = vct.get_all_element_indices(mesh)
+
+    with edit_mode_object(mesh):
+        writer = vct.EditMeshColors(mesh, indices)
+        writer.write(np.tile((0.0, 0.0, 0.0, 1.0), (5, 1)).astype(np.float32), start=10)
+
+    after = read_colors(vct, mesh)
+    np.testing.assert_allclose(after[10:15], np.tile((0.0, 0.0, 0.0, 1.0), (5, 1)), atol=1e-6)
+    np.testing.assert_array_equal(np.delete(after, np.s_[10:15], axis=0), np.delete(before, np.s_[10:15], axis=0))
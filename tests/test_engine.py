@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro všechny barvy color attribute (N, 4)
+def read_colors(vct, mesh):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+
+
+# pomocná funkce pro výběr vertexů s indexem pod select_below v mesh datech
+def select_vertices(mesh, select_below):
+    select = np.arange(len(mesh.vertices)) < select_below
+    mesh.vertices.foreach_set("select", select)
+
+
+def halve_kernel(mesh, colors, corner_indices, context):
+    result = colors.copy()
+    result[:, :3] *= 0.5
+    return result
+
+
+def halve_callback(color, loop_index, context):
+    return (color[0] * 0.5, color[1] * 0.5, color[2] * 0.5, color[3])
+
+
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_array_kernel_matches_per_loop_callback(vct, grid_mesh, scene_context, domain):
+    vectorized = grid_mesh(domain=domain)
+    per_loop = grid_mesh(domain=domain)
+    indices = vct.get_all_element_indices(vectorized)
+
+    vct.process_mesh_colors(scene_context, vectorized, None, halve_kernel, indices)
+    vct.process_mesh_colors(scene_context, per_loop, halve_callback, None, indices)
+
+    np.testing.assert_allclose(read_colors(vct, vectorized), read_colors(vct, per_loop), atol=1e-6)
+
+
+@pytest.mark.parametrize("domain", ['CORNER', 'POINT'])
+def test_only_selected_elements_are_written(vct, grid_mesh, scene_context, domain):
+    mesh = grid_mesh(domain=domain)
+    select_vertices(mesh, 10)
+    before = read_colors(vct, mesh)
+
+    count = vct.process_mesh_colors(scene_context, mesh, None, halve_kernel)
+
+    after = read_colors(vct, mesh)
+    selected = vct.get_element_vertices(mesh, vct.get_all_element_indices(mesh)) < 10
+    assert count == selected.sum()
+    np.testing.assert_allclose(after[selected, :3], before[selected, :3] * 0.5, atol=1e-6)
+    np.testing.assert_array_equal(after[~selected], before[~selected])
+
+
+def test_empty_selection_writes_nothing(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    select_vertices(mesh, 0)
+    before = read_colors(vct, mesh)
+
+    assert vct.process_mesh_colors(scene_context, mesh, None, halve_kernel) == 0
+    np.testing.assert_array_equal(read_colors(vct, mesh), before)
+
+
+def test_color_fill_kernel_uses_picker(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+
+    result = vct.color_fill_kernel(mesh, read_colors(vct, mesh)[indices], indices, scene_context)
+
+    np.testing.assert_allclose(result, np.tile((1.0, 0.5, 0.25, 1.0), (len(indices), 1)))
@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro barvy vybraných prvků tak, jak je kernely dostávají
+def read_selected_colors(vct, mesh, indices):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])[indices]
+
+
+# pomocná funkce pro obarvení rohů podle faces: levé sloupce faces červeně, zbytek modře (šev mezi nimi)
+def paint_seam(vct, mesh, size, seam_column):
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    corner_faces = vct.read_corner_faces(mesh)
+    left = corner_faces % (size - 1) < seam_column
+    colors = np.where(left[:, None], (1.0, 0.0, 0.0, 1.0), (0.0, 0.0, 1.0, 1.0)).astype(np.float32)
+    vct.write_color_attribute(layer, colors)
+    return colors
+
+
+def test_filter_keeps_constant_colors(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    constant = np.tile(np.array((0.25, 0.5, 0.75, 1.0), dtype=np.float32), (len(layer.data), 1))
+    vct.write_color_attribute(layer, constant)
+    indices = vct.get_all_element_indices(mesh)
+
+    result = vct.compile_color_filter('SMOOTH', iterations=4)(mesh, constant[indices], indices, scene_context)
+
+    np.testing.assert_allclose(result, constant, atol=1e-6)
+
+
+@pytest.mark.parametrize("filter_type, sign", [('DILATE', 1.0), ('ERODE', -1.0)])
+def test_filter_dilate_and_erode_are_monotonic(vct, grid_mesh, scene_context, filter_type, sign):
+    mesh = grid_mesh(domain='POINT')
+    indices = vct.get_all_element_indices(mesh)
+    colors = read_selected_colors(vct, mesh, indices)
+
+    result = vct.compile_color_filter(filter_type)(mesh, colors, indices, scene_context)
+
+    assert ((result[:, :3] - colors[:, :3]) * sign >= -1e-6).all()
+    assert (result[:, :3] != colors[:, :3]).any()
+
+
+def test_filter_rejects_unknown_type(vct):
+    with pytest.raises(ValueError):
+        vct.compile_color_filter('BLUR')
+
+
+@pytest.mark.parametrize("filter_type", ['SMOOTH', 'DILATE', 'ERODE'])
+def test_filter_keeps_corner_seams(vct, grid_mesh, scene_context, filter_type):
+    mesh = grid_mesh(domain='CORNER')
+    colors = paint_seam(vct, mesh, 6, 2)
+    indices = vct.get_all_element_indices(mesh)
+
+    result = vct.compile_color_filter(filter_type, iterations=5)(mesh, colors[indices], indices, scene_context)
+
+    np.testing.assert_allclose(result, colors, atol=1e-6)
+
+
+def test_filter_smooths_each_side_of_a_corner_seam(vct, grid_mesh, scene_context):
+    size = 6
+    mesh = grid_mesh(domain='CORNER')
+    colors = paint_seam(vct, mesh, size, 2)
+    # jeden roh na každé straně švu ztmaví, šev mezi nimi zůstane
+    loop_verts = vct.read_loop_vertices(mesh)
+    left = vct.read_corner_faces(mesh) % (size - 1) < 2
+    dark_left = np.flatnonzero(left & (loop_verts == 7))
+    dark_right = np.flatnonzero(~left & (loop_verts == 10))
+    colors[dark_left, 0] = 0.0
+    colors[dark_right, 2] = 0.0
+    vct.write_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME], colors)
+    indices = vct.get_all_element_indices(mesh)
+
+    result = vct.compile_color_filter('SMOOTH', iterations=3)(mesh, colors[indices], indices, scene_context)
+
+    np.testing.assert_array_equal(result[left, 1:3], 0.0)
+    np.testing.assert_array_equal(result[~left, :2], 0.0)
+    assert (result[dark_left, 0] > 0.0).all() and (result[dark_right, 2] > 0.0).all()
+
+
+def test_corner_filter_without_seams_matches_point_filter(vct, grid_mesh, scene_context):
+    point_mesh = grid_mesh(domain='POINT')
+    corner_mesh = grid_mesh(domain='CORNER')
+    point_colors = read_selected_colors(vct, point_mesh, vct.get_all_element_indices(point_mesh))
+    loop_verts = vct.read_loop_vertices(corner_mesh)
+    vct.write_color_attribute(corner_mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME], point_colors[loop_verts])
+    kernel = vct.compile_color_filter('SMOOTH', iterations=2)
+
+    point_indices = vct.get_all_element_indices(point_mesh)
+    point_result = kernel(point_mesh, point_colors, point_indices, scene_context)
+    corner_indices = vct.get_all_element_indices(corner_mesh)
+    corner_result = kernel(corner_mesh, point_colors[loop_verts], corner_indices, scene_context)
+
+    np.testing.assert_allclose(corner_result, point_result[loop_verts], atol=1e-6)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro barvy vybraných prvků tak, jak je kernely dostávají
+def read_selected_colors(vct, mesh, indices):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])[indices]
+
+
+def test_gradient_axis_follows_vertex_position(vct, grid_mesh, scene_context):
+    size = 5
+    mesh = grid_mesh(size=size)
+    indices = vct.get_all_element_indices(mesh)
+    kernel = vct.compile_gradient_fill([(0.0, (0.0, 0.0, 0.0)), (1.0, (1.0, 1.0, 1.0))], 'AXIS', axis='X')
+
+    result = kernel(mesh, read_selected_colors(vct, mesh, indices), indices, scene_context)
+
+    x = vct.get_element_vertices(mesh, indices) % size / (size - 1)
+    np.testing.assert_allclose(result[:, 0], x, atol=1e-6)
+    np.testing.assert_array_equal(result[:, 3], 1.0)
+
+
+@pytest.mark.parametrize("arguments", [
+    {"stops": []},
+    {"stops": [(0.0, (1.0, 1.0, 1.0))], "gradient_type": 'SPIRAL'},
+    {"stops": [(0.0, (1.0, 1.0, 1.0))], "falloff": 'STEP'},
+    {"stops": [(0.0, (1.0, 1.0, 1.0))], "direction": (0.0, 0.0, 0.0)},
+])
+def test_gradient_rejects_invalid_arguments(vct, arguments):
+    with pytest.raises(ValueError):
+        vct.compile_gradient_fill(**arguments)
@@ -0,0 +1,112 @@
+import types
+
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro všechny barvy color attribute (N, 4)
+def read_colors(vct, mesh):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+
+
+# pomocná funkce pro zaznamenanou výplň barvou pickeru (jeden krok historie)
+def record_fill(vct, context, mesh, indices):
+    context.scene.vtx_color_history = True
+    assert vct.begin_color_history(context, "Apply Color")
+    vct.process_mesh_colors(context, mesh, None, vct.color_fill_kernel, indices)
+    return vct.end_color_history(context)
+
+
+def test_history_undo_and_redo_restore_colors(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = np.arange(0, len(mesh.loops), 3, dtype=np.int32)
+    before = read_colors(vct, mesh)
+
+    step = record_fill(vct, scene_context, mesh, indices)
+    after = read_colors(vct, mesh)
+    assert list(vct._history_undo) == [step]
+    np.testing.assert_array_equal(step.deltas[0].indices, indices)
+
+    assert vct.restore_color_history_step(scene_context, step, undo=True) == len(indices)
+    np.testing.assert_allclose(read_colors(vct, mesh), before, atol=1e-6)
+
+    assert vct.restore_color_history_step(scene_context, step, undo=False) == len(indices)
+    np.testing.assert_allclose(read_colors(vct, mesh), after, atol=1e-6)
+
+
+def test_history_refuses_colors_changed_outside(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    step = record_fill(vct, scene_context, mesh, indices)
+
+    layer = mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME]
+    vct.write_color_attribute(layer, np.zeros((len(layer.data), 4), dtype=np.float32))
+
+    with pytest.raises(ValueError):
+        vct.restore_color_history_step(scene_context, step, undo=True)
+
+
+def test_history_skips_unchanged_elements(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    scene_context.scene.vtx_color_history = True
+
+    vct.begin_color_history(scene_context, "Nothing")
+    vct.process_mesh_colors(scene_context, mesh, None, lambda mesh, colors, *args: colors.copy(), indices)
+
+    assert vct.end_color_history(scene_context) is None
+    assert not vct._history_undo
+
+
+# pomocná funkce pro krok historie s danou velikostí v bajtech
+def make_step(vct, name, nbytes):
+    step = vct.ColorHistoryStep(name)
+    step.nbytes = nbytes
+    return step
+
+
+def test_trim_history_drops_redo_first_and_keeps_last_undo(vct):
+    vct._history_undo.extend(make_step(vct, name, 100) for name in ("a", "b", "c"))
+    vct._history_redo.extend(make_step(vct, name, 100) for name in ("d", "e"))
+
+    vct.trim_color_history(300)
+    assert [step.name for step in vct._history_undo] == ["a", "b", "c"]
+    assert not vct._history_redo
+
+    vct.trim_color_history(50)
+    assert [step.name for step in vct._history_undo] == ["c"]
+
+
+def test_global_undo_clears_the_history(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    record_fill(vct, scene_context, mesh, vct.get_all_element_indices(mesh))
+    vct._history_redo.append(make_step(vct, "redo", 100))
+
+    vct.clear_color_history_on_undo(None)
+
+    assert not vct._history_undo
+    assert not vct._history_redo
+
+
+@pytest.mark.parametrize("operator", ["VTXCOLOR_apply", "VTXCOLOR_brightness"])
+@pytest.mark.parametrize("history", [False, True])
+def test_global_undo_push_is_skipped_with_history(vct, scene_context, monkeypatch, operator, history):
+    import bpy
+
+    pushed = []
+    monkeypatch.setattr(bpy.ops, "ed", types.SimpleNamespace(undo_push=lambda message: pushed.append(message)))
+    monkeypatch.setattr(vct, "validate_for_vertex_operation", lambda context: (True, None, None))
+    monkeypatch.setattr(
+        vct, "apply_vertex_color_operation",
+        lambda context, callback, name, array_operation=None: ('FINISHED', 'INFO', "Applied."),
+    )
+    operator_class = getattr(vct, operator)
+    operator_self = types.SimpleNamespace(
+        bl_label=operator_class.bl_label,
+        report=lambda level, message: None,
+        build_operation=lambda context: operator_class.build_operation(None, context),
+    )
+    scene_context.scene.vtx_color_history = history
+
+    assert operator_class.execute(operator_self, scene_context) == {'FINISHED'}
+    assert pushed == ([] if history else [operator_class.bl_label])
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro barvy vybraných prvků tak, jak je kernely dostávají
+def read_selected_colors(vct, mesh, indices):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])[indices]
+
+
+def test_pipeline_multiply_and_gamma(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    colors = read_selected_colors(vct, mesh, indices)
+    kernel = vct.compile_color_pipeline([
+        {"type": 'multiply', "factor": 0.5},
+        {"type": 'gamma', "gamma": 2.0},
+    ])
+
+    result = kernel(mesh, colors, indices, scene_context)
+
+    np.testing.assert_allclose(result[:, :3], (colors[:, :3] * 0.5) ** 2.0, rtol=1e-5)
+    np.testing.assert_array_equal(result[:, 3], colors[:, 3])
+
+
+def test_pipeline_hsv_defaults_are_identity(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    colors = read_selected_colors(vct, mesh, indices)
+
+    result = vct.compile_color_pipeline([{"type": 'hsv'}])(mesh, colors, indices, scene_context)
+
+    np.testing.assert_allclose(result, colors, atol=1e-5)
+
+
+def test_pipeline_channel_mask_keeps_other_channels(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    colors = read_selected_colors(vct, mesh, indices)
+    kernel = vct.compile_color_pipeline([{"type": 'mix', "factor": 1.0}], channel_mask=(False, True, False))
+
+    result = kernel(mesh, colors, indices, scene_context)
+
+    np.testing.assert_array_equal(result[:, [0, 2, 3]], colors[:, [0, 2, 3]])
+    np.testing.assert_allclose(result[:, 1], 0.5)
+
+
+def test_pipeline_rejects_unknown_step(vct):
+    with pytest.raises(ValueError):
+        vct.compile_color_pipeline([{"type": 'blur'}])
@@ -0,0 +1,25 @@
+import json
+
+
+def test_per_mesh_timings_go_to_the_profile_record(vct, scene_context, tmp_path):
+    scene_context.scene.vtx_profile_enabled = True
+    vct.begin_profile(scene_context, "Apply Color")
+    start = vct.time.perf_counter()
+    vct.profile_mesh("Crate", start, 12)
+    vct.profile_mesh("Lid, Lid.001", start, 4)
+    record = vct.end_profile()
+
+    assert [(name, corners) for name, _, _, corners in record.meshes] == [("Crate", 12), ("Lid, Lid.001", 4)]
+
+    path = tmp_path / "timings.json"
+    vct.export_profile_json(str(path))
+    exported = json.loads(path.read_text(encoding="utf-8"))[-1]
+    assert [mesh["objects"] for mesh in exported["meshes"]] == ["Crate", "Lid, Lid.001"]
+    vct._profile_history.clear()
+
+
+def test_per_mesh_timings_are_skipped_without_profiling(vct, scene_context):
+    vct.begin_profile(scene_context, "Apply Color")
+    vct.profile_mesh("Crate", vct.time.perf_counter(), 12)
+
+    assert vct.end_profile() is None
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+
+# pomocná funkce pro všechny barvy color attribute (N, 4)
+def read_colors(vct, mesh):
+    return vct.read_color_attribute(mesh.color_attributes[vct.COLOR_ATTRIBUTE_NAME])
+
+
+def test_snapshot_is_kept_for_the_same_selection(vct, grid_mesh):
+    mesh = grid_mesh()
+    indices = np.arange(0, 10, dtype=np.int32)
+    colors = read_colors(vct, mesh)[indices]
+
+    snapshot = vct.store_color_snapshot(mesh, vct.COLOR_ATTRIBUTE_NAME, indices, colors)
+
+    assert vct.get_color_snapshot(mesh, vct.COLOR_ATTRIBUTE_NAME, indices.copy()) is snapshot
+    np.testing.assert_array_equal(snapshot.colors, colors[:, :3])
+
+
+def test_snapshot_is_dropped_for_another_selection(vct, grid_mesh):
+    mesh = grid_mesh()
+    indices = np.arange(0, 10, dtype=np.int32)
+    vct.store_color_snapshot(mesh, vct.COLOR_ATTRIBUTE_NAME, indices, read_colors(vct, mesh)[indices])
+
+    assert vct.get_color_snapshot(mesh, vct.COLOR_ATTRIBUTE_NAME, indices[:5]) is None
+    assert vct.get_color_snapshot(mesh, vct.COLOR_ATTRIBUTE_NAME, indices) is None
+
+
+def test_brightness_is_relative_to_the_snapshot(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    original = read_colors(vct, mesh)
+
+    scene_context.scene.vtx_brightness_slider = 0.5
+    vct.process_mesh_colors(scene_context, mesh, None, vct.brightness_kernel, indices)
+    scene_context.scene.vtx_brightness_slider = 1.0
+    vct.process_mesh_colors(scene_context, mesh, None, vct.brightness_kernel, indices)
+
+    np.testing.assert_allclose(read_colors(vct, mesh)[:, :3], original[:, :3], atol=1e-6)
+
+
+def test_color_fill_drops_the_snapshot(vct, grid_mesh, scene_context):
+    mesh = grid_mesh()
+    indices = vct.get_all_element_indices(mesh)
+    vct.process_mesh_colors(scene_context, mesh, None, vct.brightness_kernel, indices)
+
+    vct.process_mesh_colors(scene_context, mesh, None, vct.color_fill_kernel, indices)
+
+    assert vct.get_color_snapshot(mesh, vct.COLOR_ATTRIBUTE_NAME, indices) is None
+
+
+def test_file_load_drops_legacy_json_snapshot(vct):
+    import bpy
+
+    scene = bpy.data.scenes[0]
+    scene["vtx_original_colors"] = '{"0": [1.0, 0.0, 0.0, 1.0]}'
+
+    vct.clear_caches_on_load(None)
+
+    assert "vtx_original_colors" not in scene
+